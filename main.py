@@ -5,10 +5,13 @@
 #
 #############################################################################
 
+import os
 import random
 from src.Menu import Menu
 from src.Scene import Scene
 from src.ConfigManager import ConfigManager
+from src.ConfigWatcher import ConfigWatcher
+from src.SessionLog import SessionLog
 from src.ErrorPopup import ErrorPopup
 
 def setWorkingDirectoryToFileDirectory():
@@ -44,27 +47,51 @@ def startScene():
   if not can_run_scene:
     return False
 
-  width = scene_config["screen_width"]
-  height = scene_config["screen_height"]
-
   try:
+    session_log = None
+    if "SWARM_RECORD" in os.environ:
+      seed = random.getrandbits(32)
+      random.seed(seed)
+      session_log = SessionLog(seed, scene_config, queens_list)
     scene = Scene(scene_config, True)
-    for queen in queens_list:
-      x = random.randint(0, width)
-      y = random.randint(0, height)
-      scene.spawnQueen(x, y, queen)
+    scene.spawnQueens(queens_list)
+    if session_log is not None:
+      scene.startRecording(session_log, os.environ["SWARM_RECORD"])
+    scene.enableConfigHotReload(ConfigWatcher())
+    if "SWARM_CONTROL_PORT" in os.environ:
+      scene.startControlServer(port = int(os.environ["SWARM_CONTROL_PORT"]))
+    if "SWARM_PROFILE" in os.environ:
+      scene.startProfiling(os.environ["SWARM_PROFILE"] or None)
+    if "SWARM_HISTORY" in os.environ:
+      scene.setColonyHistoryExport(os.environ["SWARM_HISTORY"])
     scene.startScene(False)
   except Exception as e:
     print(f"[ERROR] {e}")
     return False
   return True
 
+def replaySession(path: str):
+  """
+  Replays a recorded session headless and as fast as possible and prints the final stats.
+  :param path: The path of the session log.
+  """
+  session_log = SessionLog.load(path)
+  scene = session_log.createScene(False)
+  result = scene.runHeadless(session_log.getTickNum())
+  print(f"[INFO] Replayed {result['ticks']} ticks: {result['stats']}")
+  if "SWARM_HISTORY" in os.environ:
+    scene.exportColonyHistory(os.environ["SWARM_HISTORY"])
+
 def main():
   """
   Main function. Entry point.
   """
   setWorkingDirectoryToFileDirectory()
 
+  if "SWARM_REPLAY" in os.environ:
+    replaySession(os.environ["SWARM_REPLAY"])
+    return
+
   running = True
   while running:
     menu = Menu()
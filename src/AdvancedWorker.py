@@ -5,6 +5,7 @@
 #
 #############################################################################
 
+import math
 import pygame
 import random
 import typing
@@ -12,6 +13,9 @@ from .WorkerBase import WorkerBase
 
 
 class AdvancedWorker(WorkerBase):
+  __slots__ = ("_shouting_radius", "_internal_queen_distance", "_internal_food_distance", "_heard_food_distance",
+               "_heard_food_sender", "_heard_queen_distance", "_heard_queen_sender")
+
   def __init__(self, x, y, energy, speed, shouting_radius):
     """
     Constructor. Setup a default worker.
@@ -21,35 +25,67 @@ class AdvancedWorker(WorkerBase):
     :param shouting_radius: The radius in which the worker can shout.
     """
     super().__init__(x, y, energy)
-    self._direction = [0, 0]
     self.setRandomDirection()
     self._speed = speed
     self._shouting_radius = shouting_radius
-    self._adjacent_workers = []
     self._internal_queen_distance = 99999
     self._internal_food_distance = 99999
+    self.clearHeardSignals()
+
+  def respawn(self, x: int, y: int, energy: float, speed: int, shouting_radius: int):
+    """
+    Resets a dead worker, so it can be reused for a new birth.
+    :param x: The x position of the worker.
+    :param y: The y position of the worker.
+    :param energy: The starting energy of the worker.
+    :param speed: The movement speed of the worker.
+    :param shouting_radius: The radius in which the worker can shout.
+    """
+    super().respawn(x, y, energy)
+    self.setRandomDirection()
+    self._speed = speed
+    self._shouting_radius = shouting_radius
+    self._internal_queen_distance = 99999
+    self._internal_food_distance = 99999
+    self.clearHeardSignals()
+
+  def reloadConfig(self, shouting_radius: int):
+    """
+    Applies a changed worker_type config to the living worker.
+    :param shouting_radius: The radius in which the worker can shout.
+    """
+    self._shouting_radius = shouting_radius
 
-  def clearAdjacentWorkerList(self):
+  def hearSignals(self, food_distance: float, food_sender: "AdvancedWorker", queen_distance: float,
+                  queen_sender: "AdvancedWorker"):
     """
-    Clears the whole adjacent worker list, which contains all workers in shouting range.
+    Stores the best signals shouted by the workers in shouting range at the start of the tick.
+    The neighbor search of the colony computes them. See NeighborListCache.
+    :param food_distance: The lowest heard food distance, including the shouting radius of the sender.
+    :param food_sender: The worker which shouted the lowest food distance.
+    :param queen_distance: The lowest heard queen distance, including the shouting radius of the sender.
+    :param queen_sender: The worker which shouted the lowest queen distance.
     """
-    self._adjacent_workers.clear()
+    self._heard_food_distance = food_distance
+    self._heard_food_sender = food_sender
+    self._heard_queen_distance = queen_distance
+    self._heard_queen_sender = queen_sender
 
-  def addToAdjacentWorkerList(self, worker: "AdvancedWorker"):
+  def clearHeardSignals(self):
     """
-    adds a worker to the adjacend worker list, which contains all workers in shouting range.
-    :param worker: The worker to add.
+    Forgets the heard signals, so they are only used in the tick they were heard in.
     """
-    self._adjacent_workers.append(worker)
+    self._heard_food_distance = math.inf
+    self._heard_food_sender = None
+    self._heard_queen_distance = math.inf
+    self._heard_queen_sender = None
 
-  def scoutFood(self, food_list: list["Food"]):
+  def scoutFood(self):
     """
     Detects a new food source, if the worker touches one.
-    :param food_list: The list containing all food in the scene.
     """
-    for food in food_list:
-      if self.computeDistance(food) <= 40:
-        self._internal_food_distance = 0
+    if self._food_contacts:
+      self._internal_food_distance = 0
 
   def scoutQueen(self):
     """
@@ -58,22 +94,20 @@ class AdvancedWorker(WorkerBase):
     if self._primary_queen is None:
       return
 
-    if self.computeDistance(self._primary_queen) <= 40:
+    if self._queen_contact:
       self._internal_queen_distance = 0
 
-  def takeFood(self, food_list: list["Food"]):
+  def takeFood(self):
     """
     Takes food bite if it touches any and if it does not hold food. Then turns around.
-    :param food_list: The list containing all food in the scene.
     """
     if self._has_food:
       return
 
-    for food in food_list:
-      if self.computeDistance(food) <= 40:
-        self._has_food = food.reduceEnergy(1)
-        self._food_color = food.getColor()
-        self.turnAround()
+    for food in self._food_contacts:
+      self._has_food = food.reduceEnergy(1)
+      self._food_color = food.getColor()
+      self.turnAround()
 
   def giveFoodToQueen(self):
     """
@@ -84,7 +118,7 @@ class AdvancedWorker(WorkerBase):
     if not self._has_food:
       return
 
-    if self.computeDistance(self._primary_queen) <= 40:
+    if self._queen_contact:
       self._primary_queen.increaseEnergy(1)
       self._has_food = False
       self.turnAround()
@@ -93,37 +127,31 @@ class AdvancedWorker(WorkerBase):
     """
     Reversed the direction to turn around 180 degree.
     """
-    self._direction[0] = -self._direction[0]
-    self._direction[1] = -self._direction[1]
+    self._dir_x = -self._dir_x
+    self._dir_y = -self._dir_y
 
   def askForNextDirection(self):
     """
-    Performs the core part of the advanced worker algorithm. Checks for all workers
-    in listening (shouting) range if memorized distance to food or queen of any worker is
-    lower than its own. If it found one, it stores this new value and turns into the direction
-    of the other worker.
+    Performs the core part of the advanced worker algorithm. Checks if the best memorized
+    distance to food or queen heard from the workers in listening (shouting) range is lower
+    than its own. If so, it stores this new value and turns into the direction of the worker
+    which shouted it.
     """
     best_food_direction_signal_sender = None
     best_queen_direction_signal_sender = None
 
-    for adjacent_worker in self._adjacent_workers:
-      heard_food_distance = adjacent_worker._internal_food_distance +\
-                            adjacent_worker._shouting_radius
-      heard_queen_distance = adjacent_worker._internal_queen_distance +\
-                             adjacent_worker._shouting_radius
+    if self._heard_food_distance < self._internal_food_distance:
+      self._internal_food_distance = self._heard_food_distance
+      best_food_direction_signal_sender = self._heard_food_sender
 
-      if heard_food_distance < self._internal_food_distance:
-        self._internal_food_distance = heard_food_distance
-        best_food_direction_signal_sender = adjacent_worker
-        
-      if heard_queen_distance < self._internal_queen_distance:
-        self._internal_queen_distance = heard_queen_distance
-        best_queen_direction_signal_sender = adjacent_worker
+    if self._heard_queen_distance < self._internal_queen_distance:
+      self._internal_queen_distance = self._heard_queen_distance
+      best_queen_direction_signal_sender = self._heard_queen_sender
 
     if self._has_food and best_queen_direction_signal_sender is not None:
-      self._direction = self.computeDirection(best_queen_direction_signal_sender)
+      self.setDirectionTo(best_queen_direction_signal_sender)
     elif not self._has_food and best_food_direction_signal_sender is not None:
-      self._direction = self.computeDirection(best_food_direction_signal_sender)
+      self.setDirectionTo(best_food_direction_signal_sender)
 
   def getShoutingRadius(self) -> int:
     """
@@ -140,40 +168,42 @@ class AdvancedWorker(WorkerBase):
     self._internal_queen_distance += self._speed
     self._internal_food_distance += self._speed
 
-  def render(self, screen: "pygame.Screen"):
+  def render(self, screen: "pygame.Screen", camera: "Camera"):
     """
     Renders the worker on the screen.
     :param screen: The screen to render the worker on.
+    :param camera: The camera converting world positions into screen positions.
     """
-    pygame.draw.circle(screen, self._color, (self._x, self._y), 4)
+    zoom = camera.getZoom()
+    x, y = camera.toScreen(self._x, self._y)
+    pygame.draw.circle(screen, self._color, (x, y), max(4 * zoom, 1))
     if self._has_food:
-      pygame.draw.circle(screen, self._food_color, (self._x, self._y + 3), 2)
+      pygame.draw.circle(screen, self._food_color, (x, y + 3 * zoom), max(2 * zoom, 1))
 
   def behave(self, entity_lists: "EntityListContainer", width: int, height: int):
     """
     Contains all methods required for the behavior of the advanced workers. Called every frame.
+    The contacts with food and the queen are detected by the scene at the beginning of the
+    frame, so they are handled before the movement of this frame.
     :param entity_lists: The container of all entity lists which is managed by the Scene.
     :param width: The width of the scene screen.
     :param height: The height of the scene screen.
     """
-    if not self.queenAlive(entity_lists.queen_list):
-      self._primary_queen = None
-
     self.increaseInternalDistanceRepresentations()
 
-    self.performMovement(entity_lists, width, height, 5)
-
-    self.scoutFood(entity_lists.food_list)
+    self.scoutFood()
     self.scoutQueen()
     self.giveFoodToQueen()
-    self.takeFood(entity_lists.food_list)
+    self.takeFood()
 
     if self._primary_queen is None or self._primary_queen._energy > self._primary_queen._max_energy:
       self.moveRandomly()
     else:
       self.askForNextDirection()
 
-    self.clearAdjacentWorkerList()
+    self.clearHeardSignals()
+
+    self.performMovement(entity_lists, width, height, 5)
 
     self.reduceEnergy(self._energy_reduction_rate)
     
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+#
+# The viewport of the scene window onto a world which may be larger than the
+# window. Converts between world and screen coordinates and supports panning
+# and zooming around a screen position. Only entities within the viewport are
+# rendered and can be clicked.
+#
+#############################################################################
+
+import typing
+
+
+class Camera:
+  def __init__(self, view_width: int, view_height: int, world_width: int, world_height: int, max_zoom: float = 4.0):
+    """
+    Constructor. Starts with a zoom of 1 in the upper left corner of the world.
+    :param view_width: The width of the window in pixels.
+    :param view_height: The height of the window in pixels.
+    :param world_width: The width of the simulated world.
+    :param world_height: The height of the simulated world.
+    :param max_zoom: The maximum zoom factor.
+    """
+    self._view_width = view_width
+    self._view_height = view_height
+    self._world_width = world_width
+    self._world_height = world_height
+    self._min_zoom = min(1.0, view_width / world_width, view_height / world_height)
+    self._max_zoom = max_zoom
+    self._x = 0.0
+    self._y = 0.0
+    self._zoom = 1.0
+
+  def getZoom(self) -> float:
+    """
+    Returns the number of screen pixels per world unit.
+    """
+    return self._zoom
+
+  def getPosition(self) -> "tuple[float, float]":
+    """
+    Returns the world position shown in the upper left corner of the window.
+    """
+    return self._x, self._y
+
+  def toScreen(self, x: float, y: float) -> "tuple[float, float]":
+    """
+    Converts a world position into a screen position.
+    """
+    return (x - self._x) * self._zoom, (y - self._y) * self._zoom
+
+  def toWorld(self, screen_x: float, screen_y: float) -> "tuple[float, float]":
+    """
+    Converts a screen position into a world position.
+    """
+    return screen_x / self._zoom + self._x, screen_y / self._zoom + self._y
+
+  def toScreenRect(self, rect: "tuple[int, int, int, int]") -> "tuple[int, int, int, int]":
+    """
+    Converts a world rectangle into the screen rectangle covering it.
+    :param rect: The world rectangle as (left, top, width, height).
+    :return: The screen rectangle as (left, top, width, height).
+    """
+    zoom = self._zoom
+    left = int((rect[0] - self._x) * zoom)
+    top = int((rect[1] - self._y) * zoom)
+    return left, top, int(rect[2] * zoom) + 2, int(rect[3] * zoom) + 2
+
+  def getVisibleRect(self) -> "tuple[float, float, float, float]":
+    """
+    Returns the part of the world shown in the window.
+    :return: The world rectangle as (left, top, right, bottom).
+    """
+    return self._x, self._y, self._x + self._view_width / self._zoom, self._y + self._view_height / self._zoom
+
+  def pan(self, screen_dx: float, screen_dy: float):
+    """
+    Moves the viewport by a distance in screen pixels. The viewport stays within the world.
+    :param screen_dx: The distance to move to the right.
+    :param screen_dy: The distance to move down.
+    """
+    self._x += screen_dx / self._zoom
+    self._y += screen_dy / self._zoom
+    self._clamp()
+
+  def zoomAt(self, factor: float, screen_x: float, screen_y: float):
+    """
+    Zooms by a factor while keeping the world position under a screen position in place.
+    :param factor: The factor to multiply the zoom with. Values above 1 zoom in.
+    :param screen_x: The x position of the zoom center in the window.
+    :param screen_y: The y position of the zoom center in the window.
+    """
+    world_x, world_y = self.toWorld(screen_x, screen_y)
+    self._zoom = min(max(self._zoom * factor, self._min_zoom), self._max_zoom)
+    self._x = world_x - screen_x / self._zoom
+    self._y = world_y - screen_y / self._zoom
+    self._clamp()
+
+  def reset(self):
+    """
+    Returns to a zoom of 1 in the upper left corner of the world.
+    """
+    self._x = 0.0
+    self._y = 0.0
+    self._zoom = 1.0
+
+  def _clamp(self):
+    """
+    Keeps the viewport within the world. Centers the world if it is smaller than the viewport.
+    """
+    visible_width = self._view_width / self._zoom
+    visible_height = self._view_height / self._zoom
+    if visible_width >= self._world_width:
+      self._x = (self._world_width - visible_width) / 2
+    else:
+      self._x = min(max(self._x, 0.0), self._world_width - visible_width)
+    if visible_height >= self._world_height:
+      self._y = (self._world_height - visible_height) / 2
+    else:
+      self._y = min(max(self._y, 0.0), self._world_height - visible_height)
@@ -8,30 +8,34 @@
 
 import json
 import typing
+from .WorkerRegistry import WorkerRegistry
+from .UpdateScheduler import UpdateScheduler
 
 class ConfigManager:
   def __init__(self):
     pass
 
-  def loadSceneConfig(self) -> dict:
+  def loadSceneConfig(self, path: str = "config/scene_config.json") -> dict:
     """
     Loads the scene config file. (No validation.)
+    :param path: The path of the scene config file.
     :return: The configuration parsed into a dictionary.
     """
     try:
-      data = self.__loadGeneralConfig("config/scene_config.json")
+      data = self.__loadGeneralConfig(path)
     except (json.decoder.JSONDecodeError, FileNotFoundError) as e:
       print(f"[ERROR] Cannot read scene config: {e}")
       data = None
     return data
 
-  def loadQueensConfig(self) -> list[dict]:
+  def loadQueensConfig(self, path: str = "config/queen_config.json") -> list[dict]:
     """
     Loads the queens config file. (No validation.)
+    :param path: The path of the queens config file.
     :return: All different queen configurations parsed into a list of dictionaries.
     """
     try:
-      data = self.__loadGeneralConfig("config/queen_config.json")["queens"]
+      data = self.__loadGeneralConfig(path)["queens"]
     except (json.decoder.JSONDecodeError, FileNotFoundError) as e:
       print(f"[ERROR] Cannot read queens config: {e}")
       data = None
@@ -46,8 +50,8 @@ class ConfigManager:
     :param path: The path of the configuration file.
     :return: The configuration parsed into a dictionary.
     """
-    file = open(path)
-    data = json.load(file)
+    with open(path) as file:
+      data = json.load(file)
     return data
 
   def validateSceneConfig(self, config: dict) -> bool:
@@ -99,6 +103,12 @@ class ConfigManager:
                                   "[ERROR] Invalid screen_width value detected in scene config."): return False
     if not self.checkNumberString(config["screen_height"], 0, None,
                                   "[ERROR] Invalid screen_height value detected in scene config."): return False
+    if "world_width" in config:
+      if not self.checkNumberString(config["world_width"], 1, None,
+                                    "[ERROR] Invalid world_width value detected in scene config."): return False
+    if "world_height" in config:
+      if not self.checkNumberString(config["world_height"], 1, None,
+                                    "[ERROR] Invalid world_height value detected in scene config."): return False
     if not self.checkNumberString(config["min_food_available"], 0, None,
                                   "[ERROR] Invalid min_food_available value detected in scene config."): return False
     if not self.checkNumberString(config["start_obstacle_number"], 0, None,
@@ -122,6 +132,17 @@ class ConfigManager:
     if counter > 1.01 or counter < 0.99:
       print("[ERROR] Invalid food_type_ratio value detected in scene config. All values must add up to 1.0")
       return False
+
+    if "update_periods" in config:
+      if type(config["update_periods"]) is not dict:
+        print("[ERROR] Invalid update_periods value detected in scene config. Must map task names to periods.")
+        return False
+      for task, period in config["update_periods"].items():
+        if task not in UpdateScheduler.DEFAULT_PERIODS:
+          print(f"[ERROR] Unknown task <{task}> in update_periods of scene config.")
+          return False
+        if not self.checkNumberString(period, 1, None,
+                                      f"[ERROR] Invalid update period of <{task}> detected in scene config."): return False
     
     return True
 
@@ -159,16 +180,16 @@ class ConfigManager:
         if key not in queen_config["worker_type"]:
           print(f"[ERROR] Cannot find field <{key}> in worker_type config of queen nr. {queen_counter}.")
           return False
-      if queen_config["worker_type"]["behavior"] == "SimpleWorker":
-        pass
-      elif queen_config["worker_type"]["behavior"] == "AdvancedWorker":
-        if "shouting_radius" not in queen_config["worker_type"]:
-          print(f"[ERROR] Cannot find field <shouting_radius> in worker_type config of queen nr. {queen_counter}.")
-          return False
-      else:
-        print(f"[ERROR] Invalid worker_type behavior found. Please choose only between \"SimpleWorker\" or \"AdvancedWorker\"")
+      behavior = queen_config["worker_type"]["behavior"]
+      if not WorkerRegistry.isRegistered(behavior):
+        behavior_names = ", ".join(f"\"{name}\"" for name in WorkerRegistry.getBehaviorNames())
+        print(f"[ERROR] Invalid worker_type behavior found. Please choose only between {behavior_names}")
         return False
-        
+      for key, rules in WorkerRegistry.getSchema(behavior).items():
+        if rules.get("required", False) and key not in queen_config["worker_type"]:
+          print(f"[ERROR] Cannot find field <{key}> in worker_type config of queen nr. {queen_counter}.")
+          return False
+
       queen_counter += 1
 
     return True
@@ -211,7 +232,7 @@ class ConfigManager:
         print(f"[ERROR] Invalid worker_type detected for queen {queen_counter}.")
         return False
 
-      if worker_type["behavior"] != "SimpleWorker" and worker_type["behavior"] != "AdvancedWorker":
+      if not WorkerRegistry.isRegistered(worker_type["behavior"]):
         print(f"[ERROR] Invalid behavior detected for worker_type of queen {queen_counter}.")
         return False
 
@@ -223,6 +244,16 @@ class ConfigManager:
                                     f"[ERROR] Invalid mean_speed detected for worker_type of queen {queen_counter}."): return False
       if not self.checkNumberString(worker_type["speed_range"], 0, None,
                                     f"[ERROR] Invalid speed_range detected for worker_type of queen {queen_counter}."): return False
+      for key, rules in WorkerRegistry.getSchema(worker_type["behavior"]).items():
+        if key not in worker_type:
+          continue
+        if "choices" in rules:
+          if worker_type[key] not in rules["choices"]:
+            choices = " or ".join(f"\"{choice}\"" for choice in rules["choices"])
+            print(f"[ERROR] Invalid {key} detected for worker_type of queen {queen_counter}. Must be {choices}.")
+            return False
+        elif not self.checkNumberString(worker_type[key], rules.get("min"), rules.get("max"),
+                                        f"[ERROR] Invalid {key} detected for worker_type of queen {queen_counter}."): return False
 
       queen_counter += 1
 
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+#
+# Watches the configuration files of a running scene by their modification
+# time. Changed files are loaded and validated with the ConfigManager so the
+# scene can apply them in place without being rebuilt.
+#
+#############################################################################
+
+import os
+import typing
+from .ConfigManager import ConfigManager
+
+
+class ConfigWatcher:
+  def __init__(self, scene_config_path: str = "config/scene_config.json",
+               queens_config_path: str = "config/queen_config.json"):
+    """
+    Constructor. Remembers the current modification times of both config files,
+    so only later changes are reported.
+    :param scene_config_path: The path of the scene config file.
+    :param queens_config_path: The path of the queens config file.
+    """
+    self._config_manager = ConfigManager()
+    self._scene_config_path = scene_config_path
+    self._queens_config_path = queens_config_path
+    self._scene_config_mtime = self._getModificationTime(scene_config_path)
+    self._queens_config_mtime = self._getModificationTime(queens_config_path)
+
+  def pollSceneConfig(self) -> dict:
+    """
+    Checks if the scene config file changed since the last poll.
+    :return: The new scene config if the file changed and is valid. Otherwise None.
+    """
+    mtime = self._getModificationTime(self._scene_config_path)
+    if mtime is None or mtime == self._scene_config_mtime:
+      return None
+    self._scene_config_mtime = mtime
+
+    config = self._config_manager.loadSceneConfig(self._scene_config_path)
+    if not self._config_manager.validateSceneConfig(config):
+      print("[ERROR] Ignoring changed scene config, since it is invalid.")
+      return None
+    return config
+
+  def pollQueensConfig(self) -> list[dict]:
+    """
+    Checks if the queens config file changed since the last poll.
+    :return: The new queens config list if the file changed and is valid. Otherwise None.
+    """
+    mtime = self._getModificationTime(self._queens_config_path)
+    if mtime is None or mtime == self._queens_config_mtime:
+      return None
+    self._queens_config_mtime = mtime
+
+    config = self._config_manager.loadQueensConfig(self._queens_config_path)
+    if not self._config_manager.validateQueensList(config):
+      print("[ERROR] Ignoring changed queens config, since it is invalid.")
+      return None
+    return config
+
+  def _getModificationTime(self, path: str) -> float:
+    """
+    Returns the modification time of a file.
+    :param path: The path of the file.
+    :return: The modification time or None if the file cannot be accessed.
+    """
+    try:
+      return os.stat(path).st_mtime_ns
+    except OSError:
+      return None
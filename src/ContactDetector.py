@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+#
+# Detects all contacts between workers and food sources or queens once per
+# frame. Food and queens are hashed into a coarse SpatialHash, so each worker
+# only needs a single lookup instead of measuring the distance to every food
+# source. The workers consume the detected contacts during their behavior.
+#
+#############################################################################
+
+import typing
+from .SpatialHash import SpatialHash
+
+
+class ContactDetector:
+  def __init__(self, contact_radius: float = 40):
+    """
+    Constructor. Sets up the detector.
+    :param contact_radius: The distance in which a worker touches a food source or a queen.
+    """
+    self._contact_radius = contact_radius
+    self._spatial_hash = SpatialHash(contact_radius)
+
+  def computeContacts(self, entity_lists: "EntityListContainer"):
+    """
+    Stores all food sources each worker touches in its food contacts and flags if it
+    touches its primary queen.
+    :param entity_lists: The container of all entity lists which is managed by the Scene.
+    """
+    cell_size = self._contact_radius
+    squared_radius = self._contact_radius ** 2
+
+    # Every food source and queen is inserted into the cells within the contact radius around it,
+    # so a worker only has to look into its own cell.
+    spatial_hash = self._spatial_hash
+    spatial_hash.clear()
+    for entity_list, is_food in ((entity_lists.food_list, True), (entity_lists.queen_list, False)):
+      for entity in entity_list:
+        spatial_hash.insert((entity, is_food), entity._x - cell_size, entity._y - cell_size,
+                            entity._x + cell_size, entity._y + cell_size)
+    grid = spatial_hash.getCells()
+
+    for worker in entity_lists.worker_list:
+      food_contacts = worker._food_contacts
+      if food_contacts:
+        food_contacts.clear()
+      worker._queen_contact = False
+
+      candidates = grid.get((int(worker._x // cell_size), int(worker._y // cell_size)))
+      if candidates is None:
+        continue
+
+      for entity, is_food in candidates:
+        dx = entity._x - worker._x
+        dy = entity._y - worker._y
+        if dx * dx + dy * dy > squared_radius:
+          continue
+        if is_food:
+          food_contacts.append(entity)
+        elif entity is worker._primary_queen:
+          worker._queen_contact = True
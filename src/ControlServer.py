@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+#
+# An optional local control and query server for a running scene. Runs an
+# asyncio event loop on its own thread and accepts newline separated JSON
+# commands on a TCP or unix socket. The commands are handed to the command
+# queue of the scene and applied at the next tick boundary, so any number of
+# clients can monitor and steer a simulation without slowing down its loop.
+#
+# Example request and response:
+#   {"command": "spawn_food", "x": 100, "y": 200}
+#   {"ok": true, "result": null}
+#
+#############################################################################
+
+import asyncio
+import json
+import os
+import threading
+import typing
+
+
+class ControlServer:
+  # Commands which keep running after the scene applied them, e.g. forked branches, and are
+  # therefore waited for without a timeout.
+  _long_running_commands = ("branch",)
+
+  def __init__(self, scene: "Scene", host: str = "127.0.0.1", port: int = 0, unix_path: str = None,
+               command_timeout: float = 10.0):
+    """
+    Constructor. Does not yet open the socket.
+    :param scene: The scene to control.
+    :param host: The host to listen on for TCP connections.
+    :param port: The TCP port to listen on. If 0, a free port is chosen.
+    :param unix_path: If set, listens on a unix socket at this path instead of TCP.
+    :param command_timeout: The number of seconds a client waits for the scene to apply a command.
+                            Long running commands like branch are waited for until they are done.
+    """
+    self._scene = scene
+    self._host = host
+    self._port = port
+    self._unix_path = unix_path
+    self._command_timeout = command_timeout
+    self._loop = None
+    self._thread = None
+    self._address = None
+    self._start_error = None
+    self._started = threading.Event()
+
+  def start(self):
+    """
+    Opens the socket and starts serving clients on a separate thread.
+    """
+    if self._thread is not None:
+      return
+    self._thread = threading.Thread(target = self._run, daemon = True)
+    self._thread.start()
+    self._started.wait()
+    if self._start_error is not None:
+      self._thread.join()
+      self._thread = None
+      raise self._start_error
+    print(f"[INFO] Control server listening on {self._address}.")
+
+  def stop(self):
+    """
+    Disconnects all clients, closes the socket and joins the server thread.
+    """
+    if self._thread is None:
+      return
+    self._loop.call_soon_threadsafe(self._loop.stop)
+    self._thread.join()
+    self._thread = None
+    self._started.clear()
+
+  def getAddress(self) -> "tuple | str":
+    """
+    Returns the address the server is listening on.
+    :return: A (host, port) tuple for TCP or the socket path for unix sockets.
+    """
+    return self._address
+
+  def _run(self):
+    """
+    Runs the asyncio event loop of the server until it is stopped.
+    """
+    self._loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(self._loop)
+    try:
+      if self._unix_path is not None:
+        server = self._loop.run_until_complete(asyncio.start_unix_server(self._handleClient, self._unix_path))
+        self._address = self._unix_path
+      else:
+        server = self._loop.run_until_complete(asyncio.start_server(self._handleClient, self._host, self._port))
+        self._address = server.sockets[0].getsockname()[:2]
+    except OSError as e:
+      self._start_error = e
+      self._loop.close()
+      self._started.set()
+      return
+
+    self._started.set()
+    try:
+      self._loop.run_forever()
+    finally:
+      server.close()
+      tasks = asyncio.all_tasks(self._loop)
+      for task in tasks:
+        task.cancel()
+      self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions = True))
+      self._loop.run_until_complete(server.wait_closed())
+      self._loop.close()
+      if self._unix_path is not None and os.path.exists(self._unix_path):
+        os.remove(self._unix_path)
+
+  async def _handleClient(self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter"):
+    """
+    Serves a single client. Every received line is one command, answered by one line.
+    :param reader: The stream to read the commands from.
+    :param writer: The stream to write the responses to.
+    """
+    try:
+      while True:
+        line = await reader.readline()
+        if not line:
+          break
+        if not line.strip():
+          continue
+        response = await self._handleRequest(line)
+        writer.write((json.dumps(response) + "\n").encode())
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+      pass
+    finally:
+      writer.close()
+
+  async def _handleRequest(self, line: bytes) -> dict:
+    """
+    Parses a single request and waits for the scene to apply it.
+    :param line: The raw request line.
+    :return: The response to send back to the client.
+    """
+    try:
+      command = json.loads(line)
+    except json.decoder.JSONDecodeError as e:
+      return {"ok": False, "error": f"Invalid JSON: {e}"}
+    if type(command) is not dict or "command" not in command:
+      return {"ok": False, "error": "Requests must be objects with a \"command\" field."}
+
+    future = self._scene.submitCommand(command)
+    timeout = None if command["command"] in self._long_running_commands else self._command_timeout
+    try:
+      result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+      return {"ok": False, "error": "The scene did not apply the command in time. Is it running?"}
+    except Exception as e:
+      return {"ok": False, "error": str(e)}
+    return {"ok": True, "result": result}
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+#
+# A coarse grid shared by all workers of a field worker colony. Every cell
+# holds the estimated distance to the closest food and to the queen. Workers
+# deposit the distances they remember into the cell they are in and read the
+# direction of the best neighboring cell. Once per tick the field ages, so
+# outdated information fades, and is relaxed with vectorized min-filter
+# passes, so information spreads to neighboring cells. Obstacles block the
+# field.
+#
+#############################################################################
+
+import math
+import numpy as np
+import typing
+
+
+class DistanceField:
+  FOOD = 0
+  QUEEN = 1
+
+  # The eight neighbor cells as (dx, dy) and the normalized directions towards them.
+  _offsets = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+  _directions = tuple((dx / math.hypot(dx, dy), dy / math.hypot(dx, dy)) for dx, dy in _offsets)
+
+  def __init__(self, width: int, height: int, cell_size: float, aging_rate: float, relax_passes: int = 1):
+    """
+    Constructor. Sets up an empty field without any known distances.
+    :param width: The width of the scene screen.
+    :param height: The height of the scene screen.
+    :param cell_size: The edge length of a grid cell.
+    :param aging_rate: The distance added to all cells every tick.
+    :param relax_passes: The number of min-filter passes per tick.
+    """
+    self._width = width
+    self._height = height
+    self._cell_size = cell_size
+    self._aging_rate = aging_rate
+    self._relax_passes = relax_passes
+    self._cols = max(1, math.ceil(width / cell_size))
+    self._rows = max(1, math.ceil(height / cell_size))
+    self._step_costs = np.array([math.hypot(dx, dy) * cell_size for dx, dy in self._offsets])
+
+    self._fields = [np.full((self._rows, self._cols), np.inf), np.full((self._rows, self._cols), np.inf)]
+    self._deposit_cells = ([], [])
+    self._deposit_distances = ([], [])
+    self._blocked = np.zeros((self._rows, self._cols), dtype = bool)
+    self._obstacles_changed = True
+
+    # Flat views read by the workers. The fields are only changed in place during the update.
+    self._flat_fields = [field.ravel() for field in self._fields]
+    self._best_neighbors = [np.full(self._rows * self._cols, -1), np.full(self._rows * self._cols, -1)]
+
+  def getSize(self) -> "tuple[int, int]":
+    """
+    Returns the size of the scene screen the field was created for.
+    """
+    return self._width, self._height
+
+  def getCell(self, x: float, y: float) -> int:
+    """
+    Returns the flat index of the cell containing a position.
+    :param x: The x position.
+    :param y: The y position.
+    :return: The cell index.
+    """
+    col = min(max(int(x // self._cell_size), 0), self._cols - 1)
+    row = min(max(int(y // self._cell_size), 0), self._rows - 1)
+    return row * self._cols + col
+
+  def getDistance(self, kind: int, cell: int) -> float:
+    """
+    Returns the distance stored in a cell at the last update.
+    :param kind: DistanceField.FOOD or DistanceField.QUEEN.
+    :param cell: The cell index.
+    :return: The estimated distance. Infinite if unknown.
+    """
+    return self._flat_fields[kind].item(cell)
+
+  def getDirection(self, kind: int, cell: int) -> "tuple[float, float]":
+    """
+    Returns the direction towards the neighbor cell with the lowest distance.
+    :param kind: DistanceField.FOOD or DistanceField.QUEEN.
+    :param cell: The cell index.
+    :return: The normalized direction or None if no neighbor is closer than the cell itself.
+    """
+    neighbor = self._best_neighbors[kind].item(cell)
+    return self._directions[neighbor] if neighbor >= 0 else None
+
+  def invalidateObstacles(self):
+    """
+    Recomputes the cells blocked by obstacles at the next update. Called if an obstacle
+    was spawned, removed or moved.
+    """
+    self._obstacles_changed = True
+
+  def deposit(self, kind: int, cell: int, distance: float):
+    """
+    Lowers the distance of a cell at the next update, if the given distance is lower.
+    :param kind: DistanceField.FOOD or DistanceField.QUEEN.
+    :param cell: The cell index.
+    :param distance: The distance known by a worker in this cell.
+    """
+    self._deposit_cells[kind].append(cell)
+    self._deposit_distances[kind].append(distance)
+
+  def update(self, obstacle_list: list["Obstacle"]):
+    """
+    Applies the deposits, ages and relaxes both fields and refreshes the best neighbors read by
+    the workers. Called once per tick by the queen of the colony.
+    :param obstacle_list: The list of all obstacles in the scene.
+    """
+    self._updateBlockedCells(obstacle_list)
+
+    for kind, field in enumerate(self._fields):
+      field += self._aging_rate
+      if self._deposit_cells[kind]:
+        np.minimum.at(field.ravel(), np.array(self._deposit_cells[kind]), np.array(self._deposit_distances[kind]))
+        self._deposit_cells[kind].clear()
+        self._deposit_distances[kind].clear()
+      field[self._blocked] = np.inf
+
+      for _ in range(self._relax_passes):
+        neighbors = self._getNeighborDistances(field)
+        np.minimum(field, np.min(neighbors + self._step_costs[:, None, None], axis = 0), out = field)
+        field[self._blocked] = np.inf
+
+      neighbors = self._getNeighborDistances(field)
+      best_neighbor = np.argmin(neighbors, axis = 0)
+      improves = np.take_along_axis(neighbors, best_neighbor[None], axis = 0)[0] < field
+      self._best_neighbors[kind] = np.where(improves, best_neighbor, -1).ravel()
+
+  def _getNeighborDistances(self, field: "np.ndarray") -> "np.ndarray":
+    """
+    Stacks the distances of the eight neighbors of every cell. Cells outside the grid are infinite.
+    :param field: The field of shape (rows, cols).
+    :return: The neighbor distances of shape (8, rows, cols).
+    """
+    padded = np.pad(field, 1, constant_values = np.inf)
+    return np.stack([padded[1 + dy:1 + dy + self._rows, 1 + dx:1 + dx + self._cols] for dx, dy in self._offsets])
+
+  def _updateBlockedCells(self, obstacle_list: list["Obstacle"]):
+    """
+    Marks all cells whose center lies within an obstacle. Only recomputed if the obstacles changed.
+    :param obstacle_list: The list of all obstacles in the scene.
+    """
+    if not self._obstacles_changed:
+      return
+    self._obstacles_changed = False
+
+    center_x = (np.arange(self._cols) + 0.5) * self._cell_size
+    center_y = (np.arange(self._rows) + 0.5) * self._cell_size
+    blocked = np.zeros((self._rows, self._cols), dtype = bool)
+    for obstacle in obstacle_list:
+      half_size = obstacle._true_half_size
+      blocked |= (np.abs(center_y - obstacle._y)[:, None] <= half_size) & \
+                 (np.abs(center_x - obstacle._x)[None, :] <= half_size)
+    self._blocked = blocked
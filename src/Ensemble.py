@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+#
+# Simulates many independent worlds of the same configuration at once. All
+# entities are stored in arrays with a leading world dimension and every
+# tick is advanced with shared vectorized kernels for movement, energy decay
+# and contact checks. Meant for statistics over many random seeds, where the
+# per object overhead of one Scene per seed would dominate.
+#
+# Follows the rules of the Scene with SimpleWorker colonies, including the
+# update periods of the scene config and their scaled chances and the
+# workers switching to closer newly spawned food. Only behaviors
+# registered with supports_ensemble are accepted. The advanced worker
+# shouting needs a neighbor search per world and is not supported.
+#
+#############################################################################
+
+import numpy as np
+import typing
+from .WorkerRegistry import WorkerRegistry
+from .UpdateScheduler import UpdateScheduler
+
+
+class Ensemble:
+  def __init__(self, scene_settings: dict, queens_list: list[dict], num_worlds: int, seed: int = None):
+    """
+    Constructor. Sets up all worlds with randomly placed food, obstacles, queens and workers.
+    :param scene_settings: The scene config dictionary shared by all worlds.
+    :param queens_list: The queens config list shared by all worlds.
+    :param num_worlds: The number of independent worlds to simulate.
+    :param seed: The seed of the random generator. If None, a random seed is used.
+    """
+    for queen_description in queens_list:
+      behavior = queen_description["worker_type"]["behavior"]
+      if not WorkerRegistry.supportsEnsemble(behavior):
+        raise ValueError(f"The ensemble mode does not support colonies of the behavior \"{behavior}\".")
+
+    self._rng = np.random.default_rng(seed)
+    self._num_worlds = num_worlds
+    self._width = scene_settings.get("world_width", scene_settings["screen_width"])
+    self._height = scene_settings.get("world_height", scene_settings["screen_height"])
+    self._min_food = int(scene_settings["min_food_available"])
+    self._mean_food_energy = float(scene_settings["mean_food_energy"])
+    self._mean_food_speed = float(scene_settings["mean_food_speed"])
+    self._contact_radius = 40
+    self._worker_jitter = 5
+    self._worker_energy_reduction_rate = 0.1
+    self._tick_counter = 0
+    self._update_scheduler = UpdateScheduler()
+    self._update_scheduler.registerSimulationTasks(scene_settings.get("update_periods"))
+
+    k = num_worlds
+    num_colonies = len(queens_list)
+    self._num_colonies = num_colonies
+
+    # Colony parameters, one value per colony
+    self._queen_speed = np.array([float(queen["speed"]) for queen in queens_list])
+    self._queen_reduction_rate = np.array([float(queen["energy_reduction_rate"]) for queen in queens_list])
+    self._queen_birth_threshold = np.array([float(queen["birth_energy_threshold"]) for queen in queens_list])
+    self._queen_start_energy = np.array([float(queen["energy"]) for queen in queens_list])
+    self._queen_max_energy = np.array([float(queen["max_energy"]) for queen in queens_list])
+    self._queen_spawn_cost = 3
+    self._worker_descriptions = [queen["worker_type"] for queen in queens_list]
+
+    # Queens
+    self._queen_x = self._rng.integers(0, self._width, (k, num_colonies), endpoint = True).astype(float)
+    self._queen_y = self._rng.integers(0, self._height, (k, num_colonies), endpoint = True).astype(float)
+    self._queen_dir_x = self._rng.uniform(-1, 1, (k, num_colonies))
+    self._queen_dir_y = self._rng.uniform(-1, 1, (k, num_colonies))
+    self._queen_energy = np.tile(self._queen_start_energy, (k, 1))
+    self._queen_alive = np.ones((k, num_colonies), dtype = bool)
+    # Like in the Scene, every queen and worker gets its own slot of the sliced tasks.
+    self._queen_update_slot = np.arange(num_colonies)
+    self._next_update_slot = num_colonies
+
+    # Obstacles
+    num_obstacles = int(scene_settings["start_obstacle_number"])
+    self._obstacle_half_size = 100 // 2 + 7
+    self._obstacle_x = self._rng.integers(0, self._width, (k, num_obstacles), endpoint = True).astype(float)
+    self._obstacle_y = self._rng.integers(0, self._height, (k, num_obstacles), endpoint = True).astype(float)
+
+    # Food
+    food_capacity = max(self._min_food, 1)
+    self._food_x = np.zeros((k, food_capacity))
+    self._food_y = np.zeros((k, food_capacity))
+    self._food_dir_x = np.zeros((k, food_capacity))
+    self._food_dir_y = np.zeros((k, food_capacity))
+    self._food_speed = np.zeros((k, food_capacity))
+    self._food_energy = np.zeros((k, food_capacity))
+    self._food_alive = np.zeros((k, food_capacity), dtype = bool)
+    for _ in range(self._min_food):
+      self._spawnFood(np.ones(k, dtype = bool))
+
+    # Workers
+    self._worker_x = np.zeros((k, 0))
+    self._worker_y = np.zeros((k, 0))
+    self._worker_dir_x = np.zeros((k, 0))
+    self._worker_dir_y = np.zeros((k, 0))
+    self._worker_speed = np.zeros((k, 0))
+    self._worker_energy = np.zeros((k, 0))
+    self._worker_alive = np.zeros((k, 0), dtype = bool)
+    self._worker_colony = np.zeros((k, 0), dtype = int)
+    self._worker_has_food = np.zeros((k, 0), dtype = bool)
+    self._worker_target = np.zeros((k, 0), dtype = int)
+    self._worker_update_slot = np.zeros((k, 0), dtype = int)
+    for colony, queen_description in enumerate(queens_list):
+      for _ in range(int(queen_description["start_worker_number"])):
+        self._spawnWorkers(colony, np.ones(k, dtype = bool), 300)
+
+    self._worker_count_series = []
+    self._queen_energy_series = []
+
+  def run(self, num_ticks: int) -> dict:
+    """
+    Advances all worlds by a number of ticks.
+    :param num_ticks: The number of ticks to simulate.
+    :return: The colony time series of all simulated ticks. See getColonyTimeSeries.
+    """
+    for _ in range(num_ticks):
+      self.step()
+    return self.getColonyTimeSeries()
+
+  def step(self):
+    """
+    Advances all worlds by a single tick and records the colony stats.
+    """
+    # Each queen spawns at most one worker per tick, so the worker arrays never need to grow
+    # while the contacts of this tick are in use.
+    free_slots = np.count_nonzero(~self._worker_alive, axis = 1)
+    if np.any(free_slots < self._num_colonies):
+      self._growWorkerCapacity()
+
+    food_contacts, queen_contacts = self._computeContacts()
+    self._behaveFood()
+    self._behaveQueens()
+    self._behaveWorkers(food_contacts, queen_contacts)
+    self._spawnPeriodicFood()
+    self._update_scheduler.advance()
+    self._tick_counter += 1
+
+    self._worker_count_series.append(self.getWorkerNumbers())
+    self._queen_energy_series.append(np.where(self._queen_alive, self._queen_energy, 0.0))
+
+  def getWorkerNumbers(self) -> "np.ndarray":
+    """
+    Returns the current number of workers of every colony in every world.
+    :return: An integer array of shape (worlds, colonies).
+    """
+    counts = np.zeros((self._num_worlds, self._num_colonies), dtype = int)
+    for colony in range(self._num_colonies):
+      counts[:, colony] = np.count_nonzero(self._worker_alive & (self._worker_colony == colony), axis = 1)
+    return counts
+
+  def getColonyTimeSeries(self) -> dict:
+    """
+    Returns the recorded stats of all colonies over all simulated ticks.
+    :return: A dictionary with the arrays "worker_numbers" and "queen_energies" of shape
+             (ticks, worlds, colonies) and the array "queens_alive" of shape (worlds, colonies).
+    """
+    empty_shape = (0, self._num_worlds, self._num_colonies)
+    if self._worker_count_series:
+      worker_numbers = np.stack(self._worker_count_series)
+      queen_energies = np.stack(self._queen_energy_series)
+    else:
+      worker_numbers = np.zeros(empty_shape, dtype = int)
+      queen_energies = np.zeros(empty_shape)
+    return {
+      "worker_numbers": worker_numbers,
+      "queen_energies": queen_energies,
+      "queens_alive": self._queen_alive.copy()
+    }
+
+  def _computeContacts(self) -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Checks all workers for contacts with their targeted food source and the queen of their colony.
+    The workers only take food from their target, so the contacts with all other food sources
+    are never needed.
+    :return: Two boolean arrays of shape (worlds, workers).
+    """
+    squared_radius = self._contact_radius ** 2
+    worlds = np.arange(self._num_worlds)[:, None]
+    target = np.maximum(self._worker_target, 0)
+    food_contacts = ((self._food_x[worlds, target] - self._worker_x) ** 2 +
+                     (self._food_y[worlds, target] - self._worker_y) ** 2 <= squared_radius) & \
+                    (self._worker_target >= 0) & self._food_alive[worlds, target]
+
+    queen_x = np.take_along_axis(self._queen_x, self._worker_colony, axis = 1)
+    queen_y = np.take_along_axis(self._queen_y, self._worker_colony, axis = 1)
+    queen_contacts = (queen_x - self._worker_x) ** 2 + (queen_y - self._worker_y) ** 2 <= squared_radius
+    return food_contacts, queen_contacts
+
+  def _behaveFood(self):
+    """
+    Floats all food sources into their direction and removes the depleted ones.
+    """
+    self._move(self._food_x, self._food_y, self._food_dir_x, self._food_dir_y, self._food_speed, 0,
+               self._food_alive)
+    self._food_alive &= self._food_energy > 0
+
+  def _behaveQueens(self):
+    """
+    Floats all queens around, spawns new workers and reduces the queen energies.
+    """
+    alive = self._queen_alive
+    update_scheduler = self._update_scheduler
+    redirect_chance = update_scheduler.getScaledChance(UpdateScheduler.QUEEN_REDIRECT, 6 / 1001)
+    redirect = alive & update_scheduler.isSlotDue(UpdateScheduler.QUEEN_REDIRECT, self._queen_update_slot) & \
+               (self._rng.random(alive.shape) < redirect_chance)
+    self._queen_dir_x = np.where(redirect, self._rng.uniform(-1, 1, alive.shape), self._queen_dir_x)
+    self._queen_dir_y = np.where(redirect, self._rng.uniform(-1, 1, alive.shape), self._queen_dir_y)
+    self._move(self._queen_x, self._queen_y, self._queen_dir_x, self._queen_dir_y,
+               np.broadcast_to(self._queen_speed, alive.shape), 0, alive)
+
+    for colony in range(self._num_colonies):
+      spawning = alive[:, colony] & (self._queen_energy[:, colony] > self._queen_birth_threshold[colony])
+      if np.any(spawning):
+        self._spawnWorkers(colony, spawning, 40)
+        self._queen_energy[spawning, colony] -= self._queen_spawn_cost
+
+    corrected_reduction = np.maximum((self._queen_energy - self._queen_start_energy) / 1500, 0)
+    reduction = np.where(self._queen_energy > 0, self._queen_reduction_rate + corrected_reduction, 0)
+    self._queen_energy -= np.where(alive, reduction, 0)
+    self._queen_alive &= self._queen_energy > 0
+
+  def _behaveWorkers(self, food_contacts: "np.ndarray", queen_contacts: "np.ndarray"):
+    """
+    Performs the SimpleWorker behavior for all workers of all worlds.
+    :param food_contacts: The contacts with the targeted food detected at the beginning of the tick.
+    :param queen_contacts: The worker queen contacts detected at the beginning of the tick.
+    """
+    alive = self._worker_alive
+    worlds = np.arange(self._num_worlds)[:, None]
+    colony = self._worker_colony
+    queen_alive = np.take_along_axis(self._queen_alive, colony, axis = 1) & alive
+    queen_contacts = queen_contacts & queen_alive
+
+    # Take food from the targeted food source and feed the queen (twice, as the SimpleWorker does)
+    for _ in range(2):
+      giving = self._worker_has_food & queen_contacts
+      if np.any(giving):
+        np.add.at(self._queen_energy, (np.nonzero(giving)[0], colony[giving]), 1)
+        self._worker_has_food &= ~giving
+        self._worker_target[giving] = -1
+
+      taking = queen_alive & ~self._worker_has_food & (self._worker_target >= 0) & food_contacts
+      if np.any(taking):
+        self._takeFood(taking)
+
+    # Retarget to the closest food source if the targeted one is gone, in the slice of the food search
+    queen_energy = np.take_along_axis(self._queen_energy, colony, axis = 1)
+    active = queen_alive & (queen_energy <= self._queen_max_energy[colony])
+    target = np.maximum(self._worker_target, 0)
+    target_alive = (self._worker_target >= 0) & self._food_alive[worlds, target]
+    retarget = active & ~target_alive & \
+               self._update_scheduler.isSlotDue(UpdateScheduler.FOOD_SEARCH, self._worker_update_slot)
+    if np.any(retarget):
+      # Only the distances of the retargeting workers are computed
+      retarget_worlds, retarget_workers = np.nonzero(retarget)
+      distances = (self._food_x[retarget_worlds] - self._worker_x[retarget_worlds, retarget_workers, None]) ** 2 + \
+                  (self._food_y[retarget_worlds] - self._worker_y[retarget_worlds, retarget_workers, None]) ** 2
+      distances[~self._food_alive[retarget_worlds]] = np.inf
+      closest = np.argmin(distances, axis = 1)
+      self._worker_target[retarget_worlds, retarget_workers] = \
+        np.where(np.isfinite(distances[np.arange(len(closest)), closest]), closest, -1)
+      target = np.maximum(self._worker_target, 0)
+      target_alive = (self._worker_target >= 0) & self._food_alive[worlds, target]
+
+    # Choose the direction
+    to_queen = active & self._worker_has_food
+    to_food = active & ~self._worker_has_food & target_alive
+    goal_x = np.where(to_queen, np.take_along_axis(self._queen_x, colony, axis = 1), self._food_x[worlds, target])
+    goal_y = np.where(to_queen, np.take_along_axis(self._queen_y, colony, axis = 1), self._food_y[worlds, target])
+    direction_x = goal_x - self._worker_x
+    direction_y = goal_y - self._worker_y
+    length = np.sqrt(direction_x ** 2 + direction_y ** 2)
+    safe_length = np.where(length != 0, length, 1)
+    directed = to_queen | to_food
+    self._worker_dir_x = np.where(directed, np.where(length != 0, direction_x / safe_length, 0),
+                                  self._rng.uniform(-1, 1, alive.shape))
+    self._worker_dir_y = np.where(directed, np.where(length != 0, direction_y / safe_length, 0),
+                                  self._rng.uniform(-1, 1, alive.shape))
+
+    self._move(self._worker_x, self._worker_y, self._worker_dir_x, self._worker_dir_y, self._worker_speed,
+               self._worker_jitter, alive)
+
+    self._worker_energy -= np.where(alive & (self._worker_energy > 0), self._worker_energy_reduction_rate, 0)
+    self._worker_alive &= self._worker_energy > 0
+
+  def _takeFood(self, taking: "np.ndarray"):
+    """
+    Lets workers take a unit of energy from their targeted food source. As in the Scene, every
+    taker of a food source only gets food while its energy is above 0, so the takers of a food
+    source are ranked in the order they behave and the rank has to be below the energy.
+    :param taking: The mask of workers of shape (worlds, workers) trying to take food.
+    """
+    taking_worlds, taking_workers = np.nonzero(taking)
+    target = self._worker_target[taking_worlds, taking_workers]
+    food_keys = taking_worlds * self._food_energy.shape[1] + target
+    order = np.argsort(food_keys, kind = "stable")
+    sorted_keys = food_keys[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(sorted_keys)])
+    ranks = np.empty(len(order), dtype = int)
+    ranks[order] = np.arange(len(order)) - np.repeat(group_starts, group_sizes)
+
+    food_energy = self._food_energy[taking_worlds, target]
+    getting = ranks < food_energy
+    self._worker_has_food[taking_worlds, taking_workers] = getting
+    self._worker_target[taking_worlds, taking_workers] = -1
+    group_food = order[group_starts]
+    self._food_energy[taking_worlds[group_food], target[group_food]] -= \
+      np.minimum(group_sizes, np.maximum(np.ceil(food_energy[group_food]), 0))
+
+  def _move(self, x: "np.ndarray", y: "np.ndarray", dir_x: "np.ndarray", dir_y: "np.ndarray",
+            speed: "np.ndarray", jitter: int, alive: "np.ndarray"):
+    """
+    Performs a single movement step for a batch of entities in place, including the bouncing
+    off the screen borders and the obstacles. Equivalent to Entity.performMovement.
+    :param x: The x positions of shape (worlds, entities).
+    :param y: The y positions of shape (worlds, entities).
+    :param dir_x: The x directions of shape (worlds, entities).
+    :param dir_y: The y directions of shape (worlds, entities).
+    :param speed: The speeds of shape (worlds, entities).
+    :param jitter: The strength of the movement jitter.
+    :param alive: The mask of entities which exist.
+    """
+    new_x = x + dir_x * speed
+    new_y = y + dir_y * speed
+    if jitter:
+      new_x += self._rng.integers(0, jitter, x.shape, endpoint = True) * self._rng.integers(-1, 1, x.shape, endpoint = True)
+      new_y += self._rng.integers(0, jitter, y.shape, endpoint = True) * self._rng.integers(-1, 1, y.shape, endpoint = True)
+
+    outside_x = (new_x < 0) | (new_x > self._width)
+    outside_y = (new_y < 0) | (new_y > self._height)
+    dir_x[outside_x] *= -1
+    dir_y[outside_y] *= -1
+    np.clip(new_x, 0, self._width, out = new_x)
+    np.clip(new_y, 0, self._height, out = new_y)
+
+    half_size = self._obstacle_half_size
+    for obstacle in range(self._obstacle_x.shape[1]):
+      obstacle_x = self._obstacle_x[:, obstacle:obstacle + 1]
+      obstacle_y = self._obstacle_y[:, obstacle:obstacle + 1]
+      colliding = (x > obstacle_x - half_size) & (x < obstacle_x + half_size) & \
+                  (y > obstacle_y - half_size) & (y < obstacle_y + half_size)
+      if not np.any(colliding):
+        continue
+      top_dist = np.abs(new_y - (obstacle_y - half_size))
+      right_dist = np.abs(new_x - (obstacle_x + half_size))
+      bottom_dist = np.abs(new_y - (obstacle_y + half_size))
+      left_dist = np.abs(new_x - (obstacle_x - half_size))
+      vertical = np.minimum(top_dist, bottom_dist) < np.minimum(right_dist, left_dist)
+
+      bounce_y = colliding & vertical
+      bounce_x = colliding & ~vertical
+      dir_y[bounce_y] *= -1
+      dir_x[bounce_x] *= -1
+      new_y = np.where(bounce_y, np.where(top_dist < bottom_dist, obstacle_y - half_size, obstacle_y + half_size), new_y)
+      new_x = np.where(bounce_x, np.where(left_dist < right_dist, obstacle_x - half_size, obstacle_x + half_size), new_x)
+
+    x[alive] = new_x[alive]
+    y[alive] = new_y[alive]
+
+  def _spawnFood(self, spawning: "np.ndarray") -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Spawns a single randomly placed food source in every selected world with a free food slot.
+    :param spawning: The mask of worlds to spawn food in.
+    :return: The worlds food was spawned in and the food slots used in them.
+    """
+    free = ~self._food_alive
+    spawning = spawning & np.any(free, axis = 1)
+    worlds = np.nonzero(spawning)[0]
+    if len(worlds) == 0:
+      return worlds, worlds
+    slots = np.argmax(free[worlds], axis = 1)
+    num = len(worlds)
+    self._food_x[worlds, slots] = self._rng.integers(0, self._width, num, endpoint = True)
+    self._food_y[worlds, slots] = self._rng.integers(0, self._height, num, endpoint = True)
+    self._food_dir_x[worlds, slots] = self._rng.uniform(-1, 1, num)
+    self._food_dir_y[worlds, slots] = self._rng.uniform(-1, 1, num)
+    self._food_speed[worlds, slots] = self._rng.integers(int(self._mean_food_speed / 2), int(self._mean_food_speed * 2),
+                                                         num, endpoint = True)
+    self._food_energy[worlds, slots] = self._rng.integers(int(self._mean_food_energy / 2), int(self._mean_food_energy * 2),
+                                                          num, endpoint = True)
+    self._food_alive[worlds, slots] = True
+    return worlds, slots
+
+  def _spawnPeriodicFood(self):
+    """
+    Spawns with a certain probability, if too few food sources are present in a world. Only checked
+    once per period of the food spawn task, with a chance scaled by the period.
+    """
+    update_scheduler = self._update_scheduler
+    if not update_scheduler.isDue(UpdateScheduler.FOOD_SPAWN):
+      return
+    too_few = np.count_nonzero(self._food_alive, axis = 1) < self._min_food
+    spawn_chance = update_scheduler.getScaledChance(UpdateScheduler.FOOD_SPAWN, 9 / 101)
+    lucky = self._rng.random(self._num_worlds) < spawn_chance
+    worlds, slots = self._spawnFood(too_few & lucky)
+    if len(worlds):
+      self._retargetToCloserFood(worlds, slots)
+
+  def _retargetToCloserFood(self, worlds: "np.ndarray", slots: "np.ndarray"):
+    """
+    Switches every worker with a target to the food source spawned in its world if it is closer
+    than the current target, like the TargetTracker of the Scene. Workers still targeting the
+    depleted food source of a reused slot have no target in the Scene, so they lose it first.
+    :param worlds: The worlds a food source was spawned in.
+    :param slots: The food slots of the spawned food sources in these worlds.
+    """
+    rows = np.arange(len(worlds))[:, None]
+    new_slots = slots[:, None]
+    target = self._worker_target[worlds]
+    target[target == new_slots] = -1
+    current = np.maximum(target, 0)
+    has_target = (target >= 0) & self._food_alive[worlds][rows, current]
+
+    x = self._worker_x[worlds]
+    y = self._worker_y[worlds]
+    food_x = self._food_x[worlds]
+    food_y = self._food_y[worlds]
+    current_distances = (food_x[rows, current] - x) ** 2 + (food_y[rows, current] - y) ** 2
+    new_distances = (food_x[rows, new_slots] - x) ** 2 + (food_y[rows, new_slots] - y) ** 2
+    self._worker_target[worlds] = np.where(has_target & (new_distances < current_distances), new_slots, target)
+
+  def _spawnWorkers(self, colony: int, spawning: "np.ndarray", spawn_distance: int):
+    """
+    Spawns a single worker around the queen of a colony in every selected world.
+    :param colony: The colony to spawn the workers for.
+    :param spawning: The mask of worlds to spawn a worker in.
+    :param spawn_distance: The radius to spawn the workers around the queen.
+    """
+    free = ~self._worker_alive
+    if not np.all(np.any(free[spawning], axis = 1)):
+      self._growWorkerCapacity()
+      free = ~self._worker_alive
+
+    worlds = np.nonzero(spawning)[0]
+    slots = np.argmax(free[worlds], axis = 1)
+    num = len(worlds)
+    description = self._worker_descriptions[colony]
+
+    queen_x = self._queen_x[worlds, colony].astype(int)
+    queen_y = self._queen_y[worlds, colony].astype(int)
+    self._worker_x[worlds, slots] = self._rng.integers(np.maximum(0, queen_x - spawn_distance),
+                                                       np.minimum(self._width, queen_x + spawn_distance), endpoint = True)
+    self._worker_y[worlds, slots] = self._rng.integers(np.maximum(0, queen_y - spawn_distance),
+                                                       np.minimum(self._height, queen_y + spawn_distance), endpoint = True)
+    self._worker_energy[worlds, slots] = self._rng.integers(
+      int(description["mean_energy"] - max(description["energy_range"], 1)),
+      int(description["mean_energy"] + description["energy_range"]), num, endpoint = True)
+    self._worker_speed[worlds, slots] = self._rng.integers(
+      int(description["mean_speed"] - max(description["speed_range"], 1)),
+      int(description["mean_speed"] + description["speed_range"]), num, endpoint = True)
+    self._worker_dir_x[worlds, slots] = 0
+    self._worker_dir_y[worlds, slots] = 0
+    self._worker_colony[worlds, slots] = colony
+    self._worker_has_food[worlds, slots] = False
+    self._worker_target[worlds, slots] = -1
+    self._worker_update_slot[worlds, slots] = self._next_update_slot
+    self._next_update_slot += 1
+    self._worker_alive[worlds, slots] = True
+
+  def _growWorkerCapacity(self):
+    """
+    Doubles the number of worker slots of all worlds.
+    """
+    extension = max(self._worker_x.shape[1], 64)
+
+    def grow(values, fill):
+      return np.concatenate([values, np.full((self._num_worlds, extension), fill, dtype = values.dtype)], axis = 1)
+
+    self._worker_x = grow(self._worker_x, 0)
+    self._worker_y = grow(self._worker_y, 0)
+    self._worker_dir_x = grow(self._worker_dir_x, 0)
+    self._worker_dir_y = grow(self._worker_dir_y, 0)
+    self._worker_speed = grow(self._worker_speed, 0)
+    self._worker_energy = grow(self._worker_energy, 0)
+    self._worker_alive = grow(self._worker_alive, False)
+    self._worker_colony = grow(self._worker_colony, 0)
+    self._worker_has_food = grow(self._worker_has_food, False)
+    self._worker_target = grow(self._worker_target, -1)
+    self._worker_update_slot = grow(self._worker_update_slot, 0)
@@ -12,9 +12,15 @@ import pygame
 import random
 import math
 import typing
+from .EventBus import EventBus
 
 
 class Entity:
+  __slots__ = ("_x", "_y", "_dir_x", "_dir_y", "_speed", "_energy", "_color", "_update_slot")
+
+  _shadow_color = (40, 40, 40)
+  _shadow_distance = 7
+
   def __init__(self, x: int, y: int):
     """
     Constructor. Sets all default values for an entity and places it to
@@ -24,12 +30,12 @@ class Entity:
     """
     self._x = x
     self._y = y
-    self._direction = [0, 0]
+    self._dir_x = 0
+    self._dir_y = 0
     self._speed = 0
     self._energy = 100
     self._color = (255, 255, 255)
-    self._shadow_color = (40, 40, 40)
-    self._shadow_distance = 7
+    self._update_slot = None
 
   def setPosition(self, x: int, y: int):
     """
@@ -44,7 +50,8 @@ class Entity:
     """
     Randomly sets a movement direction of the entity.
     """
-    self._direction = [random.uniform(-1, 1), random.uniform(-1, 1)]
+    self._dir_x = random.uniform(-1, 1)
+    self._dir_y = random.uniform(-1, 1)
 
   def setRandomSpeed(self, min: int, max: int):
     """
@@ -107,6 +114,24 @@ class Entity:
 
     return normalized_direction
 
+  def setDirectionTo(self, target_entity: "Entity"):
+    """
+    Sets the movement direction towards another entity. Same as computeDirection, but
+    writes the normalized direction in place without allocating a new vector.
+    :param target_entity: The entity to move towards.
+    """
+    dx = target_entity._x - self._x
+    dy = target_entity._y - self._y
+
+    length = math.sqrt(dx * dx + dy * dy)
+
+    if length != 0:
+      self._dir_x = dx / length
+      self._dir_y = dy / length
+    else:
+      self._dir_x = 0
+      self._dir_y = 0
+
   def performMovement(self, entity_lists: "EntityListContainer", width: int, height: int, jitter: int):
     """
     Performs a single movement step based on current speed and direction.
@@ -117,16 +142,25 @@ class Entity:
                    is skewed to. Gives movements a more natural feeling. If set to 0, there is no
                    movement jitter.
     """
-    new_x = self._x + (self._direction[0] * self._speed + random.randint(0, jitter) * random.randint(-1, 1))
-    new_y = self._y + (self._direction[1] * self._speed + random.randint(0, jitter) * random.randint(-1, 1))
-
-    if new_x < 0 or new_x > width:
-      self._direction[0] *= -1
-    new_x = max(0, min(width, new_x))
-
-    if new_y < 0 or new_y > height:
-      self._direction[1] *= -1
-    new_y = max(0, min(height, new_y))
+    new_x = self._x + self._dir_x * self._speed
+    new_y = self._y + self._dir_y * self._speed
+    if jitter:
+      new_x += random.randint(0, jitter) * random.randint(-1, 1)
+      new_y += random.randint(0, jitter) * random.randint(-1, 1)
+
+    if new_x < 0:
+      self._dir_x = -self._dir_x
+      new_x = 0
+    elif new_x > width:
+      self._dir_x = -self._dir_x
+      new_x = width
+
+    if new_y < 0:
+      self._dir_y = -self._dir_y
+      new_y = 0
+    elif new_y > height:
+      self._dir_y = -self._dir_y
+      new_y = height
 
     for obstacle in entity_lists.obstacle_list:
       if obstacle.checkCollision(self):
@@ -136,13 +170,13 @@ class Entity:
         left_dist = abs(new_x - (obstacle._x - obstacle._half_size))
         
         if min(top_dist, bottom_dist) < min(right_dist, left_dist):
-          self._direction[1] *= -1
+          self._dir_y = -self._dir_y
           if top_dist < bottom_dist:
             new_y = obstacle._y - obstacle._half_size
           else:
             new_y = obstacle._y + obstacle._half_size
         else:
-          self._direction[0] *= -1
+          self._dir_x = -self._dir_x
           if left_dist < right_dist:
             new_x = obstacle._x - obstacle._half_size
           else:
@@ -150,12 +184,22 @@ class Entity:
 
     self._x, self._y = new_x, new_y
 
-  def render(self, screen: "pygame.Screen"):
+  def render(self, screen: "pygame.Screen", camera: "Camera"):
     """
-    Interface for the rendering method. Called by the scene every frame.
+    Interface for the rendering method. Called by the scene every frame for entities within the viewport.
     :param screen: The pygame screen object to render to.
+    :param camera: The camera converting world positions into screen positions.
+    """
+    x, y = camera.toScreen(self._x, self._y)
+    pygame.draw.rect(screen, self._color, (x, y, 10 * camera.getZoom(), 10 * camera.getZoom()))
+
+  def getRenderRect(self) -> "tuple[int, int, int, int]":
+    """
+    Returns the world area covered by the entity and its shadow. Used by the scene to cull
+    entities outside the viewport and to only update the changed parts of the screen.
+    :return: The rectangle as (left, top, width, height).
     """
-    pygame.draw.rect(screen, self._color, (self._x, self._y), 10, 10)
+    return int(self._x) - 12, int(self._y) - 12, 24 + self._shadow_distance, 24 + self._shadow_distance
 
   def checkAlive(self):
     """
@@ -184,6 +228,7 @@ class Entity:
     :param entity_lists: The container of all entity lists which is managed by the Scene.
     """
     entity_lists.entity_list.remove(self)
+    entity_lists.event_bus.emit(EventBus.DEATH, self)
 
   def behave(self, entity_lists: "EntityListContainer", width: int, height: int):
     """
@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 #
 # A container managed by the scene, which contains all entity lists.
+# Also holds the pool of dead workers waiting for reuse, the event bus
+# announcing spawned, killed and dragged entities and the scheduler of work
+# spread over several ticks.
 #
 #############################################################################
 
+from .WorkerPool import WorkerPool
+from .EventBus import EventBus
+from .UpdateScheduler import UpdateScheduler
+
 class EntityListContainer:
   def __init__(self):
     self.entity_list = []
     self.food_list = []
     self.worker_list = []
     self.queen_list = []
-    self.obstacle_list = []
\ No newline at end of file
+    self.obstacle_list = []
+    self.worker_pool = WorkerPool()
+    self.event_bus = EventBus()
+    self.update_scheduler = UpdateScheduler()
\ No newline at end of file
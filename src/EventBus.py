@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+#
+# A simple synchronous event bus for the entity lifecycle of a scene. The
+# scene and the kill methods of the entities emit spawn, death and drag
+# events, so subscribers can update their state exactly when something
+# changes instead of polling the entity lists every tick.
+#
+#############################################################################
+
+import typing
+
+
+class EventBus:
+  SPAWN = "spawn"
+  DEATH = "death"
+  DRAG = "drag"
+
+  def __init__(self):
+    """
+    Constructor. Sets up an event bus without subscribers.
+    """
+    self._subscribers = {EventBus.SPAWN: [], EventBus.DEATH: [], EventBus.DRAG: []}
+
+  def subscribe(self, event_type: str, callback: typing.Callable):
+    """
+    Registers a callback for an event type. Callbacks are called in the order they subscribed.
+    :param event_type: One of EventBus.SPAWN, EventBus.DEATH or EventBus.DRAG.
+    :param callback: The function called with the affected entity.
+    """
+    self._subscribers[event_type].append(callback)
+
+  def unsubscribe(self, event_type: str, callback: typing.Callable):
+    """
+    Removes a previously registered callback.
+    :param event_type: The event type the callback was registered for.
+    :param callback: The callback to remove.
+    """
+    if callback in self._subscribers[event_type]:
+      self._subscribers[event_type].remove(callback)
+
+  def emit(self, event_type: str, entity: "Entity"):
+    """
+    Calls all callbacks registered for an event type right away.
+    :param event_type: One of EventBus.SPAWN, EventBus.DEATH or EventBus.DRAG.
+    :param entity: The entity which spawned, died or was dragged. Dead entities are
+                   already removed from all entity lists.
+    """
+    for callback in self._subscribers[event_type]:
+      callback(entity)
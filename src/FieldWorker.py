@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+#
+# The class for the FieldWorker, which shares location information through a
+# coarse distance field of its colony instead of shouting to its neighbors.
+# Every worker only reads and writes the cell it is in, so its cost does not
+# depend on how crowded the colony is.
+#
+#############################################################################
+
+import pygame
+import random
+import typing
+from .WorkerBase import WorkerBase
+from .DistanceField import DistanceField
+
+
+class FieldWorker(WorkerBase):
+  __slots__ = ("_internal_queen_distance", "_internal_food_distance")
+
+  def __init__(self, x: int, y: int, energy: float, speed: int):
+    """
+    Constructor. Setup a default worker.
+    :param x: The x position of the worker.
+    :param y: The y position of the worker.
+    :param energy: The starting energy of the worker.
+    :param speed: The movement speed of the worker.
+    """
+    super().__init__(x, y, energy)
+    self.setRandomDirection()
+    self._speed = speed
+    self._internal_queen_distance = 99999
+    self._internal_food_distance = 99999
+
+  def respawn(self, x: int, y: int, energy: float, speed: int):
+    """
+    Resets a dead worker, so it can be reused for a new birth.
+    :param x: The x position of the worker.
+    :param y: The y position of the worker.
+    :param energy: The starting energy of the worker.
+    :param speed: The movement speed of the worker.
+    """
+    super().respawn(x, y, energy)
+    self.setRandomDirection()
+    self._speed = speed
+    self._internal_queen_distance = 99999
+    self._internal_food_distance = 99999
+
+  def render(self, screen: "pygame.Screen", camera: "Camera"):
+    """
+    Renders the worker on the screen.
+    :param screen: The screen to render the worker on.
+    :param camera: The camera converting world positions into screen positions.
+    """
+    zoom = camera.getZoom()
+    x, y = camera.toScreen(self._x, self._y)
+    pygame.draw.circle(screen, self._color, (x, y), max(4 * zoom, 1))
+    if self._has_food:
+      pygame.draw.circle(screen, self._food_color, (x, y + 3 * zoom), max(2 * zoom, 1))
+
+  def takeFood(self):
+    """
+    Takes food bite if it touches any and if it does not hold food. Then turns around.
+    """
+    if self._has_food:
+      return
+
+    for food in self._food_contacts:
+      self._has_food = food.reduceEnergy(1)
+      self._food_color = food.getColor()
+      self.turnAround()
+
+  def giveFoodToQueen(self):
+    """
+    Gives food to the queen if it touches it and holds food. Then turns around.
+    """
+    if self._primary_queen is None:
+      return
+    if not self._has_food:
+      return
+
+    if self._queen_contact:
+      self._primary_queen.increaseEnergy(1)
+      self._has_food = False
+      self.turnAround()
+
+  def turnAround(self):
+    """
+    Reversed the direction to turn around 180 degree.
+    """
+    self._dir_x = -self._dir_x
+    self._dir_y = -self._dir_y
+
+  def exchangeWithField(self, distance_field: "DistanceField"):
+    """
+    Core part of the field worker algorithm. Takes over lower distances from the cell the
+    worker is in, deposits its own lower distances into the cell and turns towards the
+    neighbor cell closest to the food or queen, depending on whether it holds food.
+    :param distance_field: The distance field of the colony.
+    """
+    cell = distance_field.getCell(self._x, self._y)
+
+    food_distance = distance_field.getDistance(DistanceField.FOOD, cell)
+    if food_distance < self._internal_food_distance:
+      self._internal_food_distance = food_distance
+    elif self._internal_food_distance < food_distance:
+      distance_field.deposit(DistanceField.FOOD, cell, self._internal_food_distance)
+
+    queen_distance = distance_field.getDistance(DistanceField.QUEEN, cell)
+    if queen_distance < self._internal_queen_distance:
+      self._internal_queen_distance = queen_distance
+    elif self._internal_queen_distance < queen_distance:
+      distance_field.deposit(DistanceField.QUEEN, cell, self._internal_queen_distance)
+
+    direction = distance_field.getDirection(DistanceField.QUEEN if self._has_food else DistanceField.FOOD, cell)
+    if direction is not None:
+      self._dir_x, self._dir_y = direction
+
+  def behave(self, entity_lists: "EntityListContainer", width: int, height: int):
+    """
+    Contains all methods required for the behavior of the field workers. Called every frame.
+    The contacts with food and the queen are detected by the scene at the beginning of the
+    frame, so they are handled before the movement of this frame.
+    :param entity_lists: The container of all entity lists which is managed by the Scene.
+    :param width: The width of the scene screen.
+    :param height: The height of the scene screen.
+    """
+    self._internal_queen_distance += self._speed
+    self._internal_food_distance += self._speed
+    if self._food_contacts:
+      self._internal_food_distance = 0
+    if self._queen_contact:
+      self._internal_queen_distance = 0
+
+    self.giveFoodToQueen()
+    self.takeFood()
+
+    if self._primary_queen is None or self._primary_queen._energy > self._primary_queen._max_energy:
+      self.moveRandomly()
+    else:
+      self.exchangeWithField(self._primary_queen.getDistanceField(width, height))
+
+    self.performMovement(entity_lists, width, height, 5)
+
+    self.reduceEnergy(self._energy_reduction_rate)
+
+    return self.checkAlive()
+
+  def __str__(self):
+    return f"<Field Worker {self._x}:{self._y}>"
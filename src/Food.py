@@ -9,8 +9,11 @@ import pygame
 import random
 import typing
 from .Entity import Entity
+from .EventBus import EventBus
 
 class Food(Entity):
+  __slots__ = ("_type", "_sec_color", "_targeting_workers")
+
   def __init__(self, x: int, y: int, energy: float, speed: int, type: int):
     """
     Constructor. Sets up the food.
@@ -26,6 +29,7 @@ class Food(Entity):
     self.setRandomEnergy(energy / 2, energy * 2)
 
     self._type = type
+    self._targeting_workers = {}
 
     if self._type == 0:
       self._color = (0, 150, 0)
@@ -40,26 +44,39 @@ class Food(Entity):
                        self._color[1] / 2,
                        self._color[2] / 2)
 
-  def renderShadow(self, screen: "pygame.Screen"):
+  def renderShadow(self, screen: "pygame.Screen", camera: "Camera"):
     """
     Renders the shadow of the food onto screen.
     :param screen: The screen to render the shadow on.
+    :param camera: The camera converting world positions into screen positions.
     """
     size = self._energy / 10
     if size <= 1:
       size = 1
-    pygame.draw.circle(screen, self._shadow_color, (self._x + self._shadow_distance, self._y + self._shadow_distance), size)
+    x, y = camera.toScreen(self._x + self._shadow_distance, self._y + self._shadow_distance)
+    pygame.draw.circle(screen, self._shadow_color, (x, y), size * camera.getZoom())
+
+  def getRenderRect(self) -> "tuple[int, int, int, int]":
+    """
+    Returns the world area covered by the food and its shadow.
+    :return: The rectangle as (left, top, width, height).
+    """
+    size = int(max(self._energy / 10, 1)) + 2
+    return int(self._x) - size, int(self._y) - size, 2 * size + self._shadow_distance + 1, 2 * size + self._shadow_distance + 1
 
-  def render(self, screen: "pygame.Screen"):
+  def render(self, screen: "pygame.Screen", camera: "Camera"):
     """
     Renders the food onto screen.
     :param screen: The screen to render the food on.
+    :param camera: The camera converting world positions into screen positions.
     """
     size = self._energy / 10
     if size <= 1:
       size = 1
-    pygame.draw.circle(screen, self._color, (self._x, self._y), size)
-    pygame.draw.circle(screen, self._sec_color, (self._x, self._y), size * 0.6)
+    size *= camera.getZoom()
+    x, y = camera.toScreen(self._x, self._y)
+    pygame.draw.circle(screen, self._color, (x, y), size)
+    pygame.draw.circle(screen, self._sec_color, (x, y), size * 0.6)
 
   def behave(self, entity_lists: "EntityListContainer", width: int, height: int):
     """
@@ -78,6 +95,7 @@ class Food(Entity):
     """
     entity_lists.entity_list.remove(self)
     entity_lists.food_list.remove(self)
+    entity_lists.event_bus.emit(EventBus.DEATH, self)
 
   def __str__(self):
     return f"<Food {int(self._x)}:{int(self._y)}>"
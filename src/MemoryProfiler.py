@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+#
+# Measures the memory footprint of a scene broken down by entity type and by
+# the larger containers the entities own. Combines per-class counts and sizes
+# with a tracemalloc snapshot, and reports the growth since the last report
+# so leaks and bloat become visible during long runs.
+#
+#############################################################################
+
+import sys
+import tracemalloc
+import typing
+
+
+class MemoryProfiler:
+  def __init__(self, top_allocations: int = 10):
+    """
+    Constructor. Does not yet start tracing the memory allocations.
+    :param top_allocations: The number of allocation sites with the highest growth listed in a report.
+    """
+    self._top_allocations = top_allocations
+    self._previous_report = None
+    self._previous_snapshot = None
+
+  def start(self):
+    """
+    Starts tracing the memory allocations with tracemalloc. Slows down the simulation a bit.
+    """
+    if not tracemalloc.is_tracing():
+      tracemalloc.start()
+
+  def stop(self):
+    """
+    Stops tracing the memory allocations and forgets the last snapshot.
+    """
+    if tracemalloc.is_tracing():
+      tracemalloc.stop()
+    self._previous_snapshot = None
+
+  def takeReport(self, entity_lists: "EntityListContainer") -> dict:
+    """
+    Measures the current memory footprint of all entities in the scene.
+    :param entity_lists: The container of all entity lists which is managed by the Scene.
+    :return: A dictionary with the categories, the traced memory and the top allocation sites.
+             Every category contains its count, its size in bytes and the growth of both since
+             the last report.
+    """
+    categories = {}
+
+    def addToCategory(name, count, size):
+      category = categories.setdefault(name, {"count": 0, "bytes": 0})
+      category["count"] += count
+      category["bytes"] += size
+
+    for entity in entity_lists.entity_list:
+      addToCategory(type(entity).__name__, 1, self.computeEntitySize(entity))
+
+      food_contacts = getattr(entity, "_food_contacts", None)
+      if food_contacts is not None:
+        addToCategory("Contact lists", 1, sys.getsizeof(food_contacts))
+
+    for queen in entity_lists.queen_list:
+      addToCategory("Queen worker lists", 1, sys.getsizeof(queen._worker_list))
+      addToCategory("Neighbor caches", 1, self.computeNeighborCacheSize(queen._neighbor_cache))
+      if queen._distance_field is not None:
+        addToCategory("Distance fields", 1, sum(field.nbytes for field in queen._distance_field._fields))
+
+    for name in ("entity_list", "food_list", "worker_list", "queen_list", "obstacle_list"):
+      addToCategory("Scene entity lists", 1, sys.getsizeof(getattr(entity_lists, name)))
+
+    for pool in entity_lists.worker_pool._pools.values():
+      addToCategory("Worker pool", len(pool),
+                    sys.getsizeof(pool) + sum(self.computeEntitySize(worker) for worker in pool))
+
+    previous_categories = {} if self._previous_report is None else self._previous_report["categories"]
+    for name, category in categories.items():
+      previous_category = previous_categories.get(name, {"count": 0, "bytes": 0})
+      category["count_delta"] = category["count"] - previous_category["count"]
+      category["bytes_delta"] = category["bytes"] - previous_category["bytes"]
+
+    report = {
+      "categories": categories,
+      "traced_bytes": None,
+      "traced_peak_bytes": None,
+      "top_allocations": []
+    }
+
+    if tracemalloc.is_tracing():
+      report["traced_bytes"], report["traced_peak_bytes"] = tracemalloc.get_traced_memory()
+      snapshot = tracemalloc.take_snapshot()
+      if self._previous_snapshot is not None:
+        statistics = snapshot.compare_to(self._previous_snapshot, "lineno")
+      else:
+        statistics = snapshot.statistics("lineno")
+      for statistic in statistics[:self._top_allocations]:
+        frame = statistic.traceback[0]
+        report["top_allocations"].append({
+          "location": f"{frame.filename}:{frame.lineno}",
+          "bytes": statistic.size,
+          "bytes_delta": getattr(statistic, "size_diff", statistic.size)
+        })
+      self._previous_snapshot = snapshot
+
+    self._previous_report = report
+    return report
+
+  def formatReport(self, report: dict) -> str:
+    """
+    Formats a memory report into a human readable table.
+    :param report: The report created by takeReport.
+    :return: The formatted report.
+    """
+    lines = ["[INFO] Memory report:"]
+    lines.append(f"  {'Category':<20} {'Count':>10} {'Delta':>8} {'Bytes':>14} {'Delta':>12} {'Per item':>9}")
+    for name, category in sorted(report["categories"].items(), key = lambda item: -item[1]["bytes"]):
+      per_item = category["bytes"] // category["count"] if category["count"] > 0 else 0
+      lines.append(f"  {name:<20} {category['count']:>10} {category['count_delta']:>+8} "
+                   f"{category['bytes']:>14} {category['bytes_delta']:>+12} {per_item:>9}")
+
+    if report["traced_bytes"] is not None:
+      lines.append(f"  Traced memory: {report['traced_bytes']} bytes (peak {report['traced_peak_bytes']} bytes)")
+      for allocation in report["top_allocations"]:
+        lines.append(f"  {allocation['bytes_delta']:>+12} bytes -> {allocation['bytes']:>12} bytes at {allocation['location']}")
+    return "\n".join(lines)
+
+  def computeEntitySize(self, entity: "Entity") -> int:
+    """
+    Computes the size of an entity including its own numbers. Containers are measured in
+    their own categories, and referenced entities or shared colors are not counted.
+    :param entity: The entity to measure.
+    :return: The size in bytes.
+    """
+    size = sys.getsizeof(entity)
+    for entity_class in type(entity).__mro__:
+      for slot in getattr(entity_class, "__slots__", ()):
+        value = getattr(entity, slot, None)
+        if type(value) is float or (type(value) is int and not -5 <= value <= 256):
+          size += sys.getsizeof(value)
+    return size
+
+  def computeNeighborCacheSize(self, neighbor_cache: "NeighborListCache") -> int:
+    """
+    Computes the size of the candidate pairs and build positions cached for a colony.
+    :param neighbor_cache: The cache to measure.
+    :return: The size in bytes.
+    """
+    size = sys.getsizeof(neighbor_cache)
+    size += sys.getsizeof(neighbor_cache._build_index)
+    for name in ("_build_x", "_build_y", "_pair_first", "_pair_second"):
+      size += sys.getsizeof(getattr(neighbor_cache, name))
+    return size
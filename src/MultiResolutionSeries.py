@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+#
+# A time series with bounded memory for very long runs. The most recent
+# values are kept raw, older ones are merged into progressively coarser
+# buckets holding their minimum, mean and maximum. Every level holds at most
+# a fixed number of buckets and passes its oldest ones, merged by a constant
+# factor, on to the next coarser level.
+#
+#############################################################################
+
+import collections
+import math
+import typing
+
+
+class MultiResolutionSeries:
+  def __init__(self, level_capacity: int = 512, factor: int = 4, max_levels: int = 10):
+    """
+    Constructor. Starts an empty series.
+    :param level_capacity: The maximum number of buckets per level.
+    :param factor: The number of buckets merged into one bucket of the next coarser level.
+    :param max_levels: The number of levels including the raw one. The oldest buckets of the
+                       coarsest level are dropped, so the series covers at least
+                       level_capacity * factor^(max_levels - 1) values.
+    """
+    self._factor = max(2, factor)
+    self._level_capacity = max(level_capacity, self._factor)
+    self._max_levels = max(1, max_levels)
+    # Every bucket is a (start tick, end tick, min, max, sum, count) tuple.
+    self._levels = [collections.deque()]
+
+  def append(self, tick: int, value: float):
+    """
+    Adds a raw value. Ticks must be added in ascending order.
+    :param tick: The tick of the value.
+    :param value: The value.
+    """
+    raw_level = self._levels[0]
+    raw_level.append((tick, tick, value, value, value, 1))
+    if len(raw_level) > self._level_capacity:
+      self._compact(0)
+
+  def getLevelNum(self) -> int:
+    """
+    Returns the number of levels currently in use.
+    """
+    return len(self._levels)
+
+  def getBucketNum(self) -> int:
+    """
+    Returns the number of buckets kept over all levels.
+    """
+    return sum(len(level) for level in self._levels)
+
+  def query(self, start_tick: int = None, end_tick: int = None, max_points: int = None) -> list["tuple"]:
+    """
+    Returns the series between two ticks at the finest resolution kept. Older parts come from
+    coarser levels.
+    :param start_tick: The first tick of interest. If None, the series starts at the oldest value.
+    :param end_tick: The last tick of interest. If None, the series ends at the latest value.
+    :param max_points: If set, consecutive buckets are merged until at most this many are left.
+    :return: A (start tick, end tick, min, mean, max) tuple for every bucket, oldest first.
+    """
+    buckets = []
+    for level in reversed(self._levels):
+      for bucket in level:
+        if (start_tick is None or bucket[1] >= start_tick) and (end_tick is None or bucket[0] <= end_tick):
+          buckets.append(bucket)
+
+    if max_points is not None and len(buckets) > max(1, max_points):
+      group_size = math.ceil(len(buckets) / max(1, max_points))
+      buckets = [self._mergeBuckets(buckets[index:index + group_size]) for index in range(0, len(buckets), group_size)]
+    return [(start, end, minimum, total / count, maximum) for start, end, minimum, maximum, total, count in buckets]
+
+  def _compact(self, level_id: int):
+    """
+    Merges the oldest buckets of a full level into a single bucket of the next coarser level.
+    :param level_id: The index of the full level.
+    """
+    level = self._levels[level_id]
+    if level_id + 1 == self._max_levels:
+      level.popleft()
+      return
+    if level_id + 1 == len(self._levels):
+      self._levels.append(collections.deque())
+
+    next_level = self._levels[level_id + 1]
+    next_level.append(self._mergeBuckets([level.popleft() for _ in range(self._factor)]))
+    if len(next_level) > self._level_capacity:
+      self._compact(level_id + 1)
+
+  @staticmethod
+  def _mergeBuckets(buckets: list["tuple"]) -> "tuple":
+    """
+    Merges consecutive buckets into one.
+    """
+    return (buckets[0][0], buckets[-1][1], min(bucket[2] for bucket in buckets), max(bucket[3] for bucket in buckets),
+            sum(bucket[4] for bucket in buckets), sum(bucket[5] for bucket in buckets))
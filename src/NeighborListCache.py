@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+#
+# A Verlet-style neighbor list for the advanced worker shouting algorithm.
+# Candidate pairs are searched with the shouting radius enlarged by a skin
+# and reused until some worker moved more than half the skin. In between,
+# the candidates are only filtered by the exact shouting range.
+#
+# The search works on numpy arrays of the worker positions and is split into
+# three steps, so the searches of several colonies can run concurrently:
+# prepareSearch reads the positions and the distances the workers shout,
+# the returned search function only runs numpy kernels and applySignals
+# hands every worker the best signals it heard. The listening links are kept
+# as index arrays and reduced with numpy to the best signal per listening
+# worker, so no adjacent worker lists are built. All distances are read
+# before the tick, so the result does not depend on the order the workers
+# behave in.
+#
+# Optionally the number of workers each worker listens to is capped, keeping
+# either the nearest or a random sample of the workers in shouting range.
+# With a cap, the workers are binned into a grid of half the shouting radius
+# and every worker visits the cells around it nearest first, taking at most
+# max_listeners workers from each cell and stopping as soon as no unvisited
+# worker can be nearer than its kept ones. The work per worker is bounded
+# even if the whole colony is clustered. The nearest workers are exact unless
+# a cell holds more than max_listeners workers.
+#
+#############################################################################
+
+import numpy as np
+import random
+import typing
+
+
+class NeighborListCache:
+  NEAREST = "nearest"
+  RANDOM = "random"
+
+  def __init__(self, skin: float, max_listeners: int = 0, listener_selection: str = NEAREST):
+    """
+    Constructor. Sets up an empty cache.
+    :param skin: The distance the search radius is enlarged by. If 0, the neighbors
+                 are searched from scratch every frame.
+    :param max_listeners: The maximum number of workers each worker listens to. 0 for no limit.
+    :param listener_selection: NeighborListCache.NEAREST or NeighborListCache.RANDOM. Decides
+                               which workers are kept if a worker hears more than max_listeners.
+    """
+    self._skin = skin
+    self._max_listeners = max_listeners
+    self._listener_selection = listener_selection
+    self._random_generator = np.random.default_rng(random.getrandbits(32))
+    self._build_index = {}
+    self._build_x = np.zeros(0)
+    self._build_y = np.zeros(0)
+    self._pair_first = np.zeros(0, dtype = np.intp)
+    self._pair_second = np.zeros(0, dtype = np.intp)
+    self._needs_rebuild = True
+    self._adjacent_pair_num = 0
+    self._candidate_link_num = 0
+
+  def setSkin(self, skin: float):
+    """
+    Changes the skin of the cache and forces a rebuild.
+    :param skin: The new skin distance.
+    """
+    self._skin = skin
+    self.invalidate()
+
+  def setListenerCap(self, max_listeners: int, listener_selection: str = NEAREST):
+    """
+    Changes the maximum number of workers each worker listens to.
+    :param max_listeners: The maximum number of listened workers. 0 for no limit.
+    :param listener_selection: NeighborListCache.NEAREST or NeighborListCache.RANDOM.
+    """
+    self._max_listeners = max_listeners
+    self._listener_selection = listener_selection
+    # The candidate pairs are not kept up to date while the cap bypasses them.
+    self.invalidate()
+
+  def invalidate(self):
+    """
+    Forces a full rebuild of the candidate pairs on the next computation.
+    """
+    self._needs_rebuild = True
+
+  def removeWorker(self, worker: "AdvancedWorker"):
+    """
+    Removes a worker from the cache. Its candidate pairs are dropped on the next computation.
+    :param worker: The worker to remove.
+    """
+    self._build_index.pop(worker, None)
+
+  def getCandidatePairNum(self) -> int:
+    """
+    Returns the number of currently cached candidate pairs.
+    """
+    return len(self._pair_first)
+
+  def getCandidateLinkNum(self) -> int:
+    """
+    Returns the number of candidate links examined by the last search with a listener cap.
+    """
+    return self._candidate_link_num
+
+  def getAdjacentPairNum(self) -> int:
+    """
+    Returns the number of adjacent pairs used by the last search. With a listener cap,
+    a pair of which only one worker listens to the other counts as half.
+    """
+    return self._adjacent_pair_num
+
+  def computeAdjacentWorkers(self, worker_list: list["AdvancedWorker"]):
+    """
+    Hands every worker the best food and queen signal shouted by the workers in its shouting range.
+    :param worker_list: All workers of the colony.
+    """
+    search = self.prepareSearch(worker_list)
+    self.applySignals(worker_list, search())
+
+  def findLinks(self, worker_list: list["AdvancedWorker"]) -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Searches the listening links at the current positions without folding any signals.
+    Useful to inspect the shouting network.
+    :param worker_list: All workers of the colony.
+    :return: The listening workers sorted in ascending order and the workers they listen to,
+             as two index arrays into worker_list.
+    """
+    return self._prepareLinkSearch(worker_list)()
+
+  def prepareSearch(self, worker_list: list["AdvancedWorker"]) -> typing.Callable:
+    """
+    Reads the current positions and shouted distances of all workers. Must be called between two ticks.
+    :param worker_list: All workers of the colony.
+    :return: A function without arguments returning the signals for applySignals. It only touches
+             numpy arrays and this cache, so it can run on another thread while the searches of
+             other colonies are running.
+    """
+    worker_num = len(worker_list)
+    search_links = self._prepareLinkSearch(worker_list)
+    heard_food_distance = np.fromiter((worker._internal_food_distance + worker._shouting_radius
+                                       for worker in worker_list), float, worker_num)
+    heard_queen_distance = np.fromiter((worker._internal_queen_distance + worker._shouting_radius
+                                        for worker in worker_list), float, worker_num)
+
+    def search():
+      return self._foldSignals(*search_links(), heard_food_distance, heard_queen_distance)
+    return search
+
+  def applySignals(self, worker_list: list["AdvancedWorker"], signals: tuple):
+    """
+    Hands every listening worker the lowest food and queen distance it heard and their senders.
+    :param worker_list: All workers of the colony in the order used by prepareSearch.
+    :param signals: The signals returned by the search function.
+    """
+    listeners, food_distances, food_senders, queen_distances, queen_senders, link_num = signals
+    self._adjacent_pair_num = link_num // 2
+    for worker_id, food_distance, food_sender, queen_distance, queen_sender in \
+        zip(listeners.tolist(), food_distances.tolist(), food_senders.tolist(),
+            queen_distances.tolist(), queen_senders.tolist()):
+      worker_list[worker_id].hearSignals(food_distance, worker_list[food_sender],
+                                         queen_distance, worker_list[queen_sender])
+
+  def _prepareLinkSearch(self, worker_list: list["AdvancedWorker"]) -> typing.Callable:
+    """
+    Reads the current positions of all workers.
+    :param worker_list: All workers of the colony.
+    :return: A function without arguments returning the listening links as two index arrays
+             into worker_list, the listening workers sorted in ascending order and the workers
+             they listen to.
+    """
+    worker_num = len(worker_list)
+    x = np.fromiter((worker._x for worker in worker_list), float, worker_num)
+    y = np.fromiter((worker._y for worker in worker_list), float, worker_num)
+    radius = np.fromiter((worker._shouting_radius for worker in worker_list), float, worker_num)
+
+    if self._max_listeners > 0:
+      def search():
+        return self._searchListeners(x, y, radius)
+      return search
+
+    if self._skin <= 0:
+      def search():
+        return self._toLinks(*self._searchCandidates(x, y, radius), x, y)
+      return search
+
+    build_index = self._build_index
+    worker_build_index = np.fromiter((build_index.get(worker, -1) for worker in worker_list), np.intp, worker_num)
+
+    def search():
+      if self._needs_rebuild or self._exceedsSkin(x, y, worker_build_index):
+        self._rebuild(worker_list, x, y, radius)
+        first, second = self._pair_first, self._pair_second
+      else:
+        first, second = self._update(worker_list, x, y, radius, worker_build_index)
+      return self._toLinks(*self._filterPairs(first, second, x, y, radius), x, y)
+    return search
+
+  @staticmethod
+  def _foldSignals(receivers: "np.ndarray", senders: "np.ndarray", heard_food_distance: "np.ndarray",
+                   heard_queen_distance: "np.ndarray") -> tuple:
+    """
+    Reduces the listening links to the best heard food and queen signal of every listening worker.
+    :param receivers: The listening workers in ascending order.
+    :param senders: The workers they listen to.
+    :param heard_food_distance: The food distance every worker shouts.
+    :param heard_queen_distance: The queen distance every worker shouts.
+    :return: The listening workers, their lowest heard food distances and its senders, their
+             lowest heard queen distances and its senders, and the number of links.
+    """
+    link_num = len(receivers)
+    if link_num == 0:
+      no_workers = np.zeros(0, dtype = np.intp)
+      return no_workers, np.zeros(0), no_workers, np.zeros(0), no_workers, 0
+
+    starts = np.flatnonzero(np.concatenate(([True], receivers[1:] != receivers[:-1])))
+    food_distances, food_senders = NeighborListCache._minimumPerListener(heard_food_distance[senders], senders, starts)
+    queen_distances, queen_senders = NeighborListCache._minimumPerListener(heard_queen_distance[senders], senders, starts)
+    return receivers[starts], food_distances, food_senders, queen_distances, queen_senders, link_num
+
+  @staticmethod
+  def _minimumPerListener(heard: "np.ndarray", senders: "np.ndarray",
+                          starts: "np.ndarray") -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Finds the lowest heard distance of every listening worker and the first link it was heard on.
+    :param heard: The heard distance of every link.
+    :param senders: The sender of every link.
+    :param starts: The index of the first link of every listening worker.
+    :return: The lowest distance and its sender for every listening worker.
+    """
+    minimum = np.minimum.reduceat(heard, starts)
+    best = np.flatnonzero(heard == np.repeat(minimum, np.diff(np.append(starts, len(heard)))))
+    listener_ids = np.searchsorted(starts, best, side = "right")
+    first_best = best[np.concatenate(([True], listener_ids[1:] != listener_ids[:-1]))]
+    return minimum, senders[first_best]
+
+  @staticmethod
+  def _searchCandidates(x: "np.ndarray", y: "np.ndarray", radius: "np.ndarray") -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Searches all pairs within the given radius with a scanline over the x axis. The radius of
+    the worker with the lower x position decides, like in the shouting range filter.
+    :param x: The x positions of the workers.
+    :param y: The y positions of the workers.
+    :param radius: The search radius of every worker.
+    :return: The pairs as two index arrays into the position arrays.
+    """
+    worker_num = len(x)
+    order = np.argsort(x, kind = "stable")
+    sorted_x = x[order]
+    sorted_y = y[order]
+    sorted_radius = radius[order]
+
+    ends = np.searchsorted(sorted_x, sorted_x + sorted_radius, side = "right")
+    partner_nums = np.maximum(ends - np.arange(1, worker_num + 1), 0)
+    first = np.repeat(np.arange(worker_num), partner_nums)
+    offsets = np.arange(len(first)) - np.repeat(np.cumsum(partner_nums) - partner_nums, partner_nums)
+    second = first + 1 + offsets
+
+    close = np.abs(sorted_y[second] - sorted_y[first]) <= sorted_radius[first]
+    return order[first[close]], order[second[close]]
+
+  @staticmethod
+  def _toLinks(first: "np.ndarray", second: "np.ndarray", x: "np.ndarray",
+               y: "np.ndarray") -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Turns the adjacent pairs into links in both directions, sorted by the listening worker.
+    :param first: The index array of the first workers of the pairs.
+    :param second: The index array of the second workers of the pairs.
+    :param x: The x positions of the workers.
+    :param y: The y positions of the workers.
+    :return: The listening workers in ascending order and the workers they listen to.
+    """
+    receivers = np.concatenate((first, second))
+    senders = np.concatenate((second, first))
+    order = np.argsort(receivers, kind = "stable")
+    return receivers[order], senders[order]
+
+  def _searchListeners(self, x: "np.ndarray", y: "np.ndarray",
+                       radius: "np.ndarray") -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Searches the listening links under the listener cap with a bounded number of candidates per
+    worker. The workers are binned into a grid of half the largest shouting radius and every
+    worker visits the rings of cells around it nearest first, taking at most max_listeners
+    workers per cell. With the nearest selection, a worker stops once its max_listeners-th
+    nearest candidate is closer than the distance covered by the visited rings. With the random
+    selection, it stops once it has enough candidates.
+    :param x: The x positions of the workers.
+    :param y: The y positions of the workers.
+    :param radius: The shouting radius of every worker.
+    :return: The listening workers in ascending order and the workers they listen to.
+    """
+    worker_num = len(x)
+    max_listeners = self._max_listeners
+    nearest = self._listener_selection != self.RANDOM
+    no_workers = np.zeros(0, dtype = np.intp)
+    self._candidate_link_num = 0
+    if worker_num < 2:
+      return no_workers, no_workers
+
+    cell_size = max(float(radius.max()), 1e-9) / 2
+    col = ((x - x.min()) // cell_size).astype(np.intp)
+    row = ((y - y.min()) // cell_size).astype(np.intp)
+    cols = int(col.max()) + 1
+    rows = int(row.max()) + 1
+    keys = row * cols + col
+    if nearest:
+      order = np.argsort(keys, kind = "stable")
+    else:
+      order = np.lexsort((self._random_generator.random(worker_num), keys))
+    sorted_keys = keys[order]
+    # The distance from every worker to the border of its cell, covered by the first ring.
+    border_distance = np.minimum.reduce((x - x.min() - col * cell_size, (col + 1) * cell_size - (x - x.min()),
+                                         y - y.min() - row * cell_size, (row + 1) * cell_size - (y - y.min())))
+
+    receivers = []
+    senders = []
+    candidate_nums = np.zeros(worker_num, dtype = np.intp)
+    searching = np.arange(worker_num)
+    for ring in range(3):
+      offsets = np.array([(dx, dy) for dy in range(-ring, ring + 1) for dx in range(-ring, ring + 1)
+                          if max(abs(dx), abs(dy)) == ring], dtype = np.intp)
+      cell_col = col[searching, None] + offsets[None, :, 0]
+      cell_row = row[searching, None] + offsets[None, :, 1]
+      inside = (cell_col >= 0) & (cell_col < cols) & (cell_row >= 0) & (cell_row < rows)
+      cell_keys = cell_row * cols + cell_col
+      starts = np.searchsorted(sorted_keys, cell_keys, side = "left")
+      # The own cell also holds the searching worker itself.
+      cell_cap = max_listeners + 1 if ring == 0 else max_listeners
+      counts = np.where(inside, np.minimum(np.searchsorted(sorted_keys, cell_keys, side = "right") - starts, cell_cap), 0)
+
+      counts = counts.ravel()
+      total = int(counts.sum())
+      self._candidate_link_num += total
+      ring_receivers = np.repeat(np.repeat(searching, len(offsets)), counts)
+      member_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+      ring_senders = order[np.repeat(starts.ravel(), counts) + member_offsets]
+
+      # Like the scanline, the radius of the worker with the lower x position decides.
+      first_is_receiver = (x[ring_receivers] < x[ring_senders]) | \
+                          ((x[ring_receivers] == x[ring_senders]) & (ring_receivers < ring_senders))
+      pair_radius = np.where(first_is_receiver, radius[ring_receivers], radius[ring_senders])
+      close = (ring_receivers != ring_senders) & \
+              (np.abs(x[ring_senders] - x[ring_receivers]) <= pair_radius) & \
+              (np.abs(y[ring_senders] - y[ring_receivers]) <= pair_radius)
+      receivers.append(ring_receivers[close])
+      senders.append(ring_senders[close])
+      candidate_nums += np.bincount(receivers[-1], minlength = worker_num)
+
+      done = candidate_nums[searching] >= max_listeners
+      if nearest and ring < 2 and np.any(done):
+        # No unvisited worker is nearer than the distance covered by the visited rings.
+        all_receivers = np.concatenate(receivers)
+        all_senders = np.concatenate(senders)
+        distances = np.hypot(x[all_senders] - x[all_receivers], y[all_senders] - y[all_receivers])
+        link_order = np.lexsort((distances, all_receivers))
+        sorted_receivers = all_receivers[link_order]
+        ranks = np.arange(len(link_order)) - np.searchsorted(sorted_receivers, sorted_receivers)
+        last_kept = ranks == max_listeners - 1
+        kept_distance = np.full(worker_num, np.inf)
+        kept_distance[sorted_receivers[last_kept]] = distances[link_order][last_kept]
+        done &= kept_distance[searching] <= border_distance[searching] + ring * cell_size
+      searching = searching[~done]
+      if len(searching) == 0:
+        break
+
+    receivers = np.concatenate(receivers)
+    senders = np.concatenate(senders)
+    if nearest:
+      keys = (x[senders] - x[receivers]) ** 2 + (y[senders] - y[receivers]) ** 2
+    else:
+      keys = self._random_generator.random(len(receivers))
+    order = np.lexsort((keys, receivers))
+    receivers = receivers[order]
+    senders = senders[order]
+
+    # The rank of every link among the links of its listening worker, best first.
+    ranks = np.arange(len(receivers)) - np.searchsorted(receivers, receivers)
+    kept = ranks < max_listeners
+    return receivers[kept], senders[kept]
+
+  @staticmethod
+  def _filterPairs(first: "np.ndarray", second: "np.ndarray", x: "np.ndarray", y: "np.ndarray",
+                   radius: "np.ndarray") -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Keeps only the candidate pairs within the exact shouting range of the first worker.
+    :param first: The index array of the first workers of the pairs.
+    :param second: The index array of the second workers of the pairs.
+    :param x: The x positions of the workers.
+    :param y: The y positions of the workers.
+    :param radius: The shouting radius of every worker.
+    :return: The adjacent pairs as two index arrays.
+    """
+    pair_radius = radius[first]
+    close = (np.abs(x[second] - x[first]) <= pair_radius) & (np.abs(y[second] - y[first]) <= pair_radius)
+    return first[close], second[close]
+
+  def _exceedsSkin(self, x: "np.ndarray", y: "np.ndarray", worker_build_index: "np.ndarray") -> bool:
+    """
+    Checks if any worker moved more than half the skin since the last rebuild.
+    :param x: The current x positions of the workers.
+    :param y: The current y positions of the workers.
+    :param worker_build_index: The index of every worker in the build arrays or -1 for new workers.
+    :return: True if the candidate pairs are no longer guaranteed to be complete.
+    """
+    known = worker_build_index >= 0
+    known_build_index = worker_build_index[known]
+    max_displacement = self._skin / 2
+    if np.any(np.abs(x[known] - self._build_x[known_build_index]) > max_displacement) or \
+       np.any(np.abs(y[known] - self._build_y[known_build_index]) > max_displacement):
+      return True
+    new_workers = len(x) - len(known_build_index)
+    return new_workers * 10 > len(x)
+
+  def _rebuild(self, worker_list: list["AdvancedWorker"], x: "np.ndarray", y: "np.ndarray", radius: "np.ndarray"):
+    """
+    Searches all candidate pairs from scratch. Afterwards the build indices match the
+    indices in worker_list.
+    :param worker_list: All workers of the colony.
+    :param x: The x positions of the workers.
+    :param y: The y positions of the workers.
+    :param radius: The shouting radius of every worker.
+    """
+    self._pair_first, self._pair_second = self._searchCandidates(x, y, radius + self._skin)
+    self._build_index = {worker: worker_id for worker_id, worker in enumerate(worker_list)}
+    self._build_x = x.copy()
+    self._build_y = y.copy()
+    self._needs_rebuild = False
+
+  def _update(self, worker_list: list["AdvancedWorker"], x: "np.ndarray", y: "np.ndarray", radius: "np.ndarray",
+              worker_build_index: "np.ndarray") -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Drops the pairs of removed workers and adds the pairs of newly spawned workers
+    without rebuilding the whole cache. New workers are compared against the build
+    positions of the others, so the skin guarantee also holds for them.
+    :param worker_list: All workers of the colony.
+    :param x: The x positions of the workers.
+    :param y: The y positions of the workers.
+    :param radius: The shouting radius of every worker.
+    :param worker_build_index: The index of every worker in the build arrays or -1 for new workers.
+    :return: The candidate pairs as two index arrays into worker_list.
+    """
+    known = worker_build_index >= 0
+    current_index = np.full(len(self._build_x), -1, dtype = np.intp)
+    current_index[worker_build_index[known]] = np.flatnonzero(known)
+
+    first = current_index[self._pair_first]
+    second = current_index[self._pair_second]
+    alive = (first >= 0) & (second >= 0)
+    first = first[alive]
+    second = second[alive]
+    self._pair_first = self._pair_first[alive]
+    self._pair_second = self._pair_second[alive]
+
+    new_workers = np.flatnonzero(~known)
+    if len(new_workers) == 0:
+      return first, second
+
+    # Candidates of the new workers among all known workers at their build positions and among each other.
+    known_workers = np.flatnonzero(known)
+    new_radius = radius[new_workers, None] + self._skin
+    close = (np.abs(self._build_x[worker_build_index[known_workers]][None, :] - x[new_workers, None]) <= new_radius) & \
+            (np.abs(self._build_y[worker_build_index[known_workers]][None, :] - y[new_workers, None]) <= new_radius)
+    new_ids, known_ids = np.nonzero(close)
+    new_first = [new_workers[new_ids]]
+    new_second = [known_workers[known_ids]]
+
+    close = (np.abs(x[new_workers][None, :] - x[new_workers, None]) <= new_radius) & \
+            (np.abs(y[new_workers][None, :] - y[new_workers, None]) <= new_radius)
+    new_ids, partner_ids = np.nonzero(np.triu(close, 1))
+    new_first.append(new_workers[new_ids])
+    new_second.append(new_workers[partner_ids])
+
+    new_first = np.concatenate(new_first)
+    new_second = np.concatenate(new_second)
+    build_index_start = len(self._build_x)
+    new_build_index = np.arange(build_index_start, build_index_start + len(new_workers))
+    worker_build_index = worker_build_index.copy()
+    worker_build_index[new_workers] = new_build_index
+    for worker_id, build_id in zip(new_workers.tolist(), new_build_index.tolist()):
+      self._build_index[worker_list[worker_id]] = build_id
+    self._build_x = np.concatenate((self._build_x, x[new_workers]))
+    self._build_y = np.concatenate((self._build_y, y[new_workers]))
+    self._pair_first = np.concatenate((self._pair_first, worker_build_index[new_first]))
+    self._pair_second = np.concatenate((self._pair_second, worker_build_index[new_second]))
+
+    return np.concatenate((first, new_first)), np.concatenate((second, new_second))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+#
+# Runs the neighbor searches of all advanced worker colonies as a separate
+# phase at the start of each tick. Colonies only search among their own
+# workers, so their searches are independent and run concurrently on a
+# thread pool. The numpy kernels release the GIL for most of their work.
+# The results are applied in the order of the queen list, so the heard
+# signals do not depend on the thread scheduling.
+#
+#############################################################################
+
+import concurrent.futures
+import os
+import typing
+
+
+class NeighborSearchPhase:
+  def __init__(self, max_threads: int = None):
+    """
+    Constructor. The thread pool is only started once two colonies need a search.
+    :param max_threads: The maximum number of searches running at once. If None, the
+                        number of CPU cores is used. If 1, all searches run on the calling thread.
+    """
+    self._max_threads = max_threads if max_threads is not None else (os.cpu_count() or 1)
+    self._executor = None
+
+  def computeAdjacentWorkers(self, queen_list: list["Queen"]):
+    """
+    Fills the adjacent worker lists of the workers of all queens which need them.
+    :param queen_list: The list of all queens in the scene.
+    """
+    queens = [queen for queen in queen_list if queen.needsAdjacentWorkers()]
+    searches = [queen.prepareNeighborSearch() for queen in queens]
+
+    if len(searches) > 1 and self._max_threads > 1:
+      if self._executor is None:
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers = self._max_threads,
+                                                               thread_name_prefix = "NeighborSearch")
+      futures = [self._executor.submit(search) for search in searches]
+      results = [future.result() for future in futures]
+    else:
+      results = [search() for search in searches]
+
+    for queen, signals in zip(queens, results):
+      queen.applyNeighborSearch(signals)
+
+  def shutdown(self):
+    """
+    Stops the threads of the pool. A later computation starts a new pool.
+    """
+    if self._executor is not None:
+      self._executor.shutdown()
+      self._executor = None
@@ -1,8 +1,11 @@
 import pygame
 import random
 from .Entity import Entity
+from .EventBus import EventBus
 
 class Obstacle(Entity):
+  __slots__ = ("_size", "_half_size", "_true_half_size", "_darker_color")
+
   def __init__(self, x: int, y: int, size: int):
     """
     Constructor. Sets up the food.
@@ -20,23 +23,36 @@ class Obstacle(Entity):
     self._darker_color = [c // 2 for c in self._color]
     self._energy = 1
 
-  def renderShadow(self, screen: "pygame.Screen"):
+  def renderShadow(self, screen: "pygame.Screen", camera: "Camera"):
     """
     Renders the shadow of the obstacle onto screen.
     :param screen: The screen to render the shadow on.
+    :param camera: The camera converting world positions into screen positions.
+    """
+    zoom = camera.getZoom()
+    x, y = camera.toScreen(self._x - self._true_half_size + self._shadow_distance, self._y - self._true_half_size + self._shadow_distance)
+    pygame.draw.rect(screen, self._shadow_color, ((x, y), (self._size * zoom, self._size * zoom)))
+
+  def getRenderRect(self) -> "tuple[int, int, int, int]":
+    """
+    Returns the world area covered by the obstacle and its shadow.
+    :return: The rectangle as (left, top, width, height).
     """
-    pygame.draw.rect(screen, self._shadow_color, ((self._x - self._true_half_size + self._shadow_distance, self._y - self._true_half_size + self._shadow_distance),
-                                           (self._size, self._size)))
+    half_size = int(self._true_half_size) + 2
+    return int(self._x) - half_size, int(self._y) - half_size, 2 * half_size + self._shadow_distance + 1, 2 * half_size + self._shadow_distance + 1
 
-  def render(self, screen: "pygame.Screen"):
+  def render(self, screen: "pygame.Screen", camera: "Camera"):
     """
     Renders the obstacle onto screen.
     :param screen: The screen to render the obstacle on.
+    :param camera: The camera converting world positions into screen positions.
     """
-    pygame.draw.rect(screen, self._color, ((self._x - self._true_half_size, self._y - self._true_half_size),
-                                           (self._size, self._size)))
-    pygame.draw.rect(screen, self._darker_color, ((self._x - self._true_half_size * 0.7, self._y - self._true_half_size * 0.7),
-                                                  (self._size * 0.7, self._size * 0.7)))
+    zoom = camera.getZoom()
+    x, y = camera.toScreen(self._x, self._y)
+    half_size = self._true_half_size * zoom
+    size = self._size * zoom
+    pygame.draw.rect(screen, self._color, ((x - half_size, y - half_size), (size, size)))
+    pygame.draw.rect(screen, self._darker_color, ((x - half_size * 0.7, y - half_size * 0.7), (size * 0.7, size * 0.7)))
 
   def behave(self, entity_lists: "EntityListContainer", width: int, height: int):
     """
@@ -65,6 +81,7 @@ class Obstacle(Entity):
     """
     entity_lists.entity_list.remove(self)
     entity_lists.obstacle_list.remove(self)
+    entity_lists.event_bus.emit(EventBus.DEATH, self)
 
   def __str__(self):
     return f"<Obstacle {self._x}:{self._y}>"
\ No newline at end of file
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+#
+# A toggleable overlay showing the live performance of the scene. Collects
+# the time spent in each phase of a frame, shows their rolling averages
+# next to the actual and the target frame rate, the entity numbers and the
+# adjacent pairs of every colony, and draws a sparkline of the recent frame
+# times against the frame budget.
+#
+#############################################################################
+
+import collections
+import pygame
+import typing
+
+
+class PerformanceHud:
+  PHASES = ("input", "commands", "contacts", "neighbors", "behave", "render")
+
+  def __init__(self, target_fps: int, history_length: int = 120):
+    """
+    Constructor. Sets up empty histories.
+    :param target_fps: The frame rate the scene aims for.
+    :param history_length: The number of frames the averages and the sparkline cover.
+    """
+    self._target_fps = target_fps
+    self._fps = 0.0
+    self._frame_times = collections.deque(maxlen = history_length)
+    self._phase_times = {phase: collections.deque(maxlen = history_length) for phase in self.PHASES}
+    self._current_phase_times = dict.fromkeys(self.PHASES, 0.0)
+
+  def recordPhase(self, phase: str, seconds: float):
+    """
+    Adds time spent in a phase to the current frame.
+    :param phase: One of PerformanceHud.PHASES.
+    :param seconds: The time spent in the phase.
+    """
+    self._current_phase_times[phase] += seconds
+
+  def endFrame(self, frame_seconds: float, fps: float):
+    """
+    Closes the current frame and stores its timings in the histories.
+    :param frame_seconds: The time the frame was busy, excluding the wait for the frame rate cap.
+    :param fps: The actual frame rate measured by the game loop.
+    """
+    self._fps = fps
+    self._frame_times.append(frame_seconds)
+    for phase, seconds in self._current_phase_times.items():
+      self._phase_times[phase].append(seconds)
+      self._current_phase_times[phase] = 0.0
+
+  def getPhaseAverages(self) -> dict:
+    """
+    Returns the average time per frame of every phase over the history.
+    :return: A dictionary mapping the phase names to milliseconds.
+    """
+    return {phase: 1000 * sum(times) / len(times) if times else 0.0 for phase, times in self._phase_times.items()}
+
+  def getFrameTimes(self) -> list[float]:
+    """
+    Returns the busy times of the frames in the history in milliseconds, oldest first.
+    """
+    return [1000 * seconds for seconds in self._frame_times]
+
+  def render(self, screen: "pygame.Surface", font: "pygame.Font", x: int, y: int,
+             entity_numbers: "tuple[int, int, int, int]", colony_pairs: list["tuple[int, int]"]):
+    """
+    Renders the overlay onto the screen.
+    :param screen: The screen to render the overlay on.
+    :param font: The font to render the text with.
+    :param x: The x position of the upper left corner.
+    :param y: The y position of the upper left corner.
+    :param entity_numbers: The numbers of queens, workers, foods and obstacles.
+    :param colony_pairs: A (colony id, adjacent pair number) tuple for every colony searching neighbors.
+    :return: The screen area covered by the overlay.
+    """
+    frame_times = self.getFrameTimes()
+    average_frame_time = sum(frame_times) / len(frame_times) if frame_times else 0.0
+    budget = 1000 / self._target_fps
+
+    lines = [f"FPS: {self._fps:.1f} / {self._target_fps}   frame: {average_frame_time:.1f} ms / {budget:.1f} ms"]
+    lines.append("ms per frame - " + "  ".join(f"{phase}: {milliseconds:.1f}" for phase, milliseconds in self.getPhaseAverages().items()))
+    queen_number, worker_number, food_number, obstacle_number = entity_numbers
+    lines.append(f"queens: {queen_number}  workers: {worker_number}  food: {food_number}  obstacles: {obstacle_number}")
+    if colony_pairs:
+      lines.append("pairs: " + "  ".join(f"colony {colony_id}: {pair_number}" for colony_id, pair_number in colony_pairs))
+
+    width = 900
+    line_height = font.get_linesize()
+    sparkline_height = 60
+    height = line_height * len(lines) + sparkline_height + 30
+
+    transparent_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    transparent_surface.set_alpha(40)
+    pygame.draw.rect(transparent_surface, (255, 255, 255), (0, 0, width, height))
+    covered_rect = screen.blit(transparent_surface, (x, y))
+
+    text_y = y + 10
+    for line in lines:
+      covered_rect.union_ip(screen.blit(font.render(line, True, (0, 0, 0)), (x + 10, text_y)))
+      text_y += line_height
+
+    # Sparkline of the frame times. The budget of a frame is drawn in the middle of the box.
+    left = x + 10
+    bottom = text_y + sparkline_height
+    scale = sparkline_height / (2 * budget)
+    budget_y = bottom - budget * scale
+    pygame.draw.line(screen, (120, 120, 120), (left, budget_y), (left + width - 20, budget_y))
+    if len(frame_times) > 1:
+      step = (width - 20) / (self._frame_times.maxlen - 1)
+      points = [(left + index * step, bottom - min(frame_time, 2 * budget) * scale)
+                for index, frame_time in enumerate(frame_times)]
+      color = (200, 0, 0) if average_frame_time > budget else (0, 150, 0)
+      pygame.draw.lines(screen, color, False, points)
+    return covered_rect
@@ -9,17 +9,26 @@ import pygame
 import random
 import typing
 from .Entity import Entity
-from .SimpleWorker import SimpleWorker
-from .AdvancedWorker import AdvancedWorker
+from .WorkerRegistry import WorkerRegistry
+from .DistanceField import DistanceField
+from .EventBus import EventBus
+from .NeighborListCache import NeighborListCache
+from .UpdateScheduler import UpdateScheduler
 
 
 class Queen(Entity):
-  def __init__(self, x: int, y: int, queen_description: dict):
+  __slots__ = ("_energy_reduction_rate", "_birth_worker_threshold", "_start_energy", "_max_energy", "_sec_color",
+               "_worker_list", "_worker_description", "_neighbor_cache", "_worker_spawn_cost", "_frame_counter",
+               "_colony_id", "_distance_field", "_spawn_spec")
+
+  def __init__(self, x: int, y: int, queen_description: dict, colony_id: int = 0):
     """
     Constructor. Initializes the queen and its worker type with the given configs.
     :param x: Initial x position.
     :param y: Initial y position.
     :param queen_description: The config for this queen.
+    :param colony_id: The id of the colony in the scene. Matches the index of the
+                      queen config this queen was spawned from.
     """
     super().__init__(x, y)
     self.setRandomDirection()
@@ -34,32 +43,50 @@ class Queen(Entity):
                        self._color[1] / 2,
                        self._color[2] / 2)
     self._worker_list = []
-    self._sorted_worker_list = []
     self._worker_description = queen_description["worker_type"]
+    self._spawn_spec = WorkerRegistry.compile(self._worker_description)
+    self._neighbor_cache = NeighborListCache(float(self._worker_description.get("neighbor_skin", 0)),
+                                             int(self._worker_description.get("max_listeners", 0)),
+                                             self._worker_description.get("listener_selection", NeighborListCache.NEAREST))
     self._worker_spawn_cost = 3
     self._frame_counter = 0
+    self._colony_id = colony_id
+    self._distance_field = None
 
-  def renderShadow(self, screen: "pygame.Screen"):
+  def renderShadow(self, screen: "pygame.Screen", camera: "Camera"):
     """
     Renders the shadow of the queen onto screen.
     :param screen: The screen to render the shadow on.
+    :param camera: The camera converting world positions into screen positions.
     """
     size = self._energy / 10
     if size <= 1:
       size = 1
-    pygame.draw.circle(screen, self._shadow_color, (self._x + self._shadow_distance, self._y + self._shadow_distance), size)
+    x, y = camera.toScreen(self._x + self._shadow_distance, self._y + self._shadow_distance)
+    pygame.draw.circle(screen, self._shadow_color, (x, y), size * camera.getZoom())
 
-  def render(self, screen: "pygame.Screen"):
+  def getRenderRect(self) -> "tuple[int, int, int, int]":
+    """
+    Returns the world area covered by the queen and its shadow.
+    :return: The rectangle as (left, top, width, height).
+    """
+    size = int(max(self._energy / 10, 1)) + 2
+    return int(self._x) - size, int(self._y) - size, 2 * size + self._shadow_distance + 1, 2 * size + self._shadow_distance + 1
+
+  def render(self, screen: "pygame.Screen", camera: "Camera"):
     """
     Renders the queen onto screen.
     :param screen: The screen to render the queen on.
+    :param camera: The camera converting world positions into screen positions.
     """
     size = self._energy / 10
     if size <= 1:
       size = 1
-    pygame.draw.circle(screen, self._color, (self._x, self._y), size)
-    pygame.draw.circle(screen, self._sec_color, (int(self._x - size * 0.5), self._y), size * 0.5)
-    pygame.draw.circle(screen, self._sec_color, (int(self._x + size * 0.5), self._y), size * 0.5)
+    size *= camera.getZoom()
+    x, y = camera.toScreen(self._x, self._y)
+    pygame.draw.circle(screen, self._color, (x, y), size)
+    pygame.draw.circle(screen, self._sec_color, (int(x - size * 0.5), y), size * 0.5)
+    pygame.draw.circle(screen, self._sec_color, (int(x + size * 0.5), y), size * 0.5)
 
   def behave(self, entity_lists: "EntityListContainer", width: int, height: int):
     """
@@ -68,19 +95,20 @@ class Queen(Entity):
     :param width: The width of the scene screen.
     :param height: The height of the scene screen.
     """
-    if self._frame_counter % 1 == 0:
-      if self._worker_description["behavior"] == "AdvancedWorker":
-        self.sortWorkerListByX()
-        self.computeAdjacentWorkers()
+    if self._spawn_spec.uses_distance_field:
+      self.getDistanceField(width, height).update(entity_lists.obstacle_list)
 
-    if(random.randint(0, 1000) <= 5):
-      self.setRandomDirection()
+    # Redirecting is only checked in the slice of this queen, with a chance scaled by the period.
+    update_scheduler = entity_lists.update_scheduler
+    if update_scheduler.isDue(UpdateScheduler.QUEEN_REDIRECT, self):
+      if random.random() < update_scheduler.getScaledChance(UpdateScheduler.QUEEN_REDIRECT, 6 / 1001):
+        self.setRandomDirection()
 
     self.performMovement(entity_lists, width, height, 0)
 
     if self._energy > self._birth_worker_threshold:
       self.spawnWorker(1, entity_lists.entity_list, entity_lists.worker_list,
-                       width, height, self._worker_spawn_cost, 40)
+                       width, height, self._worker_spawn_cost, 40, entity_lists.worker_pool)
 
     energy_corrected_reduction = max(((self._energy - self._start_energy) / 1500), 0)
     self.reduceEnergy(self._energy_reduction_rate + energy_corrected_reduction)
@@ -94,11 +122,14 @@ class Queen(Entity):
     """
     entity_lists.entity_list.remove(self)
     entity_lists.queen_list.remove(self)
+    entity_lists.event_bus.emit(EventBus.DEATH, self)
 
   def spawnWorker(self, num_workers: int, entity_list: list["Entity"], worker_list: list["WorkerBase"],
-                  width: int, height: int, cost: int, spawn_distance: int):
+                  width: int, height: int, cost: int, spawn_distance: int, worker_pool: "WorkerPool" = None):
     """
-    Spawns a number of workers around the queen.
+    Spawns a number of workers around the queen. All random values are sampled up front within
+    the ranges of the compiled spawn spec and the workers are created and registered in one batch.
+    Dead workers of the pool are reused if available.
     :param num_workers: The amount of workers to spawn.
     :param entity_list: The list of all entities in the EntityListContainer.
     :param worker_list: The list of all workers in the EntityListContainer.
@@ -106,35 +137,78 @@ class Queen(Entity):
     :param height: The height of the screen.
     :param cost: The cost for the queen to spawn each of the workers.
     :param spawn_distance: The radius to spawn the workers around the queen.
+    :param worker_pool: The pool of dead workers to reuse. If None, all workers are newly created.
+    """
+    if num_workers <= 0:
+      return
+
+    min_x = max(0, int(self._x) - spawn_distance)
+    max_x = min(width, int(self._x) + spawn_distance)
+    min_y = max(0, int(self._y) - spawn_distance)
+    max_y = min(height, int(self._y) + spawn_distance)
+    spec = self._spawn_spec
+
+    randint = random.randint
+    xs = [randint(min_x, max_x) for _ in range(num_workers)]
+    ys = [randint(min_y, max_y) for _ in range(num_workers)]
+    starting_energies = [randint(spec.min_energy, spec.max_energy) for _ in range(num_workers)]
+    speeds = [randint(spec.min_speed, spec.max_speed) for _ in range(num_workers)]
+
+    workers = spec.createWorkers(xs, ys, starting_energies, speeds, worker_pool)
+    for worker in workers:
+      worker.assignQueen(self)
+
+    entity_list.extend(workers)
+    worker_list.extend(workers)
+    self._worker_list.extend(workers)
+    self.reduceEnergy(cost * num_workers)
+
+  def applyConfig(self, queen_description: dict):
+    """
+    Applies a changed config to the living queen and her colony. Energy and worker
+    number are left untouched. The worker behavior of a colony cannot be changed in place.
+    :param queen_description: The new config for this queen.
+    """
+    self._speed = queen_description["speed"]
+    self._energy_reduction_rate = queen_description["energy_reduction_rate"]
+    self._birth_worker_threshold = queen_description["birth_energy_threshold"]
+    self._max_energy = queen_description["max_energy"]
+    self._color = queen_description["color"]
+    self._sec_color = (self._color[0] / 2,
+                       self._color[1] / 2,
+                       self._color[2] / 2)
+    for worker in self._worker_list:
+      worker._color = self._color
+
+    worker_description = queen_description["worker_type"]
+    if worker_description["behavior"] != self._worker_description["behavior"]:
+      print(f"[INFO] Changing the worker behavior of colony {self._colony_id} requires a restart of the scene.")
+      return
+
+    self._worker_description = worker_description
+    self._spawn_spec = WorkerRegistry.compile(worker_description)
+    if self._spawn_spec.reload is not None:
+      for worker in self._worker_list:
+        self._spawn_spec.reload(worker, *self._spawn_spec.extra_args)
+    if self._spawn_spec.uses_adjacent_workers:
+      self._neighbor_cache.setSkin(float(self._worker_description.get("neighbor_skin", 0)))
+      self._neighbor_cache.setListenerCap(int(self._worker_description.get("max_listeners", 0)),
+                                          self._worker_description.get("listener_selection", NeighborListCache.NEAREST))
+    if self._spawn_spec.uses_distance_field:
+      self._distance_field = None
+
+  def getColonyId(self) -> int:
+    """
+    Returns the id of the colony this queen is leading.
     """
-    for _ in range(num_workers):
-      x = random.randint(max(0, int(self._x) - spawn_distance),
-                         min(width, int(self._x) + spawn_distance))
-      y = random.randint(max(0, int(self._y) - spawn_distance),
-                         min(height, int(self._y) + spawn_distance))
-                         
-      starting_energy = random.randint(int(self._worker_description["mean_energy"] - max(self._worker_description["energy_range"], 1)),
-                                       int(self._worker_description["mean_energy"] + self._worker_description["energy_range"]))
-      speed = random.randint(int(self._worker_description["mean_speed"] - max(self._worker_description["speed_range"], 1)),
-                             int(self._worker_description["mean_speed"] + self._worker_description["speed_range"]))
-
-      if self._worker_description["behavior"] == "SimpleWorker":
-        worker = SimpleWorker(x, y, starting_energy, speed)
-      elif self._worker_description["behavior"] == "AdvancedWorker":
-        shouting_radius = self._worker_description["shouting_radius"]
-        worker = AdvancedWorker(x, y, starting_energy, speed, shouting_radius)
-
-      entity_list.append(worker)
-      worker_list.append(worker)
-      self._worker_list.append(worker)
-      worker.selectQueen(self)
-      self.reduceEnergy(cost)
+    return self._colony_id
 
   def removeWorker(self, worker: list["WorkerBase"]):
     """
     Removes a worker from the worker list of the queen.
     """
     self._worker_list.remove(worker)
+    self._neighbor_cache.removeWorker(worker)
 
   def addWorker(self, worker: list["WorkerBase"]):
     """
@@ -154,31 +228,54 @@ class Queen(Entity):
     """
     return len(self._worker_list)
 
-  def sortWorkerListByX(self):
+  def computeAdjacentWorkers(self):
     """
-    Sorts the worker list of this queen by the x axis. Used for optimizing the advanced worker
-    shouting algorithm.
+    Hands all workers assigned to this queen the best signals shouted by their adjacent workers.
+    Used for optimizing the advanced worker shouting algorithm. The candidate pairs are cached
+    between frames if a neighbor skin is configured.
     """
-    def getWorkerX(worker):
-      return worker._x
-    self._sorted_worker_list = sorted(self._worker_list, key = getWorkerX)
+    self._neighbor_cache.computeAdjacentWorkers(self._worker_list)
 
-  def computeAdjacentWorkers(self):
+  def getDistanceField(self, width: int, height: int) -> "DistanceField":
     """
-    Computes the adjacent workers for all workers assigned to this queen. Used for optimizing
-    the advanced worker shouting algorithm.
+    Returns the distance field shared by the field workers of this colony. Creates a new
+    empty field if there is none yet or if the scene size changed.
+    :param width: The width of the scene screen.
+    :param height: The height of the scene screen.
+    :return: The distance field of the colony.
     """
-    while len(self._sorted_worker_list) > 0:
-      worker = self._sorted_worker_list.pop(0)
-      radius = worker.getShoutingRadius()
+    if self._distance_field is None or self._distance_field.getSize() != (width, height):
+      self._distance_field = DistanceField(width, height,
+                                           float(self._worker_description.get("field_cell_size", 40)),
+                                           float(self._worker_description["mean_speed"]),
+                                           int(self._worker_description.get("field_relax_passes", 1)))
+    return self._distance_field
 
-      for potential_partner in self._sorted_worker_list:
-        if potential_partner._x - worker._x > radius:
-          break
+  def getAdjacentPairNum(self) -> int:
+    """
+    Returns the number of adjacent worker pairs found by the last neighbor search of this colony.
+    """
+    return self._neighbor_cache.getAdjacentPairNum()
 
-        if abs(potential_partner._y - worker._y) <= radius:
-          worker.addToAdjacentWorkerList(potential_partner)
-          potential_partner.addToAdjacentWorkerList(worker)
+  def needsAdjacentWorkers(self) -> bool:
+    """
+    Returns True if the workers of this queen need their adjacent workers every tick.
+    """
+    return self._spawn_spec.uses_adjacent_workers
+
+  def prepareNeighborSearch(self) -> typing.Callable:
+    """
+    Reads the worker positions for the neighbor search of this colony. See NeighborListCache.
+    :return: A function returning the heard signals, which may run on another thread.
+    """
+    return self._neighbor_cache.prepareSearch(self._worker_list)
+
+  def applyNeighborSearch(self, signals: tuple):
+    """
+    Hands the workers of this colony the signals found by the neighbor search.
+    :param signals: The heard signals returned by the function of prepareNeighborSearch.
+    """
+    self._neighbor_cache.applySignals(self._worker_list, signals)
 
   def __str__(self):
     return f"<Queen {int(self._x)}:{int(self._y)}>"
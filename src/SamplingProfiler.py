@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+#
+# A low overhead sampling profiler for a running scene. A background thread
+# periodically reads the current stack of the simulation thread with
+# sys._current_frames and counts how often each stack was seen. Unlike
+# cProfile it does not hook into every function call, so the timing of the
+# simulation stays realistic, and it can be started at any time during a
+# running session.
+#
+# The samples are written as collapsed stacks (one "a;b;c count" line per
+# stack, readable by flamegraph.pl and speedscope) or as a speedscope JSON
+# file if the output path ends with ".json".
+#
+#############################################################################
+
+import json
+import os
+import sys
+import threading
+import typing
+
+
+class SamplingProfiler:
+  def __init__(self, interval: float = 0.005):
+    """
+    Constructor. Does not yet start sampling.
+    :param interval: The number of seconds between two samples.
+    """
+    self._interval = interval
+    self._target_thread_id = None
+    self._thread = None
+    self._stop_event = threading.Event()
+    self._stack_counts = {}
+    self._sample_num = 0
+
+  def start(self, thread_id: int = None):
+    """
+    Starts sampling the stack of a thread. Previous samples are discarded.
+    :param thread_id: The identifier of the thread to sample. If None, the calling thread is sampled.
+    """
+    if self._thread is not None:
+      return
+    self._target_thread_id = thread_id if thread_id is not None else threading.get_ident()
+    self._stack_counts = {}
+    self._sample_num = 0
+    self._stop_event.clear()
+    self._thread = threading.Thread(target = self._run, daemon = True)
+    self._thread.start()
+
+  def setTargetThread(self, thread_id: int):
+    """
+    Switches the sampled thread, e.g. once the simulation loop started on its own thread.
+    :param thread_id: The identifier of the thread to sample.
+    """
+    self._target_thread_id = thread_id
+
+  def stop(self, output_path: str = None) -> str:
+    """
+    Stops sampling and writes the collected stacks to a file.
+    :param output_path: The file to write. Speedscope JSON if it ends with ".json", collapsed
+                        stacks otherwise. If None, nothing is written.
+    :return: The path of the written file or None.
+    """
+    if self._thread is None:
+      return None
+    self._stop_event.set()
+    self._thread.join()
+    self._thread = None
+
+    if output_path is None:
+      return None
+    if output_path.endswith(".json"):
+      self.writeSpeedscope(output_path)
+    else:
+      self.writeCollapsed(output_path)
+    print(f"[INFO] Wrote {self._sample_num} profiler samples to {output_path}.")
+    return output_path
+
+  def isRunning(self) -> bool:
+    """
+    Returns True if the profiler is currently sampling.
+    """
+    return self._thread is not None
+
+  def getSampleNum(self) -> int:
+    """
+    Returns the number of stack samples taken since the last start.
+    """
+    return self._sample_num
+
+  def getStackCounts(self) -> dict:
+    """
+    Returns how often each stack has been sampled.
+    :return: A dictionary mapping stacks, given as tuples of frame names from the outermost
+             to the innermost frame, to their sample counts.
+    """
+    return dict(self._stack_counts)
+
+  def writeCollapsed(self, output_path: str):
+    """
+    Writes the samples in the collapsed stack format, one "frame;frame;frame count" line per stack.
+    :param output_path: The file to write.
+    """
+    with open(output_path, "w") as file:
+      for stack, count in self._stack_counts.items():
+        file.write(f"{';'.join(stack)} {count}\n")
+
+  def writeSpeedscope(self, output_path: str):
+    """
+    Writes the samples as a sampled profile in the speedscope file format.
+    :param output_path: The file to write.
+    """
+    frame_ids = {}
+    samples = []
+    weights = []
+    for stack, count in self._stack_counts.items():
+      samples.append([frame_ids.setdefault(frame, len(frame_ids)) for frame in stack])
+      weights.append(count * self._interval)
+
+    profile = {
+      "$schema": "https://www.speedscope.app/file-format-schema.json",
+      "shared": {"frames": [{"name": frame} for frame in frame_ids]},
+      "profiles": [{
+        "type": "sampled",
+        "name": "Swarm Intelligence Simulation",
+        "unit": "seconds",
+        "startValue": 0,
+        "endValue": sum(weights),
+        "samples": samples,
+        "weights": weights
+      }]
+    }
+    with open(output_path, "w") as file:
+      json.dump(profile, file)
+
+  def _run(self):
+    """
+    Samples the target thread until the profiler is stopped.
+    """
+    frame_names = {}
+
+    def getFrameName(code):
+      name = frame_names.get(code)
+      if name is None:
+        name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        frame_names[code] = name
+      return name
+
+    while not self._stop_event.wait(self._interval):
+      frame = sys._current_frames().get(self._target_thread_id)
+      if frame is None:
+        continue
+
+      stack = []
+      while frame is not None:
+        stack.append(getFrameName(frame.f_code))
+        frame = frame.f_back
+      stack = tuple(reversed(stack))
+      self._stack_counts[stack] = self._stack_counts.get(stack, 0) + 1
+      self._sample_num += 1
@@ -7,16 +7,39 @@
 
 import pygame
 import random
+import os
+import sys
+import json
 import threading
 import copy
-import itertools
+import collections
+import concurrent.futures
+import time
 import typing
 from .Food import Food
 from .Queen import Queen
 from .Obstacle import Obstacle
 from .EntityListContainer import EntityListContainer
+from .ContactDetector import ContactDetector
+from .NeighborSearchPhase import NeighborSearchPhase
+from .MemoryProfiler import MemoryProfiler
+from .SamplingProfiler import SamplingProfiler
+from .PerformanceHud import PerformanceHud
+from .ConfigManager import ConfigManager
+from .SceneSnapshot import SceneSnapshot
+from .EventBus import EventBus
+from .TargetTracker import TargetTracker
+from .WorkerRegistry import WorkerRegistry
+from .Camera import Camera
+from .MultiResolutionSeries import MultiResolutionSeries
+from .UpdateScheduler import UpdateScheduler
+from .SpatialHash import SpatialHash
 
 class Scene:
+  # Dirty rect rendering falls back to redrawing the whole screen beyond these limits.
+  _full_redraw_area_share = 0.4
+  _max_dirty_rects = 1500
+
   def __init__(self, scene_settings: dict, show_rendering: bool):
     """
     Constructor. Initializes the whole scene.
@@ -32,37 +55,74 @@ class Scene:
 
     self._scene_settings = scene_settings
     self._min_food = scene_settings["min_food_available"]
-    self._width = scene_settings["screen_width"]
-    self._height = scene_settings["screen_height"]
+    self._screen_width = scene_settings["screen_width"]
+    self._screen_height = scene_settings["screen_height"]
+    self._width = scene_settings.get("world_width", self._screen_width)
+    self._height = scene_settings.get("world_height", self._screen_height)
+    self._camera = Camera(self._screen_width, self._screen_height, self._width, self._height)
     self._fps = 30
     self._bg_color = scene_settings["background_color"]
     self.plain_text_font = None
+    self.hud_font = None
     self._do_render_legend = True
+    self._do_render_performance_hud = False
+    self._performance_hud = PerformanceHud(self._fps)
+    self._dirty_rect_rendering = scene_settings.get("dirty_rect_rendering", True)
+    self._previous_render_rects = {}
+    self._panel_rects = [None, None, None]
+    self._needs_full_redraw = True
 
     self._food_type_ratio = scene_settings["food_type_ratio"]
-    self._discrete_food_type_ratio = list(self._food_type_ratio)
-    ratio_counter = 0
-    for ratio_id in range(0, len(self._discrete_food_type_ratio)):
-      self._discrete_food_type_ratio[ratio_id] *= 100
-      ratio_counter += self._discrete_food_type_ratio[ratio_id]
-      self._discrete_food_type_ratio[ratio_id] = ratio_counter
+    self._discrete_food_type_ratio = self._computeDiscreteFoodTypeRatio(self._food_type_ratio)
 
     if self._show_rendering:
-      self._screen = pygame.display.set_mode((self._width, self._height))
+      self._screen = pygame.display.set_mode((self._screen_width, self._screen_height))
 
     self._run_simulations = True
     self._running = True
     self._thread = None
 
     self._entity_lists = EntityListContainer()
+    self._contact_detector = ContactDetector(40)
+    self._neighbor_search_phase = NeighborSearchPhase()
+    self._target_tracker = TargetTracker(self._entity_lists)
+    self._entity_lists.event_bus.subscribe(EventBus.DEATH, self._onEntityDeath)
+    # The obstacles, food sources, queens and workers hashed by their render rects, rebuilt
+    # after they moved, appeared or vanished.
+    self._render_indices = [SpatialHash(128) for _ in range(4)]
+    self._render_index_outdated = True
+    self._changed_since_cull = True
+    for event in (EventBus.SPAWN, EventBus.DEATH, EventBus.DRAG):
+      self._entity_lists.event_bus.subscribe(event, self._invalidateRenderIndex)
 
     self.left_mouse_clicked = False
     self.right_mouse_clicked = False
     self.can_click_mouse = True
     self.dragged_entity = None
 
+    self._config_watcher = None
+    self._config_check_interval = 30
+    self._colony_counter = 0
+    self._memory_profiler = MemoryProfiler()
+    self._memory_report_interval = 0
+    self._sampling_profiler = SamplingProfiler()
+    self._profile_output_path = None
+    self._loop_thread_id = None
+    self._tick_counter = 0
+    self._pending_steps = 0
+    self._command_queue = collections.deque()
+    self._control_server = None
+    self._session_log = None
+    self._session_log_path = None
+    self._replay_events = collections.deque()
+    self._colony_history = {}
+    self._colony_history_path = None
+    self._registerUpdateTasks(scene_settings)
+
     self.spawnRandomFood(scene_settings["min_food_available"])
     self.spawnRandomObstacles(scene_settings["start_obstacle_number"])
+    self._snapshot = SceneSnapshot(self._tick_counter, self._entity_lists)
+    self._snapshot_outdated = False
 
   def spawnFood(self, x: int, y: int):
     """
@@ -82,6 +142,7 @@ class Scene:
                 self._scene_settings["mean_food_speed"], food_type)
     self._entity_lists.entity_list.append(food)
     self._entity_lists.food_list.append(food)
+    self._entity_lists.event_bus.emit(EventBus.SPAWN, food)
 
   def spawnObstacle(self, x: int, y: int):
     """
@@ -92,6 +153,7 @@ class Scene:
     obstacle = Obstacle(x, y, 100)
     self._entity_lists.obstacle_list.append(obstacle)
     self._entity_lists.entity_list.append(obstacle)
+    self._entity_lists.event_bus.emit(EventBus.SPAWN, obstacle)
 
   def spawnRandomObstacles(self, num_obstacles: int):
     """
@@ -120,18 +182,336 @@ class Scene:
     :param y: Y position of queen.
     :param queen_description: Configuration of queen.
     """
-    worker_description = copy.copy(queen_description["worker_type"])
-    worker_type = None
-    if worker_description["behavior"] != "SimpleWorker" and \
-        worker_description["behavior"] != "AdvancedWorker":
+    if not WorkerRegistry.isRegistered(queen_description["worker_type"]["behavior"]):
       print("[ERROR] Invalid behavior for worker type of one of your queen.")
       exit(1)
 
-    queen = Queen(x, y, queen_description)
+    queen = Queen(x, y, queen_description, self._colony_counter)
+    self._colony_counter += 1
     self._entity_lists.entity_list.append(queen)
     self._entity_lists.queen_list.append(queen)
     queen.spawnWorker(queen_description["start_worker_number"], self._entity_lists.entity_list,
-                      self._entity_lists.worker_list, self._width, self._height, 0, 300)
+                      self._entity_lists.worker_list, self._width, self._height, 0, 300,
+                      self._entity_lists.worker_pool)
+    self._entity_lists.event_bus.emit(EventBus.SPAWN, queen)
+
+  def spawnQueens(self, queens_list: list[dict]):
+    """
+    Spawns one queen per configuration at a random position.
+    :param queens_list: The configurations of the queens.
+    """
+    for queen_description in queens_list:
+      x = random.randint(0, self._width)
+      y = random.randint(0, self._height)
+      self.spawnQueen(x, y, queen_description)
+
+  def enableConfigHotReload(self, config_watcher: "ConfigWatcher", check_interval: int = 30):
+    """
+    Lets the running scene apply changes of the config files in place instead of
+    requiring a rebuild of the whole scene.
+    :param config_watcher: The watcher observing the config files.
+    :param check_interval: The number of frames between two checks of the config files.
+    """
+    self._config_watcher = config_watcher
+    self._config_check_interval = max(1, check_interval)
+
+  def reloadChangedConfigs(self):
+    """
+    Polls the config watcher and applies all valid config changes to the scene.
+    """
+    if self._config_watcher is None:
+      return
+
+    scene_settings = self._config_watcher.pollSceneConfig()
+    if scene_settings is not None:
+      self._applyInput({"event": "scene_config", "config": scene_settings})
+
+    queens_list = self._config_watcher.pollQueensConfig()
+    if queens_list is not None:
+      self._applyInput({"event": "queens_config", "config": queens_list})
+
+  def applySceneConfig(self, scene_settings: dict):
+    """
+    Applies a changed scene config to the running scene. The screen size cannot be
+    changed while running.
+    :param scene_settings: The new (validated) scene config dictionary.
+    """
+    if scene_settings["screen_width"] != self._screen_width or scene_settings["screen_height"] != self._screen_height or \
+       scene_settings.get("world_width", scene_settings["screen_width"]) != self._width or \
+       scene_settings.get("world_height", scene_settings["screen_height"]) != self._height:
+      print("[INFO] Changing the screen or world size requires a restart of the scene.")
+
+    scene_settings = copy.copy(scene_settings)
+    scene_settings["screen_width"] = self._screen_width
+    scene_settings["screen_height"] = self._screen_height
+    scene_settings["world_width"] = self._width
+    scene_settings["world_height"] = self._height
+
+    self._scene_settings = scene_settings
+    self._min_food = scene_settings["min_food_available"]
+    self._bg_color = scene_settings["background_color"]
+    self._food_type_ratio = scene_settings["food_type_ratio"]
+    self._discrete_food_type_ratio = self._computeDiscreteFoodTypeRatio(self._food_type_ratio)
+    self._dirty_rect_rendering = scene_settings.get("dirty_rect_rendering", True)
+    self._needs_full_redraw = True
+    self._registerUpdateTasks(scene_settings)
+    print("[INFO] Applied changed scene config.")
+
+  def applyQueensConfig(self, queens_list: list[dict]):
+    """
+    Applies a changed queens config to the running queens. Each queen is matched to
+    the config entry with the same index as her colony id.
+    :param queens_list: The new (validated) list of queen configs.
+    """
+    for queen in self._entity_lists.queen_list:
+      colony_id = queen.getColonyId()
+      if colony_id < len(queens_list):
+        queen.applyConfig(queens_list[colony_id])
+    print("[INFO] Applied changed queens config.")
+
+  def enableMemoryProfiling(self, report_interval: int = 0):
+    """
+    Starts tracing the memory allocations of the scene.
+    :param report_interval: The number of frames between two automatically printed memory
+                            reports. If 0, reports are only printed on demand.
+    """
+    self._memory_profiler.start()
+    self._memory_report_interval = max(0, report_interval)
+
+  def disableMemoryProfiling(self):
+    """
+    Stops tracing the memory allocations and the automatic memory reports.
+    """
+    self._memory_profiler.stop()
+    self._memory_report_interval = 0
+
+  def reportMemory(self) -> dict:
+    """
+    Measures the memory footprint of all entities by type and prints it together with
+    the growth since the last report.
+    :return: The memory report.
+    """
+    report = self._memory_profiler.takeReport(self._entity_lists)
+    print(self._memory_profiler.formatReport(report))
+    return report
+
+  def startProfiling(self, output_path: str = None):
+    """
+    Starts sampling the stack of the simulation thread in the background.
+    :param output_path: The file the samples are written to once profiling stops. Speedscope JSON
+                        if it ends with ".json", collapsed stacks otherwise. If None, a time stamped
+                        file in the working directory is used.
+    """
+    if self._sampling_profiler.isRunning():
+      return
+    if output_path is None:
+      output_path = time.strftime("profile-%Y%m%d-%H%M%S.txt")
+    self._profile_output_path = output_path
+    self._sampling_profiler.start(self._loop_thread_id)
+    print("[INFO] Started sampling profiler.")
+
+  def stopProfiling(self) -> str:
+    """
+    Stops the sampling profiler and writes the collected samples.
+    :return: The path of the written file or None if the profiler was not running.
+    """
+    return self._sampling_profiler.stop(self._profile_output_path)
+
+  def startRecording(self, session_log: "SessionLog", output_path: str = None):
+    """
+    Records every input changing the scene into a session log, so the session can be replayed
+    exactly. The random number generator must have been seeded with the seed of the log before
+    the scene was created and the queens must have been spawned with spawnQueens.
+    :param session_log: The log to record into.
+    :param output_path: The file the log is written to when the recording stops. If None, nothing is written.
+    """
+    self._session_log = session_log
+    self._session_log_path = output_path
+
+  def stopRecording(self) -> "SessionLog":
+    """
+    Stops recording and writes the session log, if an output path was given.
+    :return: The recorded session log or None, if the scene was not recording.
+    """
+    session_log = self._session_log
+    if session_log is None:
+      return None
+    self._session_log = None
+    session_log.setTickNum(self._tick_counter)
+    if self._session_log_path is not None:
+      session_log.save(self._session_log_path)
+    return session_log
+
+  def replayEvents(self, events: list[dict]):
+    """
+    Schedules recorded input events. Each event is applied right before the tick it was recorded at.
+    :param events: The events of a session log in the order they were recorded.
+    """
+    self._replay_events = collections.deque(events)
+
+  def applyInputEvent(self, event: dict):
+    """
+    Applies a single user input to the scene. Used by the game loop as well as for replays.
+    Available events:
+      left_click (x, y, [radius, view]), right_click (x, y, [radius, view]), drag (x, y), release,
+      move_queen (colony_id, x, y),
+      scene_config (config), queens_config (config), command (command)
+    :param event: The event dictionary with the event name in the field "event".
+    """
+    name = event["event"]
+    if name == "left_click":
+      clicked_entity = self._getClickedEntity(event["x"], event["y"], event.get("radius", 40), event.get("view"))
+      if clicked_entity is not None:
+        print(f"[INFO] Dragging " + str(clicked_entity) + ".")
+        self.dragged_entity = clicked_entity
+      else:
+        print(f"[INFO] Spawning in food at pos {event['x']}:{event['y']}.")
+        self.spawnFood(event["x"], event["y"])
+    elif name == "right_click":
+      clicked_entity = self._getClickedEntity(event["x"], event["y"], event.get("radius", 40), event.get("view"))
+      if type(clicked_entity) is Obstacle:
+        print(f"[INFO] Removing " + str(clicked_entity) + ".")
+        clicked_entity.kill(self._entity_lists)
+      else:
+        print(f"[INFO] Spawning in obstacle at pos {event['x']}:{event['y']}.")
+        self.spawnObstacle(event["x"], event["y"])
+    elif name == "drag":
+      if self.dragged_entity is not None:
+        self.dragged_entity.setPosition(event["x"], event["y"])
+        self._entity_lists.event_bus.emit(EventBus.DRAG, self.dragged_entity)
+    elif name == "release":
+      self.dragged_entity = None
+    elif name == "move_queen":
+      for queen in self._entity_lists.queen_list:
+        if queen.getColonyId() == event["colony_id"]:
+          queen.setPosition(event["x"], event["y"])
+          self._entity_lists.event_bus.emit(EventBus.DRAG, queen)
+    elif name == "scene_config":
+      self.applySceneConfig(event["config"])
+    elif name == "queens_config":
+      self.applyQueensConfig(event["config"])
+    elif name == "command":
+      self.executeCommand(event["command"])
+    else:
+      print(f"[ERROR] Unknown input event <{name}>.")
+
+  def startControlServer(self, host: str = "127.0.0.1", port: int = 0, unix_path: str = None) -> "ControlServer":
+    """
+    Starts a local server accepting commands for this scene from other processes. The server
+    is stopped together with the scene.
+    :param host: The host to listen on for TCP connections.
+    :param port: The TCP port to listen on. If 0, a free port is chosen.
+    :param unix_path: If set, listens on a unix socket at this path instead of TCP.
+    :return: The started control server.
+    """
+    from .ControlServer import ControlServer
+    if self._control_server is None:
+      self._control_server = ControlServer(self, host, port, unix_path)
+      self._control_server.start()
+    return self._control_server
+
+  def submitCommand(self, command: dict) -> "concurrent.futures.Future":
+    """
+    Queues a command to be applied at the next tick boundary. Can be called from any thread.
+    :param command: The command dictionary. See executeCommand for the available commands.
+    :return: A future resolving to the result of the command.
+    """
+    future = concurrent.futures.Future()
+    self._command_queue.append((command, future))
+    return future
+
+  def executeCommand(self, command: dict) -> typing.Any:
+    """
+    Applies a single command to the scene. Must only be called between two ticks.
+    Available commands:
+      spawn_food (x, y), spawn_obstacle (x, y), spawn_queen (x, y, queen), pause, resume,
+      step (ticks, only while paused), stats, history (start_tick, end_tick, max_points, all optional),
+      snapshot, branch (mutations, ticks, max_processes optional)
+    :param command: The command dictionary with the command name in the field "command".
+    :return: The result of the command. None for commands without result. A future for the branch
+             command, which resolves after the scene already moved on.
+    """
+    name = command.get("command")
+    try:
+      if name == "spawn_food":
+        self.spawnFood(command["x"], command["y"])
+      elif name == "spawn_obstacle":
+        self.spawnObstacle(command["x"], command["y"])
+      elif name == "spawn_queen":
+        if not ConfigManager().validateQueensList([command["queen"]]):
+          raise ValueError("Invalid queen config.")
+        self.spawnQueen(command["x"], command["y"], command["queen"])
+      elif name == "pause":
+        self._run_simulations = False
+      elif name == "resume":
+        self._run_simulations = True
+      elif name == "step":
+        if self._run_simulations:
+          raise ValueError("Only a paused scene can be stepped.")
+        self._pending_steps += int(command.get("ticks", 1))
+      elif name == "stats":
+        return self.getStats()
+      elif name == "history":
+        return self.getColonyHistory(command.get("start_tick"), command.get("end_tick"), command.get("max_points"))
+      elif name == "branch":
+        max_processes = command.get("max_processes")
+        return self.startBranch(command["mutations"], int(command["ticks"]),
+                                max_processes = int(max_processes) if max_processes is not None else None)
+      elif name == "snapshot":
+        return SceneSnapshot(self._tick_counter, self._entity_lists).toDict()
+      else:
+        raise ValueError(f"Unknown command <{name}>.")
+    except KeyError as e:
+      raise ValueError(f"Missing field {e} for command <{name}>.")
+    return None
+
+  def getStats(self) -> dict:
+    """
+    Returns the current statistics of the scene and all living colonies.
+    :return: A dictionary with the tick, the entity numbers and the stats of every colony.
+    """
+    queen_number, worker_number, food_number, obstacle_number = self.getEntityNumbers()
+    return {
+      "tick": self._tick_counter,
+      "running": self._run_simulations,
+      "queens": queen_number,
+      "workers": worker_number,
+      "food": food_number,
+      "obstacles": obstacle_number,
+      "colonies": [{"colony_id": queen.getColonyId(),
+                    "workers": queen.getWorkerNum(),
+                    "energy": queen.getEnergy()} for queen in self._entity_lists.queen_list]
+    }
+
+  def getColonyHistory(self, start_tick: int = None, end_tick: int = None, max_points: int = None) -> list[dict]:
+    """
+    Returns the recorded worker numbers and queen energies of all colonies, including dead ones.
+    Recent ticks are kept raw, older ones as min/mean/max buckets. See MultiResolutionSeries.query.
+    :param start_tick: The first tick of interest. If None, the history starts at the oldest tick.
+    :param end_tick: The last tick of interest. If None, the history ends at the current tick.
+    :param max_points: If set, every series is merged into at most this many buckets.
+    :return: A dictionary with the "colony_id" and the "workers" and "energy" series of every colony.
+    """
+    return [{"colony_id": colony_id,
+             "workers": worker_series.query(start_tick, end_tick, max_points),
+             "energy": energy_series.query(start_tick, end_tick, max_points)}
+            for colony_id, (worker_series, energy_series) in self._colony_history.items()]
+
+  def exportColonyHistory(self, path: str):
+    """
+    Writes the whole colony history as JSON.
+    :param path: The path of the output file.
+    """
+    with open(path, "w") as file:
+      json.dump({"tick": self._tick_counter, "colonies": self.getColonyHistory()}, file)
+    print(f"[INFO] Wrote the history of {len(self._colony_history)} colonies to {path}.")
+
+  def setColonyHistoryExport(self, path: str):
+    """
+    Sets a file the colony history is written to when the game loop ends.
+    :param path: The path of the output file. If None, nothing is written.
+    """
+    self._colony_history_path = path
 
   def startScene(self, separate_thread: bool):
     """
@@ -146,6 +526,147 @@ class Scene:
       self._thread = None
       self._gameLoop()
 
+  def runHeadless(self, num_ticks: int, stopping_criteria: "StoppingCriteria" = None) -> dict:
+    """
+    Simulates the scene on the calling thread as fast as possible, without rendering and
+    without a frame rate cap. Stops early as soon as the stopping criteria are met. Events
+    scheduled with replayEvents are applied before the ticks they were recorded at.
+    :param num_ticks: The maximum number of ticks to simulate.
+    :param stopping_criteria: The criteria checked during the run. If None, all ticks are simulated.
+    :return: A dictionary with the number of simulated "ticks", the "stop_reason" and the final "stats".
+    """
+    from .StoppingCriteria import StoppingCriteria
+    stop_reason = StoppingCriteria.TICK_LIMIT
+    start_tick = self._tick_counter
+    for _ in range(num_ticks):
+      self._applyReplayEvents()
+      self._processCommands()
+      self._tick()
+      if stopping_criteria is not None:
+        reason = stopping_criteria.evaluate(self._tick_counter - start_tick, self._entity_lists.queen_list)
+        if reason is not None:
+          stop_reason = reason
+          break
+    self._publishSnapshot()
+    return {
+      "ticks": self._tick_counter - start_tick,
+      "stop_reason": stop_reason,
+      "stats": self.getStats()
+    }
+
+  def branch(self, mutations: list[list[dict]], num_ticks: int,
+             stopping_criteria: "StoppingCriteria" = None, max_processes: int = None) -> list[dict]:
+    """
+    Forks the process once per variant at the current tick. The children share the memory of the
+    scene copy-on-write, apply the input events of their mutation (see applyInputEvent) and run
+    headless. All variants continue with the same random numbers, so their outcomes only differ
+    by the mutations. The scene itself is not changed. Must only be called between two ticks and
+    blocks the caller until all variants are done. See startBranch for a non-blocking variant.
+    Not available on systems without os.fork.
+    :param mutations: A list of input events for every variant. An empty list yields the unchanged baseline.
+    :param num_ticks: The maximum number of ticks every variant is simulated.
+    :param stopping_criteria: The criteria checked by every variant. If None, all ticks are simulated.
+    :param max_processes: The maximum number of variants running at once. If None, the number of CPUs.
+    :return: The result of runHeadless for every variant, or a dictionary with an "error" field if
+             the variant failed. None if forking is not supported.
+    """
+    if not hasattr(os, "fork"):
+      print("[ERROR] Branching a scene requires os.fork, which is not available on this system.")
+      return None
+
+    if max_processes is None:
+      max_processes = os.cpu_count() or 1
+    max_processes = max(1, max_processes)
+
+    children = collections.deque()
+    results = []
+    random_state = random.getstate()
+    sys.stdout.flush()
+    try:
+      for mutation in mutations:
+        if len(children) >= max_processes:
+          results.append(self._collectBranch(*children.popleft()))
+        read_fd, write_fd = os.pipe()
+        try:
+          pid = os.fork()
+        except OSError:
+          os.close(read_fd)
+          os.close(write_fd)
+          raise
+        if pid == 0:
+          os.close(read_fd)
+          # The random module reseeds itself in forked children.
+          random.setstate(random_state)
+          self._runBranch(mutation, num_ticks, stopping_criteria, write_fd)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+      while children:
+        results.append(self._collectBranch(*children.popleft()))
+    finally:
+      # Children left after an error are reaped. Closing the pipe ends their output early.
+      for pid, read_fd in children:
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+    return results
+
+  def startBranch(self, mutations: list[list[dict]], num_ticks: int, stopping_criteria: "StoppingCriteria" = None,
+                  max_processes: int = None) -> "concurrent.futures.Future":
+    """
+    Like branch, but returns right away, so the scene keeps ticking and rendering. A single process
+    is forked at the current tick, which runs branch on its copy of the scene, and a background
+    thread waits for its results. Used by the "branch" command. Must only be called between two ticks.
+    :param mutations: A list of input events for every variant. See branch.
+    :param num_ticks: The maximum number of ticks every variant is simulated.
+    :param stopping_criteria: The criteria checked by every variant. If None, all ticks are simulated.
+    :param max_processes: The maximum number of variants running at once. If None, the number of CPUs.
+    :return: A future resolving to the results of branch.
+    """
+    future = concurrent.futures.Future()
+    if not hasattr(os, "fork"):
+      future.set_result(self.branch(mutations, num_ticks, stopping_criteria, max_processes))
+      return future
+
+    read_fd, write_fd = os.pipe()
+    random_state = random.getstate()
+    sys.stdout.flush()
+    try:
+      pid = os.fork()
+    except OSError:
+      os.close(read_fd)
+      os.close(write_fd)
+      raise
+    if pid == 0:
+      os.close(read_fd)
+      exit_code = 0
+      try:
+        # The random module reseeds itself in forked children.
+        random.setstate(random_state)
+        result = self.branch(mutations, num_ticks, stopping_criteria, max_processes)
+      except Exception as e:
+        result = {"error": str(e)}
+        exit_code = 1
+      try:
+        with os.fdopen(write_fd, "w") as pipe:
+          pipe.write(json.dumps(result))
+        sys.stdout.flush()
+      finally:
+        os._exit(exit_code)
+    os.close(write_fd)
+
+    def collect():
+      try:
+        result = self._collectBranch(pid, read_fd)
+      except Exception as e:
+        future.set_exception(e)
+        return
+      if type(result) is dict and "error" in result:
+        future.set_exception(RuntimeError(result["error"]))
+      else:
+        future.set_result(result)
+    threading.Thread(target = collect, daemon = True).start()
+    return future
+
   def joinSceneThread(self):
     """
     Joins the scene thread, if launched in separate thread.
@@ -157,39 +678,180 @@ class Scene:
 
   def render(self):
     """
-    Renders all entites currently present in the scene.
+    Renders all entites within the viewport of the camera. With dirty rect rendering, only the
+    areas of entities which moved, changed, appeared or vanished and of the overlay panels are
+    cleared and updated on the display. The whole screen is redrawn if these areas get too large.
     """
-    self._screen.fill(self._bg_color)
-    for entity in self._entity_lists.obstacle_list:
-      entity.renderShadow(self._screen)
-    for entity in self._entity_lists.food_list:
-      entity.renderShadow(self._screen)
-    for entity in self._entity_lists.queen_list:
-      entity.renderShadow(self._screen)
-
-    for entity in self._entity_lists.worker_list:
-      entity.render(self._screen)
-    for entity in self._entity_lists.obstacle_list:
-      entity.render(self._screen)
-    for entity in self._entity_lists.food_list:
-      entity.render(self._screen)
-    for entity in self._entity_lists.queen_list:
-      entity.render(self._screen)
-
-    self._renderLegend()
-    self._renderQueenStats()
+    visible_layers, render_rects = self._cullEntities()
+    if not self._dirty_rect_rendering or self._needs_full_redraw:
+      self._renderFullScreen(visible_layers, render_rects)
+      return
+
+    previous_render_rects = self._previous_render_rects
+    dirty_rects = []
+    for entity, rect in render_rects.items():
+      previous_rect = previous_render_rects.pop(entity, None)
+      if previous_rect != rect:
+        dirty_rects.append(rect)
+        if previous_rect is not None:
+          dirty_rects.append(previous_rect)
+    dirty_rects.extend(previous_render_rects.values())
+    dirty_rects.extend(rect for rect in self._panel_rects if rect is not None)
+    self._previous_render_rects = render_rects
+    if not dirty_rects:
+      return
 
+    dirty_area = sum(rect[2] * rect[3] for rect in dirty_rects)
+    if len(dirty_rects) > self._max_dirty_rects or \
+       dirty_area > self._full_redraw_area_share * self._screen_width * self._screen_height:
+      self._renderFullScreen(visible_layers, render_rects)
+      return
+
+    for rect in dirty_rects:
+      self._screen.fill(self._bg_color, rect)
+    self._renderEntities(visible_layers)
+    panel_rects = self._renderPanels()
+
+    # The panels are translucent, so they must not be drawn over an area which was not cleared.
+    for panel_id, panel_rect in enumerate(panel_rects):
+      if panel_rect is None:
+        continue
+      if self._panel_rects[panel_id] is None or not self._panel_rects[panel_id].contains(panel_rect):
+        self._renderFullScreen(visible_layers, render_rects)
+        return
+    self._panel_rects = [self._panel_rects[panel_id] if panel_rect is not None else None
+                         for panel_id, panel_rect in enumerate(panel_rects)]
+
+    pygame.display.update(dirty_rects)
+
+  def _cullEntities(self) -> "tuple[list[list[Entity]], dict]":
+    """
+    Collects the entities overlapping the viewport of the camera. While the scene changes every
+    frame, all entities are tested, as hashing them would cost more. Once a frame passed without
+    changes, e.g. while paused, only the entities in the render index cells of the view are tested.
+    :return: The visible obstacles, food sources, queens and workers as four lists and a dictionary
+             mapping every visible entity to the screen area it covers.
+    """
+    view = self._camera.getVisibleRect()
+    to_screen_rect = self._camera.toScreenRect
+    overlapsView = self._overlapsView
+    visible_layers = []
+    render_rects = {}
+    if self._render_index_outdated and self._changed_since_cull:
+      entity_lists = self._entity_lists
+      candidate_layers = (entity_lists.obstacle_list, entity_lists.food_list, entity_lists.queen_list,
+                          entity_lists.worker_list)
+      self._changed_since_cull = False
+    else:
+      self._updateRenderIndices()
+      candidate_layers = [render_index.query(*view) for render_index in self._render_indices]
+    for candidates in candidate_layers:
+      visible_entities = []
+      for entity in candidates:
+        rect = entity.getRenderRect()
+        if overlapsView(rect, view):
+          visible_entities.append(entity)
+          render_rects[entity] = to_screen_rect(rect)
+      visible_layers.append(visible_entities)
+    return visible_layers, render_rects
+
+  def _updateRenderIndices(self):
+    """
+    Rehashes all entities by their render rects, if any entity moved, appeared or vanished since
+    the last call.
+    """
+    if not self._render_index_outdated:
+      return
+    self._render_index_outdated = False
+    entity_lists = self._entity_lists
+    for render_index, entity_list in zip(self._render_indices, (entity_lists.obstacle_list, entity_lists.food_list,
+                                                                entity_lists.queen_list, entity_lists.worker_list)):
+      render_index.clear()
+      insert = render_index.insert
+      for entity in entity_list:
+        left, top, width, height = entity.getRenderRect()
+        insert(entity, left, top, left + width, top + height)
+
+  def _invalidateRenderIndex(self, entity: "Entity"):
+    """
+    Marks the render indices as outdated after an entity appeared, vanished or was dragged.
+    :param entity: The changed entity. None after a tick.
+    """
+    self._render_index_outdated = True
+    self._changed_since_cull = True
+
+  @staticmethod
+  def _overlapsView(rect: "tuple[int, int, int, int]", view: "tuple[float, float, float, float]") -> bool:
+    """
+    Checks if a render rect overlaps the visible part of the world.
+    :param rect: The render rect as (left, top, width, height).
+    :param view: The visible part of the world as (left, top, right, bottom).
+    :return: True if the rect is at least partially visible.
+    """
+    return rect[0] < view[2] and rect[1] < view[3] and rect[0] + rect[2] > view[0] and rect[1] + rect[3] > view[1]
+
+  def _renderFullScreen(self, visible_layers: "list[list[Entity]]", render_rects: dict):
+    """
+    Clears and redraws the whole screen and flips the display.
+    :param visible_layers: The visible entities returned by _cullEntities.
+    :param render_rects: The screen areas of the visible entities, remembered for the next dirty rect update.
+    """
+    self._screen.fill(self._bg_color)
+    self._renderEntities(visible_layers)
+    self._panel_rects = self._renderPanels()
+    self._previous_render_rects = render_rects
+    self._needs_full_redraw = False
     pygame.display.flip()
 
+  def _renderEntities(self, visible_layers: "list[list[Entity]]"):
+    """
+    Draws the shadows and bodies of the visible entities in their layer order.
+    :param visible_layers: The visible entities returned by _cullEntities.
+    """
+    obstacles, foods, queens, workers = visible_layers
+    screen = self._screen
+    camera = self._camera
+    for entity in obstacles:
+      entity.renderShadow(screen, camera)
+    for entity in foods:
+      entity.renderShadow(screen, camera)
+    for entity in queens:
+      entity.renderShadow(screen, camera)
+
+    for entity in workers:
+      entity.render(screen, camera)
+    for entity in obstacles:
+      entity.render(screen, camera)
+    for entity in foods:
+      entity.render(screen, camera)
+    for entity in queens:
+      entity.render(screen, camera)
+
+  def _renderPanels(self) -> list["pygame.Rect"]:
+    """
+    Draws the legend, the queen stats and the performance overlay.
+    :return: The screen area covered by each panel, None for hidden panels.
+    """
+    return [self._renderLegend(), self._renderQueenStats(), self._renderPerformanceHud()]
+
   def behave(self):
     """
     Performs the behavioral simulations of all entites currently present in the scene.
     """
+    start_time = time.perf_counter()
+    self._contact_detector.computeContacts(self._entity_lists)
+    contacts_time = time.perf_counter()
+    self._neighbor_search_phase.computeAdjacentWorkers(self._entity_lists.queen_list)
+    neighbors_time = time.perf_counter()
     for entity in self._entity_lists.entity_list:
       alive = entity.behave(self._entity_lists, self._width, self._height)
       if not alive:
         entity.kill(self._entity_lists)
 
+    self._performance_hud.recordPhase("contacts", contacts_time - start_time)
+    self._performance_hud.recordPhase("neighbors", neighbors_time - contacts_time)
+    self._performance_hud.recordPhase("behave", time.perf_counter() - neighbors_time)
+
   def registerMouseClick(self):
     """
     Registers a left or a right mouse click and stores it for later use.
@@ -217,62 +879,64 @@ class Scene:
     """
     Used a stored left or right mouse click to perform certain user-input actions.
     """
-    def getClickedEntity(mouse_pos, distance):
-      for entity in itertools.chain(*[self._entity_lists.obstacle_list, self._entity_lists.queen_list, self._entity_lists.food_list]):
-        if mouse_pos[0] <= entity._x + distance and mouse_pos[0] >= entity._x - distance:
-          if mouse_pos[1] <= entity._y + distance and mouse_pos[1] >= entity._y - distance:
-            return entity
-      return None
-
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_x, mouse_y = self._camera.toWorld(*pygame.mouse.get_pos())
     mouse_held = pygame.mouse.get_pressed()[0]
-    if self.left_mouse_clicked:
-      clicked_entity = getClickedEntity(mouse_pos, 40)
-      if clicked_entity is not None:
-        print(f"[INFO] Dragging " + str(clicked_entity) + ".")
-        self.dragged_entity = clicked_entity
-      else:
-        print(f"[INFO] Spawning in food at pos {mouse_pos[0]}:{mouse_pos[1]}.")
-        self.spawnFood(mouse_pos[0], mouse_pos[1])
-
-    if self.right_mouse_clicked:
-      clicked_entity = getClickedEntity(mouse_pos, 40)
-      if type(clicked_entity) is Obstacle:
-        print(f"[INFO] Removing " + str(clicked_entity) + ".")
-        clicked_entity.kill(self._entity_lists)
-      else:
-        print(f"[INFO] Spawning in obstacle at pos {mouse_pos[0]}:{mouse_pos[1]}.")
-        self.spawnObstacle(mouse_pos[0], mouse_pos[1])
+    if self.left_mouse_clicked or self.right_mouse_clicked:
+      # Clicks only hit entities within the viewport. The viewport is part of the event, so replays hit the same ones.
+      click = {"x": int(mouse_x), "y": int(mouse_y), "radius": 40 / self._camera.getZoom(),
+               "view": list(self._camera.getVisibleRect())}
+      if self.left_mouse_clicked:
+        self._applyInput(dict(click, event = "left_click"))
+      if self.right_mouse_clicked:
+        self._applyInput(dict(click, event = "right_click"))
 
     if self.dragged_entity is not None and not mouse_held:
-      self.dragged_entity = None
+      self._applyInput({"event": "release"})
 
   def handleEntityDrag(self):
     """
     Performs operations, so that an entity can follow the mouse cursor if it is dragged.
     """
     if self.dragged_entity is not None:
-      if self.dragged_entity._energy <= 0:
-        self.dragged_entity = None
+      mouse_x, mouse_y = self._camera.toWorld(*pygame.mouse.get_pos())
+      mouse_pos = (int(mouse_x), int(mouse_y))
+      if (self.dragged_entity._x, self.dragged_entity._y) == mouse_pos:
         return
-      mouse_pos = pygame.mouse.get_pos()
-      self.dragged_entity.setPosition(mouse_pos[0], mouse_pos[1])
+      self._applyInput({"event": "drag", "x": mouse_pos[0], "y": mouse_pos[1]})
 
   def getEntityNumbers(self) -> "tuple(int, int, int, int)":
     """
-    Returns the number of all different entities currently present in the scene.
+    Returns the number of all different entities currently present in the scene. Reads the live
+    entity lists like getEntityLists, so it is not safe to call from another thread while the scene
+    is running on its own thread, as the numbers may stem from different points of a tick. Use
+    getSnapshot().getEntityNumbers() there.
     :return: A tuple containing the numbers of all queens, workers, foods, obstacles, in this order.
     """
     return len(self._entity_lists.queen_list), len(self._entity_lists.worker_list),\
            len(self._entity_lists.food_list), len(self._entity_lists.obstacle_list)
 
+  def getCamera(self) -> "Camera":
+    """
+    Returns the camera defining the part of the world shown in the window.
+    """
+    return self._camera
+
   def getEntityLists(self) -> "EntityListContainer":
     """
     Returns a reference to the entity list container, which contains all entites currently
-    present in the scene.
+    present in the scene. The lists are mutated by a running scene, so neither they nor
+    getEntityNumbers are safe to read from another thread. Use getSnapshot to read the state
+    from another thread.
     """
     return self._entity_lists
 
+  def getSnapshot(self) -> "SceneSnapshot":
+    """
+    Returns the immutable snapshot of the scene published at the last tick boundary. Can be
+    called from any thread without blocking the simulation.
+    """
+    return self._snapshot
+
   def exitScene(self):
     """
     Sets a flag to exit the scene.
@@ -286,9 +950,11 @@ class Scene:
     :param font: The font to render the text with.
     :param x: The x position of the text center. If set to None, it is placed in the center of the x axis.
     :param y: The y position of the text center.
+    :return: The screen area covered by the text.
     """
     lines = text.split('\n')
     y_offset = 0
+    covered_rect = None
 
     center_text = False
     if x is None:
@@ -298,17 +964,20 @@ class Scene:
       text_surface = font.render(line, True, color)
       text_width, text_height = text_surface.get_size()
       if center_text:
-        x = (self._width - text_width) // 2
+        x = (self._screen_width - text_width) // 2
 
-      self._screen.blit(text_surface, (x, y + y_offset))
+      line_rect = self._screen.blit(text_surface, (x, y + y_offset))
+      covered_rect = line_rect if covered_rect is None else covered_rect.union(line_rect)
       y_offset += font.get_linesize()
+    return covered_rect
 
   def _renderLegend(self):
     """
     Renders a legend for the user input to the upper left corner.
+    :return: The screen area covered by the legend or None, if it is hidden.
     """
     if not self._do_render_legend:
-      return
+      return None
 
     legend_text = "Control Scheme:\n\n" +\
                   "Escape - Exit\n" +\
@@ -316,43 +985,63 @@ class Scene:
                   "Click left mouse - Spawn Food\n" +\
                   "Click right mouse - Spawn/Remove Obstacle\n" +\
                   "Drag entity with cursor - Move entity around\n" +\
-                  "F1 / H - Toggle legend\n\n" +\
+                  "F1 / H - Toggle legend\n" +\
+                  "F2 - Toggle performance overlay\n" +\
+                  "F3 - Print memory report\n" +\
+                  "F4 - Start / Stop sampling profiler\n" +\
+                  "Arrows / Middle mouse - Pan camera\n" +\
+                  "Mouse wheel - Zoom, Home - Reset camera\n\n" +\
                   "Have fun experimenting ;)"
 
     width = 700
-    height = 360
+    height = 510
     x_pos = 10
     y_pos = 10
 
     transparent_surface = pygame.Surface((width, height), pygame.SRCALPHA)
     transparent_surface.set_alpha(40)
     pygame.draw.rect(transparent_surface, (255, 255, 255), (0, 0, width, height))
-    self._screen.blit(transparent_surface, (x_pos, y_pos))
-    self._drawText(legend_text, self.plain_text_font, x_pos + 10, y_pos + 10)
+    covered_rect = self._screen.blit(transparent_surface, (x_pos, y_pos))
+    return covered_rect.union(self._drawText(legend_text, self.plain_text_font, x_pos + 10, y_pos + 10))
 
   def _renderQueenStats(self):
     """
     Renders queen energy stats and counters for the different worker colonies to the right side of the screen.
+    :return: The screen area covered by the stats.
     """
-
     width = 600
     height = 45 * len(self._entity_lists.queen_list)
-    x_pos = self._width - width - 10
+    x_pos = self._screen_width - width - 10
     y_pos = 20
     y_offset = 40
 
     transparent_surface = pygame.Surface((width, height), pygame.SRCALPHA)
     transparent_surface.set_alpha(40)
     pygame.draw.rect(transparent_surface, (255, 255, 255), (0, 0, width, height))
-    self._screen.blit(transparent_surface, (x_pos - 10, y_pos - 10))
+    covered_rect = self._screen.blit(transparent_surface, (x_pos - 10, y_pos - 10))
 
     queen_counter = 0
     for queen in self._entity_lists.queen_list:
       counter_text = f"Queen {queen_counter} workers: {queen.getWorkerNum()} | energy: {int(queen.getEnergy())}"
-      self._drawText(counter_text, self.plain_text_font, x_pos, y_pos, queen.getColor())
+      covered_rect.union_ip(self._drawText(counter_text, self.plain_text_font, x_pos, y_pos, queen.getColor()))
 
       y_pos += y_offset
       queen_counter += 1
+    return covered_rect
+
+  def _renderPerformanceHud(self):
+    """
+    Renders the performance overlay with frame rate, phase timings and frame time sparkline
+    to the lower left corner.
+    :return: The screen area covered by the overlay or None, if it is hidden.
+    """
+    if not self._do_render_performance_hud:
+      return None
+
+    colony_pairs = [(queen.getColonyId(), queen.getAdjacentPairNum())
+                    for queen in self._entity_lists.queen_list if queen.needsAdjacentWorkers()]
+    return self._performance_hud.render(self._screen, self.hud_font, 10, self._screen_height - 250,
+                                        self.getEntityNumbers(), colony_pairs)
 
   def _gameLoop(self):
     """
@@ -363,8 +1052,16 @@ class Scene:
 
     if self._show_rendering:
       self.plain_text_font = pygame.font.Font(None, 45)
+      self.hud_font = pygame.font.Font(None, 30)
+
+    self._loop_thread_id = threading.get_ident()
+    if self._sampling_profiler.isRunning():
+      self._sampling_profiler.setTargetThread(self._loop_thread_id)
 
+    performance_hud = self._performance_hud
+    perf_counter = time.perf_counter
     while self._running:
+      frame_start_time = perf_counter()
       if self._show_rendering:
         for event in pygame.event.get():
           if event.type == pygame.QUIT:
@@ -376,28 +1073,287 @@ class Scene:
               self._run_simulations = not self._run_simulations
             if event.key == pygame.K_F1 or event.key == pygame.K_h:
               self._do_render_legend = not self._do_render_legend
+            if event.key == pygame.K_F2:
+              self._do_render_performance_hud = not self._do_render_performance_hud
+            if event.key == pygame.K_F3:
+              self.reportMemory()
+            if event.key == pygame.K_F4:
+              if self._sampling_profiler.isRunning():
+                self.stopProfiling()
+              else:
+                self.startProfiling()
+            if event.key == pygame.K_HOME:
+              self._camera.reset()
+              self._needs_full_redraw = True
+          if event.type == pygame.MOUSEWHEEL:
+            self._camera.zoomAt(1.25 ** event.y, *pygame.mouse.get_pos())
+            self._needs_full_redraw = True
+          if event.type == pygame.MOUSEMOTION and event.buttons[1]:
+            self._camera.pan(-event.rel[0], -event.rel[1])
+            self._needs_full_redraw = True
+
+        self._panCameraWithKeys()
 
         if frame_counter == 250:
           self._do_render_legend = False
 
       frame_counter += 1
+      input_time = perf_counter()
+      performance_hud.recordPhase("input", input_time - frame_start_time)
+
+      self._applyReplayEvents()
+      if self._config_watcher is not None and frame_counter % self._config_check_interval == 0:
+        self.reloadChangedConfigs()
+
+      self._processCommands()
+      performance_hud.recordPhase("commands", perf_counter() - input_time)
 
       if self._run_simulations:
-        self.behave()
-        self._spawnPeriodicFood()
+        self._tick()
+      elif self._pending_steps > 0:
+        self._pending_steps -= 1
+        self._tick()
+
+      if self._snapshot_outdated:
+        self._publishSnapshot()
+
+      if self._memory_report_interval > 0 and frame_counter % self._memory_report_interval == 0:
+        self.reportMemory()
 
       if self._show_rendering:
+        render_start_time = perf_counter()
         self.render()
+        performance_hud.recordPhase("render", perf_counter() - render_start_time)
 
+      busy_time = perf_counter() - frame_start_time
       clock.tick(self._fps)
 
       if self._show_rendering:
+        input_start_time = perf_counter()
         self.registerMouseClick()
         self.checkMouseClick()
         self.handleEntityDrag()
+        input_time = perf_counter() - input_start_time
+        performance_hud.recordPhase("input", input_time)
+        busy_time += input_time
 
+      performance_hud.endFrame(busy_time, clock.get_fps())
+
+    if self._control_server is not None:
+      self._control_server.stop()
+      self._control_server = None
+    while self._command_queue:
+      command, future = self._command_queue.popleft()
+      future.cancel()
+    self._neighbor_search_phase.shutdown()
+    self.stopProfiling()
+    self.stopRecording()
+    if self._colony_history_path is not None:
+      self.exportColonyHistory(self._colony_history_path)
     pygame.quit()
 
+  def _tick(self):
+    """
+    Advances the simulation by a single tick.
+    """
+    self.behave()
+    self._spawnPeriodicFood()
+    self._entity_lists.update_scheduler.advance()
+    self._tick_counter += 1
+    self._snapshot_outdated = True
+    self._invalidateRenderIndex(None)
+    self._recordColonyHistory()
+
+  def _registerUpdateTasks(self, scene_settings: dict):
+    """
+    Registers the work spread over several ticks with the periods of the scene config.
+    :param scene_settings: The scene config dictionary.
+    """
+    self._entity_lists.update_scheduler.registerSimulationTasks(scene_settings.get("update_periods"))
+
+  def _recordColonyHistory(self):
+    """
+    Appends the worker number and the energy of every living queen to the history of its colony.
+    """
+    tick = self._tick_counter
+    colony_history = self._colony_history
+    for queen in self._entity_lists.queen_list:
+      series = colony_history.get(queen.getColonyId())
+      if series is None:
+        series = colony_history[queen.getColonyId()] = (MultiResolutionSeries(), MultiResolutionSeries())
+      series[0].append(tick, queen.getWorkerNum())
+      series[1].append(tick, queen.getEnergy())
+
+  def _panCameraWithKeys(self):
+    """
+    Pans the camera while the arrow keys are held.
+    """
+    pressed_keys = pygame.key.get_pressed()
+    dx = (pressed_keys[pygame.K_RIGHT] - pressed_keys[pygame.K_LEFT]) * 20
+    dy = (pressed_keys[pygame.K_DOWN] - pressed_keys[pygame.K_UP]) * 20
+    if dx or dy:
+      self._camera.pan(dx, dy)
+      self._needs_full_redraw = True
+
+  def _getClickedEntity(self, x: int, y: int, distance: float, view: list[float] = None) -> "Entity":
+    """
+    Returns the first obstacle, queen or food source close to a clicked world position.
+    :param x: The clicked x position.
+    :param y: The clicked y position.
+    :param distance: The maximum distance on both axes.
+    :param view: The visible part of the world as (left, top, right, bottom). Entities whose render
+                 rect does not overlap it are ignored, like in culling. If None, all entities are considered.
+    :return: The clicked entity or None.
+    """
+    self._updateRenderIndices()
+    obstacle_index, food_index, queen_index, _ = self._render_indices
+    entity_lists = self._entity_lists
+    for render_index, entity_list in ((obstacle_index, entity_lists.obstacle_list), (queen_index, entity_lists.queen_list),
+                                      (food_index, entity_lists.food_list)):
+      # The render rect of every entity contains its center, so the cells around the click hold all candidates.
+      clicked_entities = [entity for entity in render_index.query(x - distance, y - distance, x + distance, y + distance)
+                          if abs(entity._x - x) <= distance and abs(entity._y - y) <= distance and
+                          (view is None or self._overlapsView(entity.getRenderRect(), view))]
+      if clicked_entities:
+        # Picks the first in list order, so replays select the same entity.
+        return clicked_entities[0] if len(clicked_entities) == 1 else min(clicked_entities, key = entity_list.index)
+    return None
+
+  def _applyInput(self, event: dict):
+    """
+    Records an input event, if the scene is recording, and applies it.
+    :param event: The event dictionary. See applyInputEvent.
+    """
+    if self._session_log is not None:
+      self._session_log.addEvent(self._tick_counter, event)
+    self.applyInputEvent(event)
+    self._snapshot_outdated = True
+
+  def _applyReplayEvents(self):
+    """
+    Applies all scheduled replay events recorded before the current tick.
+    """
+    replay_events = self._replay_events
+    while replay_events and replay_events[0]["tick"] <= self._tick_counter:
+      self.applyInputEvent(replay_events.popleft())
+      self._snapshot_outdated = True
+
+  def _collectBranch(self, pid: int, read_fd: int) -> dict:
+    """
+    Waits for a forked variant of branch and reads its result.
+    :param pid: The process id of the variant.
+    :param read_fd: The read end of the pipe from the variant. Closed afterwards.
+    :return: The result of the variant or a dictionary with an "error" field.
+    """
+    try:
+      with os.fdopen(read_fd) as pipe:
+        data = pipe.read()
+    finally:
+      os.waitpid(pid, 0)
+    if not data:
+      return {"error": "The variant exited without a result."}
+    try:
+      return json.loads(data)
+    except json.JSONDecodeError as e:
+      return {"error": f"The variant returned an invalid result: {e}"}
+
+  def _runBranch(self, mutation: list[dict], num_ticks: int, stopping_criteria: "StoppingCriteria", write_fd: int):
+    """
+    Body of a forked variant of branch. Detaches the copy of the scene from everything owned by
+    the parent process, applies the mutation, runs headless and writes the result to the pipe.
+    Never returns.
+    :param mutation: The input events of this variant.
+    :param num_ticks: The maximum number of ticks to simulate.
+    :param stopping_criteria: The criteria checked during the run or None.
+    :param write_fd: The write end of the pipe to the parent process.
+    """
+    exit_code = 0
+    try:
+      # Threads, pending commands and open recordings of the parent do not exist in the child.
+      self._neighbor_search_phase = NeighborSearchPhase()
+      self._command_queue = collections.deque()
+      self._replay_events = collections.deque()
+      self._control_server = None
+      self._session_log = None
+      self._show_rendering = False
+      for event in mutation:
+        self.applyInputEvent(event)
+      result = self.runHeadless(num_ticks, stopping_criteria)
+    except Exception as e:
+      result = {"error": str(e)}
+      exit_code = 1
+    try:
+      with os.fdopen(write_fd, "w") as pipe:
+        pipe.write(json.dumps(result))
+      sys.stdout.flush()
+    finally:
+      os._exit(exit_code)
+
+  def _onEntityDeath(self, entity: "Entity"):
+    """
+    Stops dragging an entity as soon as it dies.
+    :param entity: The dead entity.
+    """
+    if entity is self.dragged_entity:
+      self.dragged_entity = None
+
+  def _publishSnapshot(self):
+    """
+    Builds a new snapshot of the scene while readers still see the previous one and then
+    replaces it with a single reference assignment. Published snapshots are never modified,
+    so readers holding an older one keep a consistent view.
+    """
+    self._snapshot = SceneSnapshot(self._tick_counter, self._entity_lists)
+    self._snapshot_outdated = False
+
+  def _processCommands(self):
+    """
+    Applies all queued commands and resolves their futures. Called at the tick boundary.
+    """
+    while self._command_queue:
+      command, future = self._command_queue.popleft()
+      if not future.set_running_or_notify_cancel():
+        continue
+      try:
+        result = self.executeCommand(command)
+      except Exception as e:
+        future.set_exception(e)
+        continue
+      self._snapshot_outdated = True
+      if self._session_log is not None and command.get("command") in ("spawn_food", "spawn_obstacle", "spawn_queen"):
+        self._session_log.addEvent(self._tick_counter, {"event": "command", "command": command})
+      if isinstance(result, concurrent.futures.Future):
+        # Long running commands resolve their future later, without blocking the tick loop.
+        result.add_done_callback(lambda done, future = future: self._resolveCommand(future, done))
+      else:
+        future.set_result(result)
+
+  @staticmethod
+  def _resolveCommand(future: "concurrent.futures.Future", done: "concurrent.futures.Future"):
+    """
+    Passes the outcome of a finished long running command on to the future of its request.
+    :param future: The future returned by submitCommand.
+    :param done: The finished future returned by executeCommand.
+    """
+    if done.exception() is not None:
+      future.set_exception(done.exception())
+    else:
+      future.set_result(done.result())
+
+  def _computeDiscreteFoodTypeRatio(self, food_type_ratio: list[float]) -> list[float]:
+    """
+    Converts the food type ratio into cumulative percentages used to draw random food types.
+    :param food_type_ratio: The ratios of the food types.
+    :return: The cumulative ratios in percent.
+    """
+    discrete_food_type_ratio = list(food_type_ratio)
+    ratio_counter = 0
+    for ratio_id in range(0, len(discrete_food_type_ratio)):
+      discrete_food_type_ratio[ratio_id] *= 100
+      ratio_counter += discrete_food_type_ratio[ratio_id]
+      discrete_food_type_ratio[ratio_id] = ratio_counter
+    return discrete_food_type_ratio
+
   def _spawnPeriodicFood(self):
     """
     Spawns with a certain probability, if too few food sources are currently present.
@@ -405,6 +1361,9 @@ class Scene:
     if len(self._entity_lists.food_list) >= self._min_food:
       return
 
-    if random.randint(0, 100) <= 8:
+    # Only checked once per period of the food spawn task, with a chance scaled by the period.
+    update_scheduler = self._entity_lists.update_scheduler
+    if update_scheduler.isDue(UpdateScheduler.FOOD_SPAWN) and \
+        random.random() < update_scheduler.getScaledChance(UpdateScheduler.FOOD_SPAWN, 9 / 101):
       self.spawnRandomFood(1)
 
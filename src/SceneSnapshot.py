@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+#
+# An immutable view of the scene state at a single tick boundary. Stores the
+# positions, energies, colony ids and obstacle sizes in flat read-only
+# arrays, so other threads can read a consistent state of the scene while
+# the simulation keeps running.
+#
+#############################################################################
+
+from array import array
+import typing
+
+
+class SceneSnapshot:
+  __slots__ = ("_tick", "_queen_x", "_queen_y", "_queen_energy", "_queen_colony", "_queen_worker_num",
+               "_worker_x", "_worker_y", "_worker_energy", "_worker_colony",
+               "_food_x", "_food_y", "_food_energy", "_obstacle_x", "_obstacle_y", "_obstacle_size")
+
+  def __init__(self, tick: int, entity_lists: "EntityListContainer"):
+    """
+    Constructor. Copies the current state of all entities. Must be called between two ticks.
+    :param tick: The number of ticks simulated so far.
+    :param entity_lists: The container of all entity lists which is managed by the Scene.
+    """
+    queens = entity_lists.queen_list
+    workers = entity_lists.worker_list
+    food = entity_lists.food_list
+    obstacles = entity_lists.obstacle_list
+
+    def readOnly(type_code, values):
+      return memoryview(array(type_code, values)).toreadonly()
+
+    def getColonyId(worker):
+      if worker._primary_queen is None:
+        return -1
+      return worker._primary_queen._colony_id
+
+    self._tick = tick
+    self._queen_x = readOnly("d", [queen._x for queen in queens])
+    self._queen_y = readOnly("d", [queen._y for queen in queens])
+    self._queen_energy = readOnly("d", [queen._energy for queen in queens])
+    self._queen_colony = readOnly("l", [queen._colony_id for queen in queens])
+    self._queen_worker_num = readOnly("l", [len(queen._worker_list) for queen in queens])
+    self._worker_x = readOnly("d", [worker._x for worker in workers])
+    self._worker_y = readOnly("d", [worker._y for worker in workers])
+    self._worker_energy = readOnly("d", [worker._energy for worker in workers])
+    self._worker_colony = readOnly("l", [getColonyId(worker) for worker in workers])
+    self._food_x = readOnly("d", [entity._x for entity in food])
+    self._food_y = readOnly("d", [entity._y for entity in food])
+    self._food_energy = readOnly("d", [entity._energy for entity in food])
+    self._obstacle_x = readOnly("d", [obstacle._x for obstacle in obstacles])
+    self._obstacle_y = readOnly("d", [obstacle._y for obstacle in obstacles])
+    self._obstacle_size = readOnly("d", [obstacle._size for obstacle in obstacles])
+
+  @property
+  def tick(self) -> int:
+    return self._tick
+
+  @property
+  def queen_x(self) -> memoryview:
+    return self._queen_x
+
+  @property
+  def queen_y(self) -> memoryview:
+    return self._queen_y
+
+  @property
+  def queen_energy(self) -> memoryview:
+    return self._queen_energy
+
+  @property
+  def queen_colony(self) -> memoryview:
+    return self._queen_colony
+
+  @property
+  def queen_worker_num(self) -> memoryview:
+    return self._queen_worker_num
+
+  @property
+  def worker_x(self) -> memoryview:
+    return self._worker_x
+
+  @property
+  def worker_y(self) -> memoryview:
+    return self._worker_y
+
+  @property
+  def worker_energy(self) -> memoryview:
+    return self._worker_energy
+
+  @property
+  def worker_colony(self) -> memoryview:
+    return self._worker_colony
+
+  @property
+  def food_x(self) -> memoryview:
+    return self._food_x
+
+  @property
+  def food_y(self) -> memoryview:
+    return self._food_y
+
+  @property
+  def food_energy(self) -> memoryview:
+    return self._food_energy
+
+  @property
+  def obstacle_x(self) -> memoryview:
+    return self._obstacle_x
+
+  @property
+  def obstacle_y(self) -> memoryview:
+    return self._obstacle_y
+
+  @property
+  def obstacle_size(self) -> memoryview:
+    return self._obstacle_size
+
+  def getEntityNumbers(self) -> "tuple(int, int, int, int)":
+    """
+    Returns the number of all different entities at the time of the snapshot.
+    :return: A tuple containing the numbers of all queens, workers, foods, obstacles, in this order.
+    """
+    return len(self._queen_x), len(self._worker_x), len(self._food_x), len(self._obstacle_x)
+
+  def toDict(self) -> dict:
+    """
+    Converts the snapshot into a JSON serializable dictionary.
+    :return: A dictionary with a list of [x, y, energy(, colony id)] entries per entity type and
+             [x, y, size] entries for the obstacles.
+    """
+    return {
+      "tick": self._tick,
+      "queens": [list(values) for values in zip(self._queen_x, self._queen_y, self._queen_energy, self._queen_colony)],
+      "workers": [list(values) for values in zip(self._worker_x, self._worker_y, self._worker_energy, self._worker_colony)],
+      "food": [list(values) for values in zip(self._food_x, self._food_y, self._food_energy)],
+      "obstacles": [list(values) for values in zip(self._obstacle_x, self._obstacle_y, self._obstacle_size)]
+    }
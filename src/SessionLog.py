@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+#
+# A small log for the exact replay of an interactive session. Instead of the
+# trajectories of all entities, it only stores the random seed, the configs
+# the scene was built from and every input that changed the scene, stamped
+# with the tick it was applied at. Since the simulation is deterministic for
+# a given seed, re-injecting the inputs at the same ticks reconstructs the
+# whole session, headless and at full speed.
+#
+#############################################################################
+
+import json
+import typing
+
+
+class SessionLog:
+  def __init__(self, seed: int, scene_settings: dict, queens_list: list[dict]):
+    """
+    Constructor. Starts an empty log.
+    :param seed: The seed of the random number generator the session was started with.
+    :param scene_settings: The scene config the scene was built from.
+    :param queens_list: The queen configs the colonies were spawned from.
+    """
+    self._seed = seed
+    self._scene_settings = scene_settings
+    self._queens_list = queens_list
+    self._events = []
+    self._tick_num = 0
+
+  @staticmethod
+  def load(path: str) -> "SessionLog":
+    """
+    Loads a session log from a file written by save.
+    :param path: The path of the log file.
+    :return: The loaded session log.
+    """
+    with open(path) as file:
+      data = json.load(file)
+    session_log = SessionLog(data["seed"], data["scene_settings"], data["queens_list"])
+    session_log._events = data["events"]
+    session_log._tick_num = data["ticks"]
+    return session_log
+
+  def save(self, path: str):
+    """
+    Writes the log as JSON.
+    :param path: The path of the log file.
+    """
+    data = {
+      "seed": self._seed,
+      "scene_settings": self._scene_settings,
+      "queens_list": self._queens_list,
+      "ticks": self._tick_num,
+      "events": self._events
+    }
+    with open(path, "w") as file:
+      json.dump(data, file)
+    print(f"[INFO] Wrote {len(self._events)} input events of {self._tick_num} ticks to {path}.")
+
+  def addEvent(self, tick: int, event: dict):
+    """
+    Appends an input event. Events must be added in the order they were applied.
+    :param tick: The number of ticks simulated when the event was applied.
+    :param event: The event dictionary with the event name in the field "event".
+    """
+    self._events.append(dict(event, tick = tick))
+    self._tick_num = max(self._tick_num, tick)
+
+  def setTickNum(self, tick_num: int):
+    """
+    Sets the number of ticks the session ran for.
+    """
+    self._tick_num = tick_num
+
+  def getTickNum(self) -> int:
+    """
+    Returns the number of ticks the session ran for.
+    """
+    return self._tick_num
+
+  def getSeed(self) -> int:
+    """
+    Returns the seed the session was started with.
+    """
+    return self._seed
+
+  def getEvents(self) -> list[dict]:
+    """
+    Returns all input events in the order they were applied.
+    """
+    return self._events
+
+  def createScene(self, show_rendering: bool = False) -> "Scene":
+    """
+    Rebuilds the scene at the start of the session and schedules all input events for replay.
+    :param show_rendering: If True, the replayed scene is rendered.
+    :return: The scene, ready to be run with Scene.runHeadless(session_log.getTickNum()).
+    """
+    import random
+    from .Scene import Scene
+    random.seed(self._seed)
+    scene = Scene(self._scene_settings, show_rendering)
+    scene.spawnQueens(self._queens_list)
+    scene.replayEvents(self._events)
+    return scene
@@ -10,11 +10,14 @@ import pygame
 import random
 import typing
 from .WorkerBase import WorkerBase
+from .UpdateScheduler import UpdateScheduler
 
 
 
 
 class SimpleWorker(WorkerBase):
+  __slots__ = ()
+
   def __init__(self, x: int, y: int, energy: float, speed: int):
     """
     Constructor. Setup a default worker.
@@ -24,72 +27,94 @@ class SimpleWorker(WorkerBase):
     :param speed: The movement speed of the worker.
     """
     super().__init__(x, y, energy)
-    self._direction = [0, 0]
     self._speed = speed
     self._food_color = None
 
-  def render(self, screen: "pygame.Screen"):
+  def respawn(self, x: int, y: int, energy: float, speed: int):
+    """
+    Resets a dead worker, so it can be reused for a new birth.
+    :param x: The x position of the worker.
+    :param y: The y position of the worker.
+    :param energy: The starting energy of the worker.
+    :param speed: The movement speed of the worker.
+    """
+    super().respawn(x, y, energy)
+    self._speed = speed
+
+  def render(self, screen: "pygame.Screen", camera: "Camera"):
     """
     Renders the worker on the screen.
     :param screen: The screen to render the worker on.
+    :param camera: The camera converting world positions into screen positions.
     """
-    pygame.draw.circle(screen, self._color, (self._x, self._y), 4)
+    zoom = camera.getZoom()
+    x, y = camera.toScreen(self._x, self._y)
+    pygame.draw.circle(screen, self._color, (x, y), max(4 * zoom, 1))
     if self._has_food and self._primary_food is not None:
-      pygame.draw.circle(screen, self._food_color, (self._x, self._y + 3), 2)
+      pygame.draw.circle(screen, self._food_color, (x, y + 3 * zoom), max(2 * zoom, 1))
 
   def moveToFood(self):
     """
     Changes direction to the primary food source.
     """
-    self._direction = self.computeDirection(self._primary_food)
+    self.setDirectionTo(self._primary_food)
 
   def moveToQueen(self):
     """
     Changes direction to the primary queen.
     """
-    self._direction = self.computeDirection(self._primary_queen)
+    self.setDirectionTo(self._primary_queen)
 
   def takeFood(self):
     """
     Takes food if it touches food and has no food.
     """
     if self._primary_food is not None:
-      if self.computeDistance(self._primary_food) <= 40:
+      if self._primary_food in self._food_contacts:
         self._has_food = self._primary_food.reduceEnergy(1)
         self._food_color = self._primary_food.getColor()
-        self._primary_food = None
+        self.selectFood(None)
 
   def giveFoodToQueen(self):
     """
     Feeds queen if it touches the queen and has food.
     """
     if self._primary_queen is not None:
-      if self.computeDistance(self._primary_queen) <= 40:
+      if self._queen_contact:
         self._primary_queen.increaseEnergy(1)
         self._has_food = False
-        self._primary_food = None
+        self.selectFood(None)
 
   def behave(self, entity_lists: "EntityListContainer", width: int, height: int):
     """
     Contains all methods required for the behavior of the simple workers. Called every frame.
+    The contacts with food and the queen are detected by the scene at the beginning of the
+    frame, so they are handled before the movement of this frame.
     :param entity_lists: The container of all entity lists which is managed by the Scene.
     :param width: The width of the scene screen.
     :param height: The height of the scene screen.
     """
-    if not self.queenAlive(entity_lists.queen_list):
-      self._primary_queen = None
+    if self._primary_queen is not None:
+      if self._has_food:
+        self.giveFoodToQueen()
+      else:
+        self.takeFood()
+
+      if self._has_food:
+        self.giveFoodToQueen()
+      else:
+        self.takeFood()
 
     if self._primary_queen is not None and self._primary_queen._energy <= self._primary_queen._max_energy:
-      if not self.foodAlive(entity_lists.food_list):
+      # Workers without a target search for food only in their slice of the food search period.
+      if self._primary_food is None and \
+          entity_lists.update_scheduler.isDue(UpdateScheduler.FOOD_SEARCH, self):
         self.findFood(entity_lists.food_list)
 
       if self._has_food:
-        if self.queenAlive(entity_lists.queen_list):
-          self.moveToQueen()
-        else:
-          self.moveRandomly()
+        self.moveToQueen()
       else:
-        if self.foodAlive(entity_lists.food_list):
+        if self._primary_food is not None:
           self.moveToFood()
         else:
           self.moveRandomly()
@@ -98,17 +123,6 @@ class SimpleWorker(WorkerBase):
 
     self.performMovement(entity_lists, width, height, 5)
 
-    if self._primary_queen is not None:
-      if self._has_food:
-        self.giveFoodToQueen()
-      else:
-        self.takeFood()
-
-      if self._has_food:
-        self.giveFoodToQueen()
-      else:
-        self.takeFood()
-
     self.reduceEnergy(self._energy_reduction_rate)
     
     return self.checkAlive()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+#
+# A coarse grid of buckets for fast area lookups. Every item is inserted
+# into all cells its rectangle overlaps, so a lookup only visits the cells
+# of the searched area instead of all items. Used by the contact detection
+# and by the scene to cull entities outside the viewport.
+#
+#############################################################################
+
+import typing
+
+
+class SpatialHash:
+  def __init__(self, cell_size: float):
+    """
+    Constructor. Sets up an empty grid.
+    :param cell_size: The edge length of a grid cell.
+    """
+    self._cell_size = cell_size
+    self._cells = {}
+
+  def clear(self):
+    """
+    Removes all items.
+    """
+    self._cells.clear()
+
+  def insert(self, item: typing.Any, left: float, top: float, right: float, bottom: float):
+    """
+    Inserts an item into all cells overlapping a rectangle, including its borders.
+    :param item: The item to insert.
+    :param left: The left border of the rectangle.
+    :param top: The top border of the rectangle.
+    :param right: The right border of the rectangle.
+    :param bottom: The bottom border of the rectangle.
+    """
+    cell_size = self._cell_size
+    cells = self._cells
+    min_y = int(top // cell_size)
+    max_y = int(bottom // cell_size)
+    for cell_x in range(int(left // cell_size), int(right // cell_size) + 1):
+      for cell_y in range(min_y, max_y + 1):
+        bucket = cells.get((cell_x, cell_y))
+        if bucket is None:
+          cells[(cell_x, cell_y)] = [item]
+        else:
+          bucket.append(item)
+
+  def getCells(self) -> dict:
+    """
+    Returns the buckets of all non empty cells, keyed by the cell as (x, y). Position (x, y) lies
+    in the cell (int(x // cell_size), int(y // cell_size)). Meant for hot loops doing many lookups.
+    """
+    return self._cells
+
+  def getCellSize(self) -> float:
+    """
+    Returns the edge length of a grid cell.
+    """
+    return self._cell_size
+
+  def query(self, left: float, top: float, right: float, bottom: float) -> list[typing.Any]:
+    """
+    Returns all items inserted into the cells overlapping a rectangle. The items are not tested
+    against the rectangle itself.
+    :param left: The left border of the rectangle.
+    :param top: The top border of the rectangle.
+    :param right: The right border of the rectangle.
+    :param bottom: The bottom border of the rectangle.
+    :return: The items without duplicates.
+    """
+    cell_size = self._cell_size
+    cells = self._cells
+    min_x = int(left // cell_size)
+    max_x = int(right // cell_size)
+    min_y = int(top // cell_size)
+    max_y = int(bottom // cell_size)
+    if (max_x - min_x + 1) * (max_y - min_y + 1) > len(cells):
+      # The area covers more cells than there are buckets, so only the buckets are visited.
+      buckets = [bucket for (cell_x, cell_y), bucket in cells.items()
+                 if min_x <= cell_x <= max_x and min_y <= cell_y <= max_y]
+    else:
+      buckets = [cells[(cell_x, cell_y)] for cell_x in range(min_x, max_x + 1) for cell_y in range(min_y, max_y + 1)
+                 if (cell_x, cell_y) in cells]
+    if len(buckets) == 1:
+      return list(buckets[0])
+    return list(dict.fromkeys(item for bucket in buckets for item in bucket))
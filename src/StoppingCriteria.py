@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+#
+# Decides when a headless run is already settled and can be stopped early.
+# Every few ticks the colonies are checked for extinction, for a single
+# dominating colony and for a steady state, where the colony sizes barely
+# change over a rolling window of samples.
+#
+#############################################################################
+
+import collections
+import statistics
+import typing
+
+
+class StoppingCriteria:
+  EXTINCTION = "extinction"
+  DOMINANCE = "dominance"
+  STEADY_STATE = "steady_state"
+  TICK_LIMIT = "tick_limit"
+
+  def __init__(self, check_interval: int = 100, stop_on_extinction: bool = True, dominance_share: float = None,
+               steady_state_window: int = 0, steady_state_variance: float = 1.0):
+    """
+    Constructor. Every criterion can be disabled on its own.
+    :param check_interval: The number of ticks between two checks.
+    :param stop_on_extinction: If True, stops as soon as all colonies are extinct. A colony is extinct
+                               if its queen is dead, or if it has no workers left and its queen is
+                               unable to spawn new ones.
+    :param dominance_share: If set, stops as soon as one colony owns at least this share (0 - 1) of
+                            all workers. Only checked if more than one colony has been seen.
+    :param steady_state_window: The number of checks in the rolling window of colony sizes. If 0,
+                                the steady state is not checked.
+    :param steady_state_variance: Stops if the variance of the worker number of every living colony
+                                  within the window is below this threshold.
+    """
+    self._check_interval = max(1, check_interval)
+    self._stop_on_extinction = stop_on_extinction
+    self._dominance_share = dominance_share
+    self._steady_state_window = steady_state_window
+    self._steady_state_variance = steady_state_variance
+    self._seen_colonies = set()
+    self._worker_num_history = {}
+
+  def reset(self):
+    """
+    Forgets all colonies and samples, so the criteria can be used for another run.
+    """
+    self._seen_colonies.clear()
+    self._worker_num_history.clear()
+
+  def getCheckInterval(self) -> int:
+    """
+    Returns the number of ticks between two checks.
+    """
+    return self._check_interval
+
+  def evaluate(self, tick: int, queen_list: list["Queen"]) -> str:
+    """
+    Checks all enabled criteria if a check is due at this tick.
+    :param tick: The number of ticks simulated so far.
+    :param queen_list: The list of all living queens.
+    :return: The reason to stop, or None if the run should continue.
+    """
+    if tick % self._check_interval != 0:
+      return None
+
+    worker_nums = {}
+    for queen in queen_list:
+      colony_id = queen.getColonyId()
+      worker_nums[colony_id] = worker_nums.get(colony_id, 0) + queen.getWorkerNum()
+      self._seen_colonies.add(colony_id)
+
+    if self._stop_on_extinction and self._isExtinct(queen_list):
+      return StoppingCriteria.EXTINCTION
+
+    if self._dominance_share is not None and len(self._seen_colonies) > 1:
+      total_worker_num = sum(worker_nums.values())
+      if total_worker_num > 0 and max(worker_nums.values()) >= self._dominance_share * total_worker_num:
+        return StoppingCriteria.DOMINANCE
+
+    if self._steady_state_window > 1:
+      for colony_id in list(self._worker_num_history):
+        if colony_id not in worker_nums:
+          del self._worker_num_history[colony_id]
+      for colony_id, worker_num in worker_nums.items():
+        history = self._worker_num_history.setdefault(colony_id,
+                                                      collections.deque(maxlen = self._steady_state_window))
+        history.append(worker_num)
+      if self._worker_num_history and self._isSteady():
+        return StoppingCriteria.STEADY_STATE
+
+    return None
+
+  def _isExtinct(self, queen_list: list["Queen"]) -> bool:
+    """
+    Checks if no colony is able to survive anymore.
+    :param queen_list: The list of all living queens.
+    :return: True if all colonies are extinct.
+    """
+    for queen in queen_list:
+      if queen.getWorkerNum() > 0 or queen.getEnergy() > queen._birth_worker_threshold:
+        return False
+    return True
+
+  def _isSteady(self) -> bool:
+    """
+    Checks if the worker numbers of all living colonies barely changed within the window.
+    :return: True if all windows are full and their variances are below the threshold.
+    """
+    for history in self._worker_num_history.values():
+      if len(history) < self._steady_state_window:
+        return False
+      if statistics.pvariance(history) >= self._steady_state_variance:
+        return False
+    return True
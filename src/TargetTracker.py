@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+#
+# Keeps the targets of the workers up to date by listening to the entity
+# lifecycle events of the scene. Workers whose food died are retargeted
+# right away, or in their slice of the food search if it is spread over
+# several ticks. Workers of a dead queen lose their queen, and spawned or
+# dragged food attracts the workers it is now closest to. Obstacle changes
+# reset the obstacle cells of the distance fields.
+#
+#############################################################################
+
+import typing
+from .EventBus import EventBus
+from .Food import Food
+from .Queen import Queen
+from .Obstacle import Obstacle
+from .UpdateScheduler import UpdateScheduler
+
+
+class TargetTracker:
+  def __init__(self, entity_lists: "EntityListContainer"):
+    """
+    Constructor. Subscribes to the event bus of the entity lists.
+    :param entity_lists: The container of all entity lists which is managed by the Scene.
+    """
+    self._entity_lists = entity_lists
+    entity_lists.event_bus.subscribe(EventBus.SPAWN, self.onSpawn)
+    entity_lists.event_bus.subscribe(EventBus.DEATH, self.onDeath)
+    entity_lists.event_bus.subscribe(EventBus.DRAG, self.onDrag)
+
+  def onSpawn(self, entity: "Entity"):
+    """
+    Retargets the workers to a new food source if it is closer than their current one.
+    :param entity: The spawned entity.
+    """
+    if type(entity) is Food:
+      self._retargetToCloserFood(entity)
+    elif type(entity) is Obstacle:
+      self._invalidateObstacles()
+
+  def onDeath(self, entity: "Entity"):
+    """
+    Retargets the workers of a dead food source and releases the workers of a dead queen.
+    If the food search is spread over several ticks, the workers of a dead food source only
+    lose their target and search in their own slice, so they do not all search at once.
+    :param entity: The dead entity, already removed from all entity lists.
+    """
+    if type(entity) is Food:
+      food_list = self._entity_lists.food_list
+      search_now = self._entity_lists.update_scheduler.getPeriod(UpdateScheduler.FOOD_SEARCH) == 1
+      for worker in list(entity._targeting_workers):
+        if search_now:
+          worker.findFood(food_list)
+        else:
+          worker.selectFood(None)
+    elif type(entity) is Queen:
+      for worker in entity.getWorkerList():
+        worker._primary_queen = None
+    elif type(entity) is Obstacle:
+      self._invalidateObstacles()
+
+  def onDrag(self, entity: "Entity"):
+    """
+    Handles a dragged food source like a newly spawned one and updates the distance fields
+    if an obstacle was moved.
+    :param entity: The dragged entity at its new position.
+    """
+    if type(entity) is Food:
+      self._retargetToCloserFood(entity)
+    elif type(entity) is Obstacle:
+      self._invalidateObstacles()
+
+  def _retargetToCloserFood(self, food: "Food"):
+    """
+    Switches every worker with a target to the given food if it is closer than the current target.
+    :param food: The food source which appeared at a new position.
+    """
+    food_x = food._x
+    food_y = food._y
+    for worker in self._entity_lists.worker_list:
+      target = worker._primary_food
+      if target is None or target is food:
+        continue
+      x = worker._x
+      y = worker._y
+      if (food_x - x) ** 2 + (food_y - y) ** 2 < (target._x - x) ** 2 + (target._y - y) ** 2:
+        worker.selectFood(food)
+
+  def _invalidateObstacles(self):
+    """
+    Lets the distance fields of all colonies recompute their blocked cells.
+    """
+    for queen in self._entity_lists.queen_list:
+      if queen._distance_field is not None:
+        queen._distance_field.invalidateObstacles()
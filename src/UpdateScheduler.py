@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+# Spreads work which does not need to run every tick evenly over the ticks.
+# Every subsystem registers a task with an update period and a cost. Tasks
+# of single subsystems are placed at the tick offset with the lowest load,
+# so expensive ones do not fall onto the same tick. Tasks run per entity are
+# sliced round-robin: every entity gets an update slot when it first asks
+# the scheduler and only the entities whose slot is due do the work, e.g. a
+# quarter of the workers per tick with a period of 4. Slots are handed out
+# in the order the entities behave, so they are the same in replays.
+#
+#############################################################################
+
+import typing
+
+
+class UpdateScheduler:
+  QUEEN_REDIRECT = "queen_redirect"
+  FOOD_SEARCH = "food_search"
+  FOOD_SPAWN = "food_spawn"
+  DEFAULT_PERIODS = {QUEEN_REDIRECT: 4, FOOD_SEARCH: 4, FOOD_SPAWN: 4}
+
+  def __init__(self, horizon: int = 240):
+    """
+    Constructor. Starts without tasks, so every task is due at every tick until it is registered.
+    :param horizon: The number of ticks the loads are balanced over. Should be a multiple of all periods.
+    """
+    self._horizon = horizon
+    self._tick = 0
+    self._next_slot = 0
+    self._tasks = {}
+    self._tick_costs = [0.0] * horizon
+
+  def register(self, name: str, period: int, cost: float = 1.0, sliced: bool = False):
+    """
+    Registers a task or changes the period of a registered one.
+    :param name: The name of the task.
+    :param period: The number of ticks between two runs of the task.
+    :param cost: The estimated cost of a full run of the task, in any unit shared by all tasks.
+    :param sliced: True if the task runs per entity and is split over all ticks of the period.
+    """
+    self.unregister(name)
+    period = max(1, int(period))
+    if sliced:
+      offset = 0
+      costs = [cost / period] * self._horizon
+    else:
+      # A period beyond the horizon only runs once within it, so its offsets past the horizon are never balanced.
+      offset = min(range(min(period, self._horizon)), key = lambda offset: max(self._tick_costs[offset::period]))
+      costs = [cost if tick % period == offset else 0.0 for tick in range(self._horizon)]
+    self._tasks[name] = (period, offset, costs)
+    self._tick_costs = [total + task_cost for total, task_cost in zip(self._tick_costs, costs)]
+
+  def registerSimulationTasks(self, update_periods: dict = None):
+    """
+    Registers the tasks of the simulation rules, shared by the Scene and the Ensemble.
+    :param update_periods: The periods of the scene config by task name. Missing tasks use DEFAULT_PERIODS.
+    """
+    periods = dict(UpdateScheduler.DEFAULT_PERIODS, **(update_periods or {}))
+    self.register(UpdateScheduler.QUEEN_REDIRECT, periods[UpdateScheduler.QUEEN_REDIRECT], 1, sliced = True)
+    self.register(UpdateScheduler.FOOD_SEARCH, periods[UpdateScheduler.FOOD_SEARCH], 10, sliced = True)
+    self.register(UpdateScheduler.FOOD_SPAWN, periods[UpdateScheduler.FOOD_SPAWN], 1)
+
+  def unregister(self, name: str):
+    """
+    Removes a task, so it is due at every tick again.
+    :param name: The name of the task.
+    """
+    task = self._tasks.pop(name, None)
+    if task is not None:
+      self._tick_costs = [total - task_cost for total, task_cost in zip(self._tick_costs, task[2])]
+
+  def getPeriod(self, name: str) -> int:
+    """
+    Returns the period of a task. Unregistered tasks have a period of 1.
+    """
+    task = self._tasks.get(name)
+    return task[0] if task is not None else 1
+
+  def getScaledChance(self, name: str, chance: float) -> float:
+    """
+    Scales the chance of a random event tried at every tick to a single try per period of a task.
+    :param name: The name of the task trying the event.
+    :param chance: The chance of the event per tick.
+    :return: The chance that the event happens at least once within a period, which never exceeds 1.
+    """
+    return 1 - (1 - chance) ** self.getPeriod(name)
+
+  def isDue(self, name: str, entity: "Entity" = None) -> bool:
+    """
+    Checks if a task has to run at the current tick.
+    :param name: The name of the task.
+    :param entity: The entity asking for its slice of a sliced task. If None, the task is
+                   checked as a whole.
+    :return: True if the task or the slice of the entity is due.
+    """
+    slot = 0
+    if entity is not None:
+      slot = entity._update_slot
+      if slot is None:
+        slot = entity._update_slot = self._next_slot
+        self._next_slot += 1
+    return self.isSlotDue(name, slot)
+
+  def isSlotDue(self, name: str, slot: "int | np.ndarray") -> "bool | np.ndarray":
+    """
+    Checks if an update slot of a task has to run at the current tick. Works elementwise on
+    numpy arrays of slots, e.g. for the vectorized Ensemble.
+    :param name: The name of the task.
+    :param slot: The update slot or an array of update slots.
+    :return: True for every due slot.
+    """
+    period, offset, _ = self._tasks.get(name, (1, 0, None))
+    return (self._tick + slot - offset) % period == 0
+
+  def getTickCosts(self) -> list[float]:
+    """
+    Returns the estimated cost of all registered tasks for every tick of the horizon.
+    """
+    return list(self._tick_costs)
+
+  def advance(self):
+    """
+    Moves on to the next tick.
+    """
+    self._tick += 1
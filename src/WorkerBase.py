@@ -10,8 +10,12 @@ import random
 import typing
 from .Entity import Entity
 from .Food import Food
+from .EventBus import EventBus
 
 class WorkerBase(Entity):
+  __slots__ = ("_energy_reduction_rate", "_primary_queen", "_primary_food", "_lifetime", "_has_food",
+               "_food_color", "_food_contacts", "_queen_contact")
+
   def __init__(self, x: int, y: int, energy: float):
     """
     Constructor. Setup a default worker.
@@ -28,6 +32,30 @@ class WorkerBase(Entity):
     self._lifetime = 0
     self._has_food = False
     self._food_color = None
+    self._food_contacts = []
+    self._queen_contact = False
+
+  def respawn(self, x: int, y: int, energy: float):
+    """
+    Resets a dead worker, so it can be reused for a new birth. Equivalent to a fresh
+    construction, but keeps the allocated containers of the worker.
+    :param x: The x position of the worker.
+    :param y: The y position of the worker.
+    :param energy: The starting energy of the worker.
+    """
+    self._x = x
+    self._y = y
+    self._dir_x = 0
+    self._dir_y = 0
+    self._energy = energy
+    self._primary_queen = None
+    self._primary_food = None
+    self._color = (100, 100, 100)
+    self._lifetime = 0
+    self._has_food = False
+    self._food_color = None
+    self._food_contacts.clear()
+    self._queen_contact = False
 
   def queenAlive(self, queen_list: list["Queen"]):
     """
@@ -53,22 +81,38 @@ class WorkerBase(Entity):
 
   def selectFood(self, food: "Food"):
     """
-    Assigns a new primary food for the worker.
+    Assigns a new primary food for the worker and registers the worker at the food, so
+    it can be retargeted once the food dies.
     """
+    if self._primary_food is food:
+      return
+    if self._primary_food is not None:
+      self._primary_food._targeting_workers.pop(self, None)
     self._primary_food = food
+    if food is not None:
+      food._targeting_workers[self] = None
 
   def selectQueen(self, queen: "Queen"):
     """
-    Assigns a new primary queen for the worker.
+    Assigns a new primary queen for the worker and moves it into her worker list.
     """
-    if self._primary_queen:
+    if self._primary_queen is queen:
+      return
+    if self._primary_queen is not None:
       self._primary_queen.removeWorker(self)
     self._primary_queen = queen
-    if not self in self._primary_queen.getWorkerList():
-      self._primary_queen.addWorker(self)
     if self._primary_queen is not None:
+      self._primary_queen.addWorker(self)
       self._color = self._primary_queen.getColor()
 
+  def assignQueen(self, queen: "Queen"):
+    """
+    Assigns the primary queen of a newborn worker. Does not touch the worker list of the
+    queen, since the queen registers her newborn workers herself.
+    """
+    self._primary_queen = queen
+    self._color = queen.getColor()
+
   def findFood(self, food_list: list["Food"]):
     """
     Finds the closest food and assigns it as the primary food.
@@ -104,6 +148,13 @@ class WorkerBase(Entity):
 
     return closest_entity
 
+  def getRenderRect(self) -> "tuple[int, int, int, int]":
+    """
+    Returns the world area covered by the worker and the food it holds.
+    :return: The rectangle as (left, top, width, height).
+    """
+    return int(self._x) - 6, int(self._y) - 6, 13, 15
+
   def kill(self, entity_lists: "EntityListContainer"):
     """
     Kills the worker and removes it from all lists.
@@ -113,3 +164,6 @@ class WorkerBase(Entity):
     entity_lists.worker_list.remove(self)
     if self._primary_queen is not None:
       self._primary_queen.removeWorker(self)
+    self.selectFood(None)
+    entity_lists.event_bus.emit(EventBus.DEATH, self)
+    entity_lists.worker_pool.release(self)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+#
+# A pool of dead workers, kept separately for each worker behavior. Queens
+# reuse the pooled workers when spawning instead of allocating new ones,
+# which absorbs the constant birth and death churn of running colonies.
+#
+#############################################################################
+
+import typing
+
+
+class WorkerPool:
+  def __init__(self, max_size_per_behavior: int = 10000):
+    """
+    Constructor. Sets up empty pools.
+    :param max_size_per_behavior: The maximum number of dead workers kept for each behavior.
+    """
+    self._max_size_per_behavior = max_size_per_behavior
+    self._pools = {}
+
+  def release(self, worker: "WorkerBase"):
+    """
+    Stores a dead worker for later reuse.
+    :param worker: The worker which has been removed from the scene.
+    """
+    pool = self._pools.setdefault(type(worker), [])
+    if len(pool) < self._max_size_per_behavior:
+      pool.append(worker)
+
+  def acquire(self, worker_class: type, *args) -> "WorkerBase":
+    """
+    Returns a worker of the given class. A pooled worker is respawned with the given
+    arguments if available. Otherwise a new worker is created.
+    :param worker_class: The class of the requested worker.
+    :param args: The constructor arguments of the worker class.
+    :return: The ready to use worker.
+    """
+    pool = self._pools.get(worker_class)
+    if pool:
+      worker = pool.pop()
+      worker.respawn(*args)
+      return worker
+    return worker_class(*args)
+
+  def getPooledNum(self) -> int:
+    """
+    Returns the total number of dead workers currently waiting for reuse.
+    """
+    return sum(len(pool) for pool in self._pools.values())
+
+  def clear(self):
+    """
+    Drops all pooled workers.
+    """
+    self._pools.clear()
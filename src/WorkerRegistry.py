@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+#
+# The registry of all worker behaviors. Every behavior registers its worker
+# class, the schema of its worker_type config keys, the config keys passed
+# to the worker constructor and what the colony has to provide for it. The
+# config validation, the scene and the queens only ask the registry, so a
+# new behavior only has to register itself to be usable in the queen
+# configs.
+#
+#############################################################################
+
+import typing
+from .WorkerSpawnSpec import WorkerSpawnSpec
+from .SimpleWorker import SimpleWorker
+from .AdvancedWorker import AdvancedWorker
+from .FieldWorker import FieldWorker
+
+
+class WorkerRegistry:
+  _behaviors = {}
+
+  @staticmethod
+  def register(behavior: str, worker_class: type, schema: dict = None, extra_arg_keys: tuple = (),
+               uses_adjacent_workers: bool = False, uses_distance_field: bool = False,
+               factory: typing.Callable = None, reload: typing.Callable = None, supports_ensemble: bool = False):
+    """
+    Registers a worker behavior under the name used in the behavior field of the worker_type config.
+    :param behavior: The name of the behavior.
+    :param worker_class: The class of the workers. Its constructor takes x, y, energy, speed and
+                         the extra arguments.
+    :param schema: The behavior specific config keys. Maps every key to a dictionary with the
+                   optional rules "required" (bool), "min" (number) and "choices" (tuple).
+    :param extra_arg_keys: The config keys passed to the worker constructor after the speed.
+    :param uses_adjacent_workers: True if the workers need their adjacent workers every tick.
+    :param uses_distance_field: True if the workers share the distance field of their colony.
+    :param factory: An optional batch factory. See WorkerSpawnSpec. If None, the workers are created
+                    one by one, which is what all built-in behaviors do.
+    :param reload: An optional function (worker, *extra_args) applying the extra arguments of a changed
+                   config to a living worker.
+    :param supports_ensemble: True if the vectorized Ensemble implements the behavior.
+    """
+    WorkerRegistry._behaviors[behavior] = {
+      "worker_class": worker_class,
+      "schema": schema or {},
+      "extra_arg_keys": extra_arg_keys,
+      "uses_adjacent_workers": uses_adjacent_workers,
+      "uses_distance_field": uses_distance_field,
+      "factory": factory,
+      "reload": reload,
+      "supports_ensemble": supports_ensemble
+    }
+
+  @staticmethod
+  def isRegistered(behavior: str) -> bool:
+    """
+    Returns True if a behavior with this name is registered.
+    """
+    return behavior in WorkerRegistry._behaviors
+
+  @staticmethod
+  def getBehaviorNames() -> list[str]:
+    """
+    Returns the names of all registered behaviors in the order they were registered.
+    """
+    return list(WorkerRegistry._behaviors)
+
+  @staticmethod
+  def getSchema(behavior: str) -> dict:
+    """
+    Returns the schema of the behavior specific config keys of a registered behavior.
+    """
+    return WorkerRegistry._behaviors[behavior]["schema"]
+
+  @staticmethod
+  def supportsEnsemble(behavior: str) -> bool:
+    """
+    Returns True if a registered behavior can be simulated by the vectorized Ensemble.
+    """
+    registration = WorkerRegistry._behaviors.get(behavior)
+    return registration is not None and registration["supports_ensemble"]
+
+  @staticmethod
+  def compile(worker_description: dict) -> "WorkerSpawnSpec":
+    """
+    Compiles a validated worker_type config into a spawn spec.
+    :param worker_description: The worker_type config.
+    :return: The spawn spec of the config.
+    """
+    behavior = worker_description["behavior"]
+    registration = WorkerRegistry._behaviors[behavior]
+    return WorkerSpawnSpec(behavior, registration["worker_class"], worker_description,
+                           tuple(worker_description[key] for key in registration["extra_arg_keys"]),
+                           registration["uses_adjacent_workers"], registration["uses_distance_field"],
+                           registration["factory"], registration["reload"])
+
+
+WorkerRegistry.register("SimpleWorker", SimpleWorker, supports_ensemble = True)
+WorkerRegistry.register("AdvancedWorker", AdvancedWorker,
+                        schema = {"shouting_radius": {"required": True, "min": 0},
+                                  "neighbor_skin": {"min": 0},
+                                  "max_listeners": {"min": 0},
+                                  "listener_selection": {"choices": ("nearest", "random")}},
+                        extra_arg_keys = ("shouting_radius",),
+                        uses_adjacent_workers = True,
+                        reload = AdvancedWorker.reloadConfig)
+WorkerRegistry.register("FieldWorker", FieldWorker,
+                        schema = {"field_cell_size": {"min": 1},
+                                  "field_relax_passes": {"min": 0}},
+                        uses_distance_field = True)
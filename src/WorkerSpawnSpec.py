@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+#
+# The compiled form of a worker_type config. Queens compile their worker
+# description once with the WorkerRegistry instead of reading the config
+# dictionary and comparing behavior names for every spawned worker.
+#
+#############################################################################
+
+import typing
+
+
+class WorkerSpawnSpec:
+  __slots__ = ("behavior", "worker_class", "min_energy", "max_energy", "min_speed", "max_speed", "extra_args",
+               "uses_adjacent_workers", "uses_distance_field", "reload", "_factory")
+
+  def __init__(self, behavior: str, worker_class: type, worker_description: dict, extra_args: tuple,
+               uses_adjacent_workers: bool, uses_distance_field: bool, factory: typing.Callable = None,
+               reload: typing.Callable = None):
+    """
+    Constructor. Precomputes the sampling ranges of the worker attributes.
+    :param behavior: The name of the worker behavior.
+    :param worker_class: The class of the workers.
+    :param worker_description: The validated worker_type config.
+    :param extra_args: The constructor arguments following x, y, energy and speed.
+    :param uses_adjacent_workers: True if the workers need their adjacent workers every tick.
+    :param uses_distance_field: True if the workers share the distance field of their colony.
+    :param factory: A function (spec, xs, ys, energies, speeds, worker_pool) returning the new
+                    workers. If None, the workers are created one by one from worker_class.
+    :param reload: A function (worker, *extra_args) applying the extra arguments to a living worker or None.
+    """
+    self.behavior = behavior
+    self.worker_class = worker_class
+    self.min_energy = int(worker_description["mean_energy"] - max(worker_description["energy_range"], 1))
+    self.max_energy = int(worker_description["mean_energy"] + worker_description["energy_range"])
+    self.min_speed = int(worker_description["mean_speed"] - max(worker_description["speed_range"], 1))
+    self.max_speed = int(worker_description["mean_speed"] + worker_description["speed_range"])
+    self.extra_args = extra_args
+    self.uses_adjacent_workers = uses_adjacent_workers
+    self.uses_distance_field = uses_distance_field
+    self.reload = reload
+    self._factory = factory
+
+  def createWorkers(self, xs: list[int], ys: list[int], energies: list[int], speeds: list[int],
+                    worker_pool: "WorkerPool" = None) -> list["WorkerBase"]:
+    """
+    Creates a batch of workers from sampled attributes.
+    :param xs: The x positions of the workers.
+    :param ys: The y positions of the workers.
+    :param energies: The starting energies of the workers.
+    :param speeds: The speeds of the workers.
+    :param worker_pool: The pool of dead workers to reuse. If None, all workers are newly created.
+    :return: The new workers, not yet assigned to a queen.
+    """
+    if self._factory is not None:
+      return self._factory(self, xs, ys, energies, speeds, worker_pool)
+
+    worker_class = self.worker_class
+    extra_args = self.extra_args
+    if worker_pool is None:
+      return [worker_class(x, y, energy, speed, *extra_args) for x, y, energy, speed in zip(xs, ys, energies, speeds)]
+    acquire = worker_pool.acquire
+    return [acquire(worker_class, x, y, energy, speed, *extra_args) for x, y, energy, speed in zip(xs, ys, energies, speeds)]
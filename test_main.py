@@ -1,10 +1,39 @@
 from main import *
 import time
+import random
 import threading
 import copy
+import json
+import os
+import math
+import statistics
+import socket
+import pytest
+import pygame
+import numpy as np
 from src.TestUtils import *
 from src.AdvancedWorker import AdvancedWorker
+from src.Queen import Queen
+from src.Food import Food
+from src.Obstacle import Obstacle
+from src.SimpleWorker import SimpleWorker
+from src.EntityListContainer import EntityListContainer
+from src.ContactDetector import ContactDetector
+from src.NeighborSearchPhase import NeighborSearchPhase
 from src.ConfigManager import ConfigManager
+from src.ConfigWatcher import ConfigWatcher
+from src.Ensemble import Ensemble
+from src.StoppingCriteria import StoppingCriteria
+from src.FieldWorker import FieldWorker
+from src.DistanceField import DistanceField
+from src.EventBus import EventBus
+from src.SamplingProfiler import SamplingProfiler
+from src.PerformanceHud import PerformanceHud
+from src.SessionLog import SessionLog
+from src.WorkerRegistry import WorkerRegistry
+from src.Camera import Camera
+from src.MultiResolutionSeries import MultiResolutionSeries
+from src.UpdateScheduler import UpdateScheduler
 
 
 def test_scene_starting_configuration():
@@ -217,4 +246,940 @@ def test_queens_config_validation():
 
   # Test faulty array in config
   queens_config_faulty_array = load_dummy_queen_config_invalid_array_field()
-  assert config_manager.validateQueensList(queens_config_faulty_array) == False
\ No newline at end of file
+  assert config_manager.validateQueensList(queens_config_faulty_array) == False
+
+def test_config_hot_reload(tmp_path):
+  print("\n[TEST CONFIG] Checking in place application of changed config files.")
+  scene_config_path = str(tmp_path / "scene_config.json")
+  queens_config_path = str(tmp_path / "queen_config.json")
+  scene_config = load_dummy_scene_config()
+  queens_config = load_dummy_queen_config()
+  with open(scene_config_path, "w") as file:
+    json.dump(scene_config, file)
+  with open(queens_config_path, "w") as file:
+    json.dump({"queens": queens_config}, file)
+
+  scene = Scene(scene_config, False)
+  scene.spawnQueen(100, 250, queens_config[0])
+  scene.enableConfigHotReload(ConfigWatcher(scene_config_path, queens_config_path))
+  queen = scene.getEntityLists().queen_list[0]
+
+  # Unchanged files are not applied
+  scene.reloadChangedConfigs()
+  assert queen._speed == 3
+
+  scene_config["min_food_available"] = 3
+  scene_config["food_type_ratio"] = [1.0]
+  queens_config[0]["speed"] = 7
+  queens_config[0]["worker_type"]["mean_speed"] = 9
+  with open(scene_config_path, "w") as file:
+    json.dump(scene_config, file)
+  with open(queens_config_path, "w") as file:
+    json.dump({"queens": queens_config}, file)
+  os.utime(scene_config_path, ns = (0, 10 ** 9))
+  os.utime(queens_config_path, ns = (0, 10 ** 9))
+  scene.reloadChangedConfigs()
+
+  assert scene._min_food == 3
+  assert scene._discrete_food_type_ratio == [100.0]
+  assert queen._speed == 7
+  assert queen._worker_description["mean_speed"] == 9
+  assert scene.getEntityNumbers()[1] == 50
+
+  # Invalid changes are ignored
+  queens_config[0]["speed"] = "invalid_value"
+  with open(queens_config_path, "w") as file:
+    json.dump({"queens": queens_config}, file)
+  os.utime(queens_config_path, ns = (0, 2 * 10 ** 9))
+  scene.reloadChangedConfigs()
+  assert queen._speed == 7
+
+def test_cached_neighbor_lists():
+  print("\n[TEST WORKER] Checking that cached neighbor lists match a full neighbor search.")
+  queen_config = copy.deepcopy(load_dummy_queen_config()[0])
+  queen_config["worker_type"]["behavior"] = "AdvancedWorker"
+  queen_config["worker_type"]["shouting_radius"] = 50
+  queen_config["worker_type"]["neighbor_skin"] = 40
+  queen = Queen(300, 300, queen_config)
+  queen.spawnWorker(120, [], [], 600, 600, 0, 200)
+
+  def getAdjacentSets():
+    worker_list = queen.getWorkerList()
+    adjacent_sets = {worker: set() for worker in worker_list}
+    for receiver, sender in zip(*queen._neighbor_cache.findLinks(worker_list)):
+      adjacent_sets[worker_list[receiver]].add(worker_list[sender])
+    return adjacent_sets
+
+  def getExpectedSets():
+    expected = {worker: set() for worker in queen.getWorkerList()}
+    for worker in queen.getWorkerList():
+      for partner in queen.getWorkerList():
+        if partner is not worker and abs(partner._x - worker._x) <= 50 and abs(partner._y - worker._y) <= 50:
+          expected[worker].add(partner)
+    return expected
+
+  for frame in range(12):
+    if frame == 5:
+      queen.removeWorker(queen.getWorkerList()[0])
+      queen.spawnWorker(3, [], [], 600, 600, 0, 200)
+    assert getAdjacentSets() == getExpectedSets()
+    for worker in queen.getWorkerList():
+      worker.setPosition(worker._x + random.uniform(-8, 8), worker._y + random.uniform(-8, 8))
+
+def test_parallel_neighbor_search():
+  print("\n[TEST WORKER] Checking that the concurrent neighbor search matches the sequential one.")
+  queen_config = copy.deepcopy(load_dummy_queen_config()[0])
+  queen_config["worker_type"]["behavior"] = "AdvancedWorker"
+  queen_config["worker_type"]["shouting_radius"] = 50
+  queens = [Queen(300, 300, queen_config, colony_id) for colony_id in range(3)]
+  for queen in queens:
+    queen.spawnWorker(100, [], [], 600, 600, 0, 200)
+    for worker in queen.getWorkerList():
+      worker._internal_food_distance = random.randint(0, 500)
+      worker._internal_queen_distance = random.randint(0, 500)
+
+  def getHeardSignals():
+    heard_signals = [(worker._heard_food_distance, worker._heard_food_sender, worker._heard_queen_distance,
+                      worker._heard_queen_sender) for queen in queens for worker in queen.getWorkerList()]
+    for queen in queens:
+      for worker in queen.getWorkerList():
+        worker.clearHeardSignals()
+    return heard_signals
+
+  for queen in queens:
+    queen.computeAdjacentWorkers()
+  expected = getHeardSignals()
+  assert any(food_sender is not None for _, food_sender, _, _ in expected)
+
+  phase = NeighborSearchPhase(max_threads = 3)
+  phase.computeAdjacentWorkers(queens)
+  phase.shutdown()
+  assert getHeardSignals() == expected
+
+def test_listener_cap():
+  print("\n[TEST WORKER] Checking that the listener cap keeps the nearest workers in range.")
+  config_manager = ConfigManager()
+  queen_config = copy.deepcopy(load_dummy_queen_config())
+  worker_type = queen_config[0]["worker_type"]
+  worker_type["behavior"] = "AdvancedWorker"
+  worker_type["shouting_radius"] = 60
+  worker_type["max_listeners"] = 4
+  assert config_manager.validateQueensList(queen_config)
+  worker_type["listener_selection"] = "loudest"
+  assert not config_manager.validateQueensList(queen_config)
+  worker_type["listener_selection"] = "nearest"
+
+  queen = Queen(300, 300, queen_config[0], 0)
+  queen.spawnWorker(80, [], [], 600, 600, 0, 200)
+  def getListenedWorkers():
+    worker_list = queen.getWorkerList()
+    listened_workers = {worker: [] for worker in worker_list}
+    for receiver, sender in zip(*queen._neighbor_cache.findLinks(worker_list)):
+      listened_workers[worker_list[receiver]].append(worker_list[sender])
+    return listened_workers
+  def getWorkersInRange(worker):
+    in_range = [partner for partner in queen.getWorkerList()
+                if partner is not worker and abs(partner._x - worker._x) <= 60 and abs(partner._y - worker._y) <= 60]
+    in_range.sort(key = lambda partner: (partner._x - worker._x) ** 2 + (partner._y - worker._y) ** 2)
+    return in_range
+
+  # On a jittered grid no search cell holds more than 4 workers, so the nearest workers are exact
+  for worker_id, worker in enumerate(queen.getWorkerList()):
+    worker.setPosition(200 + 20 * (worker_id % 8) + random.uniform(-5, 5),
+                       200 + 20 * (worker_id // 8) + random.uniform(-5, 5))
+  for worker, listened in getListenedWorkers().items():
+    in_range = getWorkersInRange(worker)
+    assert len(listened) == min(4, len(in_range))
+    assert set(listened) == set(in_range[:len(listened)])
+
+  # In a dense cluster the listened workers are only close, but still in range
+  for worker in queen.getWorkerList():
+    worker.setPosition(random.uniform(250, 350), random.uniform(250, 350))
+  for worker, listened in getListenedWorkers().items():
+    in_range = getWorkersInRange(worker)
+    assert len(listened) == min(4, len(in_range))
+    assert set(listened) <= set(in_range)
+
+  worker_type["listener_selection"] = "random"
+  queen.applyConfig(queen_config[0])
+  assert all(len(listened) <= 4 for listened in getListenedWorkers().values())
+
+  # A fully clustered colony only examines a bounded number of candidates per worker
+  worker_type["listener_selection"] = "nearest"
+  queen.applyConfig(queen_config[0])
+  queen.spawnWorker(920, [], [], 600, 600, 0, 200)
+  for worker in queen.getWorkerList():
+    worker.setPosition(300, 300)
+  listeners, _ = queen._neighbor_cache.findLinks(queen.getWorkerList())
+  assert len(listeners) == 1000 * 4
+  assert queen._neighbor_cache.getCandidateLinkNum() <= 1000 * 5
+
+def test_worker_registry():
+  print("\n[TEST WORKER] Checking the registration of custom worker behaviors.")
+  class LazyWorker(SimpleWorker):
+    __slots__ = ("_laziness",)
+    def __init__(self, x, y, energy, speed, laziness):
+      super().__init__(x, y, energy, speed)
+      self._laziness = laziness
+
+  factory_calls = []
+  def createLazyWorkers(spec, xs, ys, energies, speeds, worker_pool):
+    factory_calls.append(len(xs))
+    return [spec.worker_class(x, y, energy, speed, *spec.extra_args) for x, y, energy, speed in zip(xs, ys, energies, speeds)]
+
+  config_manager = ConfigManager()
+  queen_config = copy.deepcopy(load_dummy_queen_config())
+  queen_config[0]["worker_type"]["behavior"] = "LazyWorker"
+  assert not config_manager.validateQueensList(queen_config)
+
+  def reloadLazyWorker(worker, laziness):
+    worker._laziness = laziness
+
+  WorkerRegistry.register("LazyWorker", LazyWorker, schema = {"laziness": {"required": True, "min": 0, "max": 1}},
+                          extra_arg_keys = ("laziness",), factory = createLazyWorkers, reload = reloadLazyWorker)
+  try:
+    assert not config_manager.validateQueensList(queen_config)
+    queen_config[0]["worker_type"]["laziness"] = 2
+    assert not config_manager.validateQueensList(queen_config)
+    queen_config[0]["worker_type"]["laziness"] = 0.5
+    assert config_manager.validateQueensList(queen_config)
+
+    scene = Scene(load_dummy_scene_config(), False)
+    scene.spawnQueen(100, 100, queen_config[0])
+    queen = scene.getEntityLists().queen_list[0]
+    assert factory_calls == [queen_config[0]["start_worker_number"]]
+    assert all(type(worker) is LazyWorker and worker._laziness == 0.5 for worker in queen.getWorkerList())
+    assert not queen.needsAdjacentWorkers()
+    scene.runHeadless(10)
+
+    queen_config[0]["worker_type"]["laziness"] = 0.8
+    queen.applyConfig(queen_config[0])
+    assert all(worker._laziness == 0.8 for worker in queen.getWorkerList())
+    assert not WorkerRegistry.supportsEnsemble("LazyWorker")
+    with pytest.raises(ValueError):
+      Ensemble(load_dummy_scene_config(), queen_config, 2)
+  finally:
+    WorkerRegistry._behaviors.pop("LazyWorker")
+  assert WorkerRegistry.getBehaviorNames() == ["SimpleWorker", "AdvancedWorker", "FieldWorker"]
+
+def test_field_workers():
+  print("\n[TEST WORKER] Checking the distance field shared by field workers.")
+  config_manager = ConfigManager()
+  queen_config = load_dummy_queen_config()
+  queen_config[0]["worker_type"]["behavior"] = "FieldWorker"
+  queen_config[0]["worker_type"]["field_cell_size"] = 50
+  assert config_manager.validateQueensList(queen_config)
+  queen_config[0]["worker_type"]["field_cell_size"] = 0
+  assert not config_manager.validateQueensList(queen_config)
+  queen_config[0]["worker_type"]["field_cell_size"] = 50
+
+  field = DistanceField(500, 500, 50, 5)
+  field.deposit(DistanceField.FOOD, field.getCell(25, 25), 0)
+  field.update([Obstacle(125, 25, 50)])
+  assert field.getDistance(DistanceField.FOOD, field.getCell(25, 25)) == 0
+  assert field.getDistance(DistanceField.FOOD, field.getCell(25, 75)) == 50
+  assert field.getDistance(DistanceField.FOOD, field.getCell(125, 25)) == math.inf
+  assert field.getDistance(DistanceField.FOOD, field.getCell(225, 25)) == math.inf
+  assert field.getDirection(DistanceField.FOOD, field.getCell(25, 75)) == (0.0, -1.0)
+  assert field.getDirection(DistanceField.QUEEN, field.getCell(25, 75)) is None
+
+  scene = Scene(load_dummy_scene_config(), False)
+  scene.spawnQueen(500, 500, queen_config[0])
+  queen = scene.getEntityLists().queen_list[0]
+  assert all(type(worker) is FieldWorker for worker in queen.getWorkerList())
+  queen.setPosition(500, 500)
+  queen._speed = 0
+  queen.getWorkerList()[0].setPosition(500, 500)
+  scene.runHeadless(3)
+  distance_field = queen.getDistanceField(1900, 1200)
+  assert distance_field.getDistance(DistanceField.QUEEN, distance_field.getCell(500, 500)) < 1000
+
+def test_contact_detection():
+  print("\n[TEST WORKER] Checking the batched contact detection of workers with food and queens.")
+  entity_lists = EntityListContainer()
+  queen = Queen(500, 500, load_dummy_queen_config()[0])
+  food_near = Food(120, 100, 100, 0, 0)
+  food_far = Food(300, 100, 100, 0, 0)
+  worker_food = AdvancedWorker(100, 100, 100, 0, 50)
+  worker_queen = AdvancedWorker(530, 520, 100, 0, 50)
+  worker_none = AdvancedWorker(900, 900, 100, 0, 50)
+  worker_food.selectQueen(queen)
+  worker_queen.selectQueen(queen)
+  entity_lists.queen_list.append(queen)
+  entity_lists.food_list.extend([food_near, food_far])
+  entity_lists.worker_list.extend([worker_food, worker_queen, worker_none])
+
+  ContactDetector(40).computeContacts(entity_lists)
+
+  assert worker_food._food_contacts == [food_near]
+  assert not worker_food._queen_contact
+  assert worker_queen._food_contacts == []
+  assert worker_queen._queen_contact
+  assert worker_none._food_contacts == []
+  assert not worker_none._queen_contact
+
+def test_compact_entities():
+  print("\n[TEST ENTITY] Checking that entities are compact and move without direction vectors.")
+  queen = Queen(100, 100, load_dummy_queen_config()[0])
+  entities = [AdvancedWorker(200, 200, 100, 0, 50), SimpleWorker(200, 200, 100, 5), queen,
+              Food(10, 10, 100, 3, 0), Obstacle(500, 500, 100)]
+  for entity in entities:
+    assert not hasattr(entity, "__dict__")
+
+  worker = entities[1]
+  worker.setDirectionTo(queen)
+  assert abs(worker._dir_x + math.sqrt(0.5)) < 1e-9
+  assert abs(worker._dir_y + math.sqrt(0.5)) < 1e-9
+
+  worker.setPosition(2, 2)
+  worker.performMovement(EntityListContainer(), 1000, 1000, 0)
+  assert worker._x == 0 and worker._y == 0
+  assert worker._dir_x > 0 and worker._dir_y > 0
+
+def test_worker_pooling():
+  print("\n[TEST WORKER] Checking the reuse of dead workers on spawning.")
+  entity_lists = EntityListContainer()
+  queen_config = copy.deepcopy(load_dummy_queen_config()[0])
+  queen_config["worker_type"]["behavior"] = "AdvancedWorker"
+  queen_config["worker_type"]["shouting_radius"] = 50
+  queen = Queen(300, 300, queen_config)
+  entity_lists.queen_list.append(queen)
+  queen.spawnWorker(2, entity_lists.entity_list, entity_lists.worker_list, 600, 600, 0, 40,
+                    entity_lists.worker_pool)
+
+  dead_worker = entity_lists.worker_list[0]
+  dead_worker.hearSignals(10, entity_lists.worker_list[1], 10, entity_lists.worker_list[1])
+  dead_worker._has_food = True
+  dead_worker._internal_food_distance = 0
+  dead_worker.kill(entity_lists)
+  assert entity_lists.worker_pool.getPooledNum() == 1
+  assert queen.getWorkerNum() == 1
+
+  queen.spawnWorker(2, entity_lists.entity_list, entity_lists.worker_list, 600, 600, 0, 40,
+                    entity_lists.worker_pool)
+  assert entity_lists.worker_pool.getPooledNum() == 0
+  assert dead_worker in entity_lists.worker_list
+  assert dead_worker._primary_queen is queen
+  assert dead_worker._heard_food_sender is None and dead_worker._heard_queen_sender is None
+  assert not dead_worker._has_food
+  assert dead_worker._internal_food_distance == 99999
+  assert queen.getWorkerNum() == 3
+
+def test_bulk_worker_spawning():
+  print("\n[TEST WORKER] Checking bulk spawning and queen membership of workers.")
+  queen_config = load_dummy_queen_config()[0]
+  queen_a = Queen(300, 300, queen_config)
+  queen_b = Queen(600, 600, queen_config)
+  entity_list = []
+  worker_list = []
+  queen_a.spawnWorker(5000, entity_list, worker_list, 1000, 1000, 0.01, 40)
+
+  assert len(entity_list) == 5000
+  assert len(worker_list) == 5000
+  assert queen_a.getWorkerNum() == 5000
+  assert abs(queen_a.getEnergy() - 50) < 1e-6
+  for worker in worker_list:
+    assert worker._primary_queen is queen_a
+    assert 260 <= worker._x <= 340 and 260 <= worker._y <= 340
+
+  worker = worker_list[0]
+  worker.selectQueen(queen_a)
+  assert queen_a.getWorkerNum() == 5000
+  worker.selectQueen(queen_b)
+  assert queen_a.getWorkerNum() == 4999
+  assert queen_b.getWorkerList() == [worker]
+  assert worker.getColor() == queen_b.getColor()
+
+def test_memory_report():
+  print("\n[TEST SCENE] Checking the memory report broken down by entity type.")
+  scene = Scene(load_dummy_scene_config(), False)
+  queen_config = copy.deepcopy(load_dummy_queen_config()[0])
+  queen_config["worker_type"]["behavior"] = "AdvancedWorker"
+  queen_config["worker_type"]["shouting_radius"] = 50
+  scene.spawnQueen(100, 250, queen_config)
+  scene.enableMemoryProfiling()
+
+  report = scene.reportMemory()
+  categories = report["categories"]
+  assert categories["AdvancedWorker"]["count"] == 50
+  assert categories["AdvancedWorker"]["count_delta"] == 50
+  assert categories["Queen worker lists"]["count"] == 1
+  assert categories["Food"]["count"] == 10
+  assert report["traced_bytes"] is not None
+
+  scene.spawnQueen(800, 30, queen_config)
+  report = scene.reportMemory()
+  scene.disableMemoryProfiling()
+  assert report["categories"]["AdvancedWorker"]["count_delta"] == 50
+  assert report["categories"]["AdvancedWorker"]["bytes_delta"] > 0
+
+def test_control_server():
+  print("\n[TEST SCENE] Checking the local control server of a running scene.")
+  scene = start_dummy_scene()
+  server = scene.startControlServer()
+  queen_config = load_dummy_queen_config()[0]
+
+  with socket.create_connection(server.getAddress(), timeout = 10) as connection:
+    stream = connection.makefile("rw")
+
+    def request(command):
+      stream.write(json.dumps(command) + "\n")
+      stream.flush()
+      return json.loads(stream.readline())
+
+    assert request({"command": "pause"})["ok"]
+    assert request({"command": "spawn_food", "x": 100, "y": 100})["ok"]
+    assert request({"command": "spawn_obstacle", "x": 500, "y": 500})["ok"]
+    assert request({"command": "spawn_queen", "x": 300, "y": 300, "queen": queen_config})["ok"]
+    assert not request({"command": "spawn_food", "x": 100})["ok"]
+    assert not request({"command": "unknown"})["ok"]
+
+    stats = request({"command": "stats"})["result"]
+    assert stats["food"] == 11
+    assert stats["obstacles"] == 1
+    assert stats["colonies"][0]["workers"] == 50
+    assert not stats["running"]
+
+    tick = stats["tick"]
+    assert request({"command": "step", "ticks": 3})["ok"]
+    time.sleep(0.5)
+    snapshot = request({"command": "snapshot"})["result"]
+    assert snapshot["tick"] == tick + 3
+    assert len(snapshot["workers"]) == 50
+
+    # Branches run beside the scene, so the scene keeps ticking until their results arrive
+    assert request({"command": "resume"})["ok"]
+    assert not request({"command": "step", "ticks": 3})["ok"]
+    tick = request({"command": "stats"})["result"]["tick"]
+    response = request({"command": "branch", "ticks": 10, "mutations": [[], []]})
+    assert response["ok"] and len(response["result"]) == 2
+    assert response["result"][0]["ticks"] == 10
+    assert request({"command": "stats"})["result"]["tick"] > tick
+
+  scene.exitScene()
+  scene.joinSceneThread()
+
+def test_scene_snapshots():
+  print("\n[TEST SCENE] Checking immutable snapshots of a running scene.")
+  scene = start_dummy_scene()
+  queen_config = load_dummy_queen_config()
+  scene.spawnQueen(100, 250, queen_config[0])
+  time.sleep(0.2)
+
+  snapshot = scene.getSnapshot()
+  queen_number, worker_number, food_number, obstacle_number = snapshot.getEntityNumbers()
+  assert queen_number == 1
+  assert worker_number == 50
+  assert food_number == 10
+  assert len(snapshot.worker_x) == len(snapshot.worker_y) == len(snapshot.worker_energy) == 50
+  assert list(snapshot.worker_colony) == [0] * 50
+  assert snapshot.queen_worker_num[0] == 50
+
+  worker_x = list(snapshot.worker_x)
+  tick = snapshot.tick
+  time.sleep(0.2)
+  assert scene.getSnapshot().tick > tick
+  assert list(snapshot.worker_x) == worker_x
+  with pytest.raises(TypeError):
+    snapshot.worker_x[0] = 0.0
+  with pytest.raises(AttributeError):
+    snapshot.worker_x = None
+
+  # A paused scene keeps its snapshot until a command changes the state.
+  scene.submitCommand({"command": "pause"}).result(timeout = 5)
+  time.sleep(0.1)
+  paused_snapshot = scene.getSnapshot()
+  time.sleep(0.2)
+  assert scene.getSnapshot() is paused_snapshot
+  scene.submitCommand({"command": "spawn_obstacle", "x": 100, "y": 200}).result(timeout = 5)
+  time.sleep(0.1)
+  obstacles = scene.getSnapshot().toDict()["obstacles"]
+  assert scene.getSnapshot() is not paused_snapshot
+  assert obstacles[-1] == [100, 200, 100]
+
+  scene.exitScene()
+  scene.joinSceneThread()
+
+def test_ensemble():
+  print("\n[TEST SCENE] Checking the vectorized ensemble of independent worlds.")
+  scene_config = load_dummy_scene_config()
+  queen_config = load_dummy_queen_config()
+  ensemble = Ensemble(scene_config, queen_config, 4, seed = 1)
+  assert ensemble.getWorkerNumbers().tolist() == [[50]] * 4
+
+  for _ in range(20):
+    ensemble.step()
+    assert (ensemble._food_energy >= 0).all()
+  series = ensemble.getColonyTimeSeries()
+  assert series["worker_numbers"].shape == (20, 4, 1)
+  assert series["queen_energies"].shape == (20, 4, 1)
+  assert series["queens_alive"].shape == (4, 1)
+  assert (series["worker_numbers"] <= 50).all()
+
+  # All workers of the first world touch a food source with only 3 energy left
+  ensemble._queen_x[0], ensemble._queen_y[0] = 100, 100
+  ensemble._food_x[0, 0], ensemble._food_y[0, 0], ensemble._food_speed[0, 0] = 1000, 600, 0
+  ensemble._worker_x[0], ensemble._worker_y[0] = 1000, 600
+  ensemble._worker_target[0] = np.where(ensemble._worker_alive[0], 0, -1)
+  ensemble._worker_has_food[0] = False
+  ensemble._food_alive[0, 0] = True
+  ensemble._food_energy[0, 0] = 3
+  ensemble.step()
+  assert np.count_nonzero(ensemble._worker_has_food[0]) == 3
+  assert ensemble._food_energy[0, 0] == 0
+
+  # Like in the Scene, newly spawned food attracts the workers it is closer to than their target
+  ensemble._food_alive[0, 1] = True
+  ensemble._food_x[0, 1], ensemble._food_y[0, 1] = 1010, 600
+  ensemble._worker_target[0] = np.where(ensemble._worker_alive[0], 0, -1)
+  ensemble._food_alive[0, 0] = True
+  ensemble._food_x[0, 0], ensemble._food_y[0, 0] = 0, 0
+  ensemble._worker_target[0, 0] = -1
+  ensemble._retargetToCloserFood(np.array([0]), np.array([1]))
+  assert ensemble._worker_target[0, 0] == -1
+  assert (ensemble._worker_target[0, 1:][ensemble._worker_alive[0, 1:]] == 1).all()
+  ensemble._worker_x[0, 1] = 0
+  ensemble._worker_y[0, 1] = 0
+  ensemble._worker_target[0, 1] = 0
+  ensemble._retargetToCloserFood(np.array([0]), np.array([1]))
+  assert ensemble._worker_target[0, 1] == 0
+
+  same_series = Ensemble(scene_config, queen_config, 4, seed = 1).run(20)
+  assert (same_series["worker_numbers"] == series["worker_numbers"]).all()
+
+  # The workers only search for food in their slice of the food search period
+  scene_config["update_periods"] = {"food_search": 1}
+  ensemble = Ensemble(scene_config, queen_config, 4, seed = 1)
+  ensemble.step()
+  assert (ensemble._worker_target[ensemble._worker_alive] >= 0).all()
+  scene_config["update_periods"] = {"food_search": 1000}
+  ensemble = Ensemble(scene_config, queen_config, 4, seed = 1)
+  ensemble.step()
+  assert (ensemble._worker_target == -1).all()
+
+  queen_config[0]["worker_type"]["behavior"] = "AdvancedWorker"
+  with pytest.raises(ValueError):
+    Ensemble(scene_config, queen_config, 4)
+
+def test_stopping_criteria():
+  print("\n[TEST SCENE] Checking early stopping of headless runs.")
+  scene = Scene(load_dummy_scene_config(), False)
+  scene.spawnQueen(100, 250, load_fast_dying_entity_config()[0])
+  result = scene.runHeadless(1000, StoppingCriteria(check_interval = 10))
+  assert result["stop_reason"] == StoppingCriteria.EXTINCTION
+  assert result["ticks"] < 1000 and result["ticks"] % 10 == 0
+  assert result["stats"]["queens"] == 0
+
+  # The workers of the weak colony only live half as long, so the strong colony dominates
+  # once they die, while both queens are still alive
+  scene = Scene(load_dummy_scene_config(), False)
+  strong_config, weak_config = load_dummy_queen_config() * 2
+  weak_config = dict(weak_config, worker_type = dict(weak_config["worker_type"], mean_energy = 25))
+  scene.spawnQueen(100, 250, strong_config)
+  scene.spawnQueen(800, 250, weak_config)
+  result = scene.runHeadless(1000, StoppingCriteria(check_interval = 5, dominance_share = 0.8))
+  assert result["stop_reason"] == StoppingCriteria.DOMINANCE
+  assert 200 < result["ticks"] < 400
+  assert result["stats"]["queens"] == 2
+  colonies = result["stats"]["colonies"]
+  assert colonies[0]["workers"] >= 0.8 * (colonies[0]["workers"] + colonies[1]["workers"])
+
+  # Balanced colonies never reach the share
+  scene = Scene(load_dummy_scene_config(), False)
+  for queen_config in load_dummy_queen_config() * 2:
+    scene.spawnQueen(100, 250, queen_config)
+  result = scene.runHeadless(200, StoppingCriteria(check_interval = 5, dominance_share = 0.8))
+  assert result["stop_reason"] == StoppingCriteria.TICK_LIMIT
+  assert result["ticks"] == 200
+
+  # No worker dies within the first ticks, so the series is exactly flat. A single dead worker
+  # within the window already has a variance of 0.16.
+  flat_variance = 0.1
+  scene = Scene(load_dummy_scene_config(), False)
+  for queen_config in load_dummy_queen_config() * 2:
+    scene.spawnQueen(100, 250, queen_config)
+  criteria = StoppingCriteria(check_interval = 1, stop_on_extinction = False,
+                              steady_state_window = 5, steady_state_variance = flat_variance)
+  result = scene.runHeadless(1000, criteria)
+  assert result["stop_reason"] == StoppingCriteria.STEADY_STATE
+  assert result["ticks"] == 5
+  assert [colony["workers"] for colony in result["stats"]["colonies"]] == [50, 50]
+  assert statistics.pvariance([50] * 4 + [49]) > flat_variance
+
+  result = scene.runHeadless(20)
+  assert result["stop_reason"] == StoppingCriteria.TICK_LIMIT
+  assert result["ticks"] == 20
+
+def test_session_replay(tmp_path):
+  print("\n[TEST SCENE] Checking that a recorded session is replayed exactly.")
+  scene_config = load_dummy_scene_config()
+  queens_list = copy.deepcopy(load_dummy_queen_config())
+  queens_list.append(copy.deepcopy(queens_list[0]))
+  queens_list[1]["worker_type"]["behavior"] = "AdvancedWorker"
+  queens_list[1]["worker_type"]["shouting_radius"] = 60
+  queens_list[1]["worker_type"]["max_listeners"] = 5
+  queens_list[1]["worker_type"]["listener_selection"] = "random"
+
+  random.seed(1234)
+  session_log = SessionLog(1234, scene_config, queens_list)
+  scene = Scene(scene_config, False)
+  scene.spawnQueens(queens_list)
+  scene.startRecording(session_log, str(tmp_path / "session.json"))
+  scene.runHeadless(40)
+  scene._applyInput({"event": "left_click", "x": 30, "y": 30})
+  scene.submitCommand({"command": "spawn_obstacle", "x": 200, "y": 200})
+  scene.runHeadless(30)
+  queen = scene.getEntityLists().queen_list[0]
+  scene._applyInput({"event": "left_click", "x": queen._x, "y": queen._y})
+  assert scene.dragged_entity is queen
+  scene._applyInput({"event": "drag", "x": 250, "y": 250})
+  scene.runHeadless(10)
+  scene._applyInput({"event": "release"})
+  scene._applyInput({"event": "right_click", "x": 200, "y": 200})
+  scene.runHeadless(50)
+  assert scene.stopRecording() is session_log
+  expected = scene.getSnapshot().toDict()
+
+  session_log = SessionLog.load(str(tmp_path / "session.json"))
+  assert session_log.getTickNum() == 130
+  assert [event["event"] for event in session_log.getEvents()] == \
+         ["left_click", "command", "left_click", "drag", "release", "right_click"]
+  replay_scene = session_log.createScene()
+  result = replay_scene.runHeadless(session_log.getTickNum())
+  assert result["ticks"] == 130
+  assert replay_scene.getSnapshot().toDict() == expected
+
+def test_scene_branching():
+  print("\n[TEST SCENE] Checking forked what-if branches of a running scene.")
+  scene_config = load_dummy_scene_config()
+  scene = Scene(scene_config, False)
+  scene.spawnQueens(load_dummy_queen_config())
+  scene.runHeadless(20)
+  before = scene.getSnapshot().toDict()
+  queens_config = copy.deepcopy(load_dummy_queen_config())
+  queens_config[0]["energy_reduction_rate"] *= 2
+
+  baseline, same_baseline, with_obstacle, moved_queen, hungry_queen, failed = scene.branch([
+    [],
+    [],
+    [{"event": "command", "command": {"command": "spawn_obstacle", "x": 300, "y": 300}}],
+    [{"event": "move_queen", "colony_id": 0, "x": 10, "y": 10}],
+    [{"event": "queens_config", "config": queens_config}],
+    [{"event": "command", "command": {"command": "spawn_food"}}]
+  ], 30)
+  assert baseline["ticks"] == 30 and baseline["stats"]["tick"] == 50
+  assert baseline == same_baseline
+  assert with_obstacle["stats"]["obstacles"] == baseline["stats"]["obstacles"] + 1
+  assert moved_queen["ticks"] == 30
+  assert hungry_queen["stats"]["colonies"][0]["energy"] < baseline["stats"]["colonies"][0]["energy"]
+  assert "error" in failed
+  assert scene.getSnapshot().toDict() == before
+
+  # Running one variant at a time gives the same results in the same order
+  serial_baseline, serial_with_obstacle = scene.branch([
+    [],
+    [{"event": "command", "command": {"command": "spawn_obstacle", "x": 300, "y": 300}}]
+  ], 30, max_processes = 1)
+  assert serial_baseline == baseline
+  assert serial_with_obstacle == with_obstacle
+
+  # A failing fork leaves no unreaped children behind
+  fork = os.fork
+  fork_calls = []
+  def failOnSecondFork():
+    fork_calls.append(None)
+    if len(fork_calls) == 2:
+      raise OSError("No more processes.")
+    return fork()
+  os.fork = failOnSecondFork
+  try:
+    with pytest.raises(OSError):
+      scene.branch([[], [], []], 5)
+  finally:
+    os.fork = fork
+  with pytest.raises(ChildProcessError):
+    os.waitpid(-1, os.WNOHANG)
+
+  future = scene.submitCommand({"command": "branch", "ticks": 10, "mutations": [[]]})
+  scene.runHeadless(1)
+  assert future.result(timeout = 10)[0]["stats"]["tick"] == 30
+  assert scene.getStats()["tick"] == 21
+
+def test_lifecycle_events():
+  print("\n[TEST SCENE] Checking the entity lifecycle events and the retargeting of workers.")
+  scene_config = load_dummy_scene_config()
+  scene_config["min_food_available"] = 0
+  scene_config["update_periods"] = {"food_search": 1}
+  scene = Scene(scene_config, False)
+  entity_lists = scene.getEntityLists()
+  events = []
+  for event_type in (EventBus.SPAWN, EventBus.DEATH, EventBus.DRAG):
+    entity_lists.event_bus.subscribe(event_type, lambda entity, event_type = event_type: events.append((event_type, entity)))
+
+  scene.spawnFood(1000, 1000)
+  far_food = entity_lists.food_list[-1]
+  scene.spawnQueen(100, 100, load_dummy_queen_config()[0])
+  queen = entity_lists.queen_list[0]
+  assert events == [(EventBus.SPAWN, far_food), (EventBus.SPAWN, queen)]
+
+  worker = queen.getWorkerList()[0]
+  worker.setPosition(100, 100)
+  worker.selectFood(far_food)
+  scene.spawnFood(150, 150)
+  near_food = entity_lists.food_list[-1]
+  assert worker._primary_food is near_food
+  assert worker in near_food._targeting_workers and worker not in far_food._targeting_workers
+
+  near_food.kill(entity_lists)
+  assert events[-1] == (EventBus.DEATH, near_food)
+  assert worker._primary_food is far_food
+
+  queen.kill(entity_lists)
+  assert all(worker._primary_queen is None for worker in queen.getWorkerList())
+
+def test_sampling_profiler(tmp_path):
+  print("\n[TEST SCENE] Checking the sampling profiler of the simulation thread.")
+  scene = start_dummy_scene()
+  queen_config = load_dummy_queen_config()
+  scene.spawnQueen(100, 250, queen_config[0])
+  collapsed_path = str(tmp_path / "profile.txt")
+  scene.startProfiling(collapsed_path)
+  time.sleep(0.5)
+  assert scene.stopProfiling() == collapsed_path
+  scene.exitScene()
+  scene.joinSceneThread()
+
+  with open(collapsed_path) as file:
+    lines = file.read().splitlines()
+  assert len(lines) > 0
+  assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+  assert any("_gameLoop (Scene.py" in line for line in lines)
+
+  profiler = SamplingProfiler(0.001)
+  profiler.start()
+  scene = Scene(load_dummy_scene_config(), False)
+  scene.spawnQueen(100, 250, queen_config[0])
+  scene.runHeadless(100)
+  speedscope_path = profiler.stop(str(tmp_path / "profile.json"))
+  assert profiler.getSampleNum() > 0
+  with open(speedscope_path) as file:
+    profile = json.load(file)
+  assert profile["profiles"][0]["type"] == "sampled"
+  assert len(profile["profiles"][0]["samples"]) == len(profile["profiles"][0]["weights"])
+  assert any(frame["name"].startswith("runHeadless") for frame in profile["shared"]["frames"])
+
+def test_performance_hud():
+  print("\n[TEST SCENE] Checking the phase timings of the performance overlay.")
+  scene = Scene(load_dummy_scene_config(), False)
+  scene.spawnQueen(100, 250, load_dummy_queen_config()[0])
+  hud = scene._performance_hud
+  scene.behave()
+  hud.endFrame(0.02, 30.0)
+  averages = hud.getPhaseAverages()
+  assert set(averages) == set(PerformanceHud.PHASES)
+  assert averages["behave"] > 0 and averages["render"] == 0
+  assert hud.getFrameTimes() == [20.0]
+
+  pygame.font.init()
+  screen = pygame.Surface((1000, 400))
+  hud.render(screen, pygame.font.Font(None, 30), 0, 0, scene.getEntityNumbers(), [(0, 12)])
+
+def test_dirty_rect_rendering(monkeypatch):
+  print("\n[TEST SCENE] Checking that dirty rect updates match a full redraw.")
+  updates = []
+  monkeypatch.setattr(pygame.display, "flip", lambda: updates.append("flip"))
+  monkeypatch.setattr(pygame.display, "update", lambda rects: updates.append(list(rects)))
+
+  scene_config = load_dummy_scene_config()
+  scene_config["start_obstacle_number"] = 5
+  scene = Scene(scene_config, False)
+  scene.spawnQueen(300, 300, load_dummy_queen_config()[0])
+  pygame.font.init()
+  scene.plain_text_font = pygame.font.Font(None, 45)
+  scene.hud_font = pygame.font.Font(None, 30)
+  scene._screen = pygame.Surface((scene_config["screen_width"], scene_config["screen_height"]))
+
+  scene.render()
+  assert updates == ["flip"]
+  scene._do_render_legend = False
+  for _ in range(5):
+    scene.runHeadless(1)
+    scene.render()
+  scene.getEntityLists().obstacle_list[0].kill(scene.getEntityLists())
+  scene.render()
+  assert all(type(update) is list for update in updates[2:])
+
+  dirty_pixels = pygame.image.tostring(scene._screen, "RGB")
+  scene._renderFullScreen(*scene._cullEntities())
+  assert pygame.image.tostring(scene._screen, "RGB") == dirty_pixels
+
+  # Nothing changes while paused apart from the queen stats panel.
+  scene.render()
+  updates.clear()
+  scene.render()
+  assert len(updates) == 1 and len(updates[0]) == 1
+
+def test_camera_viewport():
+  print("\n[TEST SCENE] Checking the camera viewport and the culling of a world larger than the screen.")
+  camera = Camera(800, 500, 3200, 2000)
+  camera.zoomAt(2, 400, 250)
+  assert camera.getZoom() == 2
+  assert camera.toWorld(*camera.toScreen(1000, 700)) == (1000, 700)
+  camera.pan(-10000, -10000)
+  assert camera.getPosition() == (0, 0)
+  camera.zoomAt(0.001, 0, 0)
+  assert camera.getZoom() == 0.25
+  assert camera.getVisibleRect() == (0, 0, 3200, 2000)
+
+  scene_config = load_dummy_scene_config()
+  scene_config["world_width"] = scene_config["screen_width"] * 4
+  scene_config["world_height"] = scene_config["screen_height"] * 4
+  scene_config["start_obstacle_number"] = 0
+  scene = Scene(scene_config, False)
+  entity_lists = scene.getEntityLists()
+  inside = Obstacle(100, 100, 50)
+  outside = Obstacle(scene_config["world_width"] - 100, scene_config["world_height"] - 100, 50)
+  entity_lists.obstacle_list.extend([inside, outside])
+  visible_layers, render_rects = scene._cullEntities()
+  assert inside in visible_layers[0] and outside not in visible_layers[0]
+  assert outside not in render_rects
+
+  view = scene.getCamera().getVisibleRect()
+  assert scene._getClickedEntity(outside._x, outside._y, 40, view) is None
+  assert scene._getClickedEntity(outside._x, outside._y, 40) is outside
+
+  # An obstacle whose center is just outside the view is still drawn and clickable
+  edge = Obstacle(view[2] + 20, 600, 50)
+  entity_lists.obstacle_list.append(edge)
+  entity_lists.event_bus.emit(EventBus.SPAWN, edge)
+  assert edge in scene._cullEntities()[0][0]
+  assert scene._getClickedEntity(edge._x, edge._y, 40, view) is edge
+
+  # The culling through the render indices matches a test of every entity
+  scene.spawnQueens(load_dummy_queen_config())
+  for entity in entity_lists.entity_list:
+    entity.setPosition(random.uniform(0, view[2] * 2), random.uniform(0, view[3] * 2))
+  scene.runHeadless(1)
+  visible_layers, _ = scene._cullEntities()
+  for visible_entities, entity_list in zip(visible_layers, (entity_lists.obstacle_list, entity_lists.food_list,
+                                                            entity_lists.queen_list, entity_lists.worker_list)):
+    assert set(visible_entities) == {entity for entity in entity_list if scene._overlapsView(entity.getRenderRect(), view)}
+  assert 0 < len(visible_layers[3]) < len(entity_lists.worker_list)
+
+def test_colony_history():
+  print("\n[TEST SCENE] Checking the bounded multi-resolution colony history.")
+  series = MultiResolutionSeries(level_capacity = 8, factor = 2, max_levels = 3)
+  for tick in range(40):
+    series.append(tick, tick)
+  assert series.getLevelNum() == 3
+  assert series.getBucketNum() <= 3 * 8
+  buckets = series.query()
+  assert buckets[-1] == (39, 39, 39, 39.0, 39)
+  assert all(previous[1] < bucket[0] for previous, bucket in zip(buckets, buckets[1:]))
+  assert sum(end - start + 1 for start, end, _, _, _ in buckets) == 40
+  assert series.query(max_points = 1) == [(0, 39, 0, 19.5, 39)]
+  assert all(end >= 10 for _, end, _, _, _ in series.query(start_tick = 10))
+  for tick in range(40, 1000):
+    series.append(tick, tick)
+  assert series.getBucketNum() <= 3 * 8
+  assert series.query()[0][0] > 0
+
+  scene = Scene(load_dummy_scene_config(), False)
+  scene.spawnQueen(300, 300, load_dummy_queen_config()[0])
+  scene.runHeadless(50)
+  history = scene.executeCommand({"command": "history", "max_points": 10})
+  assert len(history) == 1 and history[0]["colony_id"] == 0
+  assert len(history[0]["workers"]) == 10
+  assert history[0]["workers"][-1][1] == 50
+  assert history[0]["energy"][0][0] == 1
+
+def test_streaming_shouting():
+  print("\n[TEST WORKER] Checking that the folded signals match a scan over all workers in shouting range.")
+  queen_config = copy.deepcopy(load_dummy_queen_config()[0])
+  queen_config["worker_type"]["behavior"] = "AdvancedWorker"
+  queen_config["worker_type"]["shouting_radius"] = 50
+  queen = Queen(300, 300, queen_config)
+  queen.spawnWorker(150, [], [], 600, 600, 0, 200)
+  worker_list = queen.getWorkerList()
+  for worker in worker_list:
+    worker._internal_food_distance = random.randint(0, 200)
+    worker._internal_queen_distance = random.randint(0, 200)
+
+  queen.computeAdjacentWorkers()
+  for worker in worker_list:
+    in_range = [partner for partner in worker_list
+                if partner is not worker and abs(partner._x - worker._x) <= 50 and abs(partner._y - worker._y) <= 50]
+    if not in_range:
+      assert worker._heard_food_sender is None
+      continue
+    best_food = min(partner._internal_food_distance + 50 for partner in in_range)
+    best_queen = min(partner._internal_queen_distance + 50 for partner in in_range)
+    assert worker._heard_food_distance == best_food
+    assert worker._heard_food_sender._internal_food_distance + 50 == best_food
+    assert worker._heard_queen_distance == best_queen
+    assert worker._heard_queen_sender._internal_queen_distance + 50 == best_queen
+
+  # Hearing uses the distances from before the tick, so workers updated earlier in the tick do not matter.
+  original = [worker._internal_food_distance for worker in worker_list]
+  expected = [min(distance, worker._heard_food_distance) for worker, distance in zip(worker_list, original)]
+  assert expected != original
+  for worker in reversed(worker_list):
+    worker.askForNextDirection()
+  assert [worker._internal_food_distance for worker in worker_list] == expected
+
+def test_update_scheduler():
+  print("\n[TEST SCENE] Checking that scheduled work is spread evenly over the ticks.")
+  update_scheduler = UpdateScheduler(horizon = 12)
+  assert update_scheduler.isDue("unknown")
+  update_scheduler.register("first", 2, 5)
+  update_scheduler.register("second", 2, 5)
+  update_scheduler.register("sliced", 4, 8, sliced = True)
+  assert update_scheduler.getTickCosts() == [7.0] * 12
+  assert update_scheduler.isDue("first") != update_scheduler.isDue("second")
+  update_scheduler.register("rare", 30, 1)
+  assert sum(update_scheduler.getTickCosts()) == 12 * 7.0 + 1
+  assert 0.95 < update_scheduler.getScaledChance("rare", 0.1) < 1
+  update_scheduler.unregister("rare")
+  assert update_scheduler.getScaledChance("first", 0.5) == 0.75
+  assert update_scheduler.getScaledChance("unknown", 0.5) == 0.5
+
+  entities = [Food(0, 0, 10, 0, 0) for _ in range(40)]
+  for _ in range(4):
+    due = [entity for entity in entities if update_scheduler.isDue("sliced", entity)]
+    assert len(due) == 10
+    assert np.count_nonzero(update_scheduler.isSlotDue("sliced", np.arange(40))) == 10
+    update_scheduler.advance()
+
+  config_manager = ConfigManager()
+  scene_config = load_dummy_scene_config()
+  scene_config["update_periods"] = {"food_search": 0}
+  assert not config_manager.validateSceneConfig(scene_config)
+  scene_config["update_periods"] = {"retarget": 4}
+  assert not config_manager.validateSceneConfig(scene_config)
+  # Periods longer than the balanced horizon are valid as well
+  scene_config["update_periods"] = {"food_spawn": 300}
+  assert config_manager.validateSceneConfig(scene_config)
+  assert Scene(scene_config, False).getEntityLists().update_scheduler.getPeriod(UpdateScheduler.FOOD_SPAWN) == 300
+  assert Ensemble(scene_config, load_dummy_queen_config(), 2)._update_scheduler.getPeriod(UpdateScheduler.FOOD_SPAWN) == 300
+
+  # A dead food source releases its workers, which search again in their slices.
+  scene_config["update_periods"] = {"food_search": 4}
+  scene_config["min_food_available"] = 0
+  assert config_manager.validateSceneConfig(scene_config)
+  scene = Scene(scene_config, False)
+  entity_lists = scene.getEntityLists()
+  scene.spawnFood(100, 100)
+  food = entity_lists.food_list[-1]
+  scene.spawnQueen(500, 500, load_dummy_queen_config()[0])
+  workers = scene.getEntityLists().queen_list[0].getWorkerList()
+  for worker in workers:
+    worker.selectFood(food)
+  food.kill(entity_lists)
+  assert all(worker._primary_food is None for worker in workers)
+  scene.spawnFood(900, 900)
+  searching_workers = []
+  for _ in range(4):
+    scene.runHeadless(1)
+    searching_workers.append(sum(worker._primary_food is not None for worker in workers))
+  assert 0 < searching_workers[0] < len(workers)
+  assert searching_workers[-1] == len(workers)